@@ -1,31 +1,101 @@
-from flask import Flask, render_template
+from flask import Flask, Response, abort, jsonify, render_template, request, url_for
+from markupsafe import Markup
 import logging
+import multiprocessing
 import os
-import re
 
 # Configure basic logging (optional for a simple Flask app, but good practice)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Attempt to import job_storage
 try:
-    from job_storage import load_jobs_from_json, JOBS_JSON_FILEPATH # Assuming JOBS_JSON_FILEPATH is defined in job_storage
+    from job_storage import load_jobs_from_json, job_to_dict, JOBS_JSON_FILEPATH # Assuming JOBS_JSON_FILEPATH is defined in job_storage
 except ImportError:
     logging.error("Could not import from job_storage.py. Ensure it's accessible.")
     # Fallback if job_storage is not found or JOBS_JSON_FILEPATH isn't there.
     # This allows the Flask app to at least start, though it won't show jobs.
     def load_jobs_from_json(filepath): return []
+    def job_to_dict(job, include_description=True): return {'id': job.id, 'title': job.title}
     JOBS_JSON_FILEPATH = "data/remotive_jobs.json" # Default path
 
+try:
+    from salary_parser import parse_salary, NO_SALARY_DISPLAY
+except ImportError:
+    logging.error("Could not import from salary_parser.py. Salaries will be shown as stored.")
+    NO_SALARY_DISPLAY = "Salary not specified"
+    def parse_salary(salary): return None
+
+try:
+    from job_store import get_job_store
+except ImportError:
+    logging.error("Could not import from job_store.py. Jobs will be re-read from disk on every request.")
+    get_job_store = None
+
+try:
+    from job_search import SearchIndex, SearchIndexCache, SEARCH_INDEX_FILEPATH
+except ImportError:
+    logging.error("Could not import from job_search.py. The /search route will be unavailable.")
+    SearchIndex = None
+
+try:
+    from job_listing import JobListingIndex, parse_published_after, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+except ImportError:
+    logging.error("Could not import from job_listing.py. The job list will not be filtered or paginated.")
+    JobListingIndex = None
+
+try:
+    from job_snapshot import JobSnapshot, SNAPSHOT_FILEPATH
+except ImportError:
+    logging.error("Could not import from job_snapshot.py. Jobs will be served from each process's own memory.")
+    JobSnapshot = None
+
+try:
+    from job_facets import FacetIndex, FACETS
+except ImportError:
+    logging.error("Could not import from job_facets.py. The /facets.json route will be unavailable.")
+    FacetIndex = None
+
+try:
+    from metrics import REGISTRY, timed, REQUEST_SECONDS, RENDER_SECONDS
+except ImportError:
+    logging.error("Could not import from metrics.py. The /metrics route will be unavailable.")
+    REGISTRY = REQUEST_SECONDS = RENDER_SECONDS = None
+    def timed(histogram): return lambda func: func
+
+try:
+    from refresh_scheduler import BackgroundRefresher, REFRESH_INTERVAL_SECONDS
+except ImportError:
+    logging.error("Could not import from refresh_scheduler.py. Background refresh will be unavailable.")
+    BackgroundRefresher = None
+
+try:
+    from page_cache import PageCache, FragmentCache, choose_encoding
+except ImportError:
+    logging.error("Could not import from page_cache.py. The job list will be rendered on every request.")
+    PageCache = None
+
+try:
+    from job_export import parse_fields, iter_ndjson, gzip_stream, is_changed_since
+except ImportError:
+    logging.error("Could not import from job_export.py. The /api/jobs route will be unavailable.")
+    iter_ndjson = None
+
+try:
+    from job_similarity import SimilarityIndexCache, SIMILARITY_AVAILABLE, DEFAULT_SIMILAR_K, MAX_SIMILAR_K
+except ImportError:
+    logging.error("Could not import from job_similarity.py. The /jobs/<id>/similar route will be unavailable.")
+    SimilarityIndexCache = None
+
 
 app = Flask(__name__)
 
-# Function to format salary with commas
+# Salaries are parsed and formatted once at ingest (Job.salary_display); this
+# filter is kept for raw salary strings and reuses the same cached parse
 def format_salary_filter(salary):
     if not salary:
-        return "Salary not specified"
-    
-    # Replace numbers with commas (e.g., 100000 -> 100,000)
-    return re.sub(r'\b(\d{4,})\b', lambda match: re.sub(r'\B(?=(\d{3})+(?!\d))', ',', match.group(0)), salary)
+        return NO_SALARY_DISPLAY
+    parsed = parse_salary(salary)
+    return parsed.display if parsed is not None else salary
 
 # Register the filter with Jinja2
 app.jinja_env.filters['format_salary'] = format_salary_filter
@@ -36,32 +106,485 @@ if 'JOBS_JSON_FILEPATH' not in globals() or globals()['JOBS_JSON_FILEPATH'] is N
     DATA_DIR = "data"
     JOBS_JSON_FILEPATH = os.path.join(DATA_DIR, "remotive_jobs.json")
 
+# Serve from the SQLite backend once its database exists (created by
+# `python job_db.py migrate` or update_jobs.py with storage_backend="sqlite").
+# update_jobs.py picks its default backend with the same default_storage_backend().
+try:
+    from job_db import JOBS_DB_FILEPATH, default_storage_backend, search_jobs_in_db
+    STORAGE_BACKEND = default_storage_backend()
+except ImportError:
+    logging.error("Could not import from job_db.py. Serving the JSON job store.")
+    JOBS_DB_FILEPATH, search_jobs_in_db = None, None
+    STORAGE_BACKEND = "json"
+JOBS_DATA_FILEPATH = JOBS_DB_FILEPATH if STORAGE_BACKEND == "sqlite" else JOBS_JSON_FILEPATH
+
+# Run update_jobs.run_update from a background thread in every app process (one refresh at a
+# time across processes) and load new data there, so requests never wait for a fetch or reload
+BACKGROUND_REFRESH = False
+
+# Process-wide in-memory copy of the job list; only re-parsed when the file changes.
+# The list page never renders descriptions, so they stay on disk until asked for.
+job_store = get_job_store(JOBS_DATA_FILEPATH, lazy_descriptions=True,
+                          background_reload=BACKGROUND_REFRESH and BackgroundRefresher is not None) if get_job_store else None
+
+def get_current_jobs():
+    """
+    Returns the current job list, or None if the jobs data file does not exist.
+    Served from the in-memory job store when available.
+    """
+    if job_store is not None:
+        return job_store.get_jobs()
+    if not os.path.exists(JOBS_JSON_FILEPATH):
+        return None
+    return load_jobs_from_json(JOBS_JSON_FILEPATH)
+
+# Search index persisted by update_jobs.py, reloaded when the file is replaced (by
+# warm_served_data only, when refreshing in the background)
+search_index_cache = SearchIndexCache(SEARCH_INDEX_FILEPATH,
+                                      background_reload=BACKGROUND_REFRESH and BackgroundRefresher is not None) if SearchIndex else None
+_fallback_search_index = (None, None) # (job list it was built from, index)
+
+def get_current_jobs_with_version():
+    """
+    Like get_current_jobs(), plus the version of the dataset the list was
+    loaded from (None when it is not served from the job store).
+    """
+    if job_store is not None:
+        return job_store.get_jobs_with_version()
+    return get_current_jobs(), None
+
+def get_search_index(jobs):
+    """
+    Returns the persisted search index, or one built in memory from jobs
+    (once per job list) if update_jobs.py has not written one yet.
+    """
+    global _fallback_search_index
+    index = search_index_cache.get()
+    if index is not None:
+        return index
+    built_from, index = _fallback_search_index
+    if built_from is not jobs:
+        logging.warning(f"No search index at {SEARCH_INDEX_FILEPATH}; building one in memory.")
+        get_description = job_store.get_description if job_store is not None else None
+        index = SearchIndex.build(jobs, get_description)
+        _fallback_search_index = (jobs, index)
+    return index
+
+# Similar-jobs matrices written by update_jobs.py, memory-mapped and reloaded when replaced
+similarity_index_cache = SimilarityIndexCache() if SimilarityIndexCache and SIMILARITY_AVAILABLE else None
+
+# Columnar snapshot written by update_jobs.py. It is memory-mapped, so all worker
+# processes share one copy through the page cache instead of each parsing the job list.
+job_snapshot = JobSnapshot(SNAPSHOT_FILEPATH) if JobSnapshot else None
+
+def get_snapshot():
+    """Returns the current mapped snapshot version, or None if there is none."""
+    return job_snapshot.get() if job_snapshot is not None else None
+
+# Date-sorted listing index, rebuilt once whenever the job store hands out a new list
+_listing_index = (None, None) # (job list it was built from, index)
+
+def get_listing_index(jobs):
+    global _listing_index
+    built_from, index = _listing_index
+    if built_from is not jobs:
+        index = JobListingIndex(jobs)
+        _listing_index = (jobs, index)
+    return index
+
+# Facet bitmaps, rebuilt once per snapshot version or listing index
+_facet_index = (None, None) # (listing source it was built from, index)
+
+def get_facet_index(source):
+    global _facet_index
+    built_from, index = _facet_index
+    if built_from is not source:
+        index = FacetIndex(source)
+        _facet_index = (source, index)
+    return index
+
+def warm_served_data():
+    """
+    Loads changed job data and rebuilds what requests derive from it (listing,
+    facet and search indexes), so the next request finds it ready. Cheap when
+    nothing changed: every step compares file stats or object identity first.
+    """
+    if job_store is not None:
+        job_store.reload()
+    source = get_snapshot()
+    if source is None and JobListingIndex is not None:
+        jobs = get_current_jobs()
+        source = get_listing_index(jobs) if jobs else None
+    if source is not None and FacetIndex is not None:
+        get_facet_index(source)
+    if search_index_cache is not None:
+        search_index_cache.reload()
+
+def start_background_refresh(interval=None):
+    """
+    Starts the background refresher in this process (done at import when
+    BACKGROUND_REFRESH is set; call it from e.g. a gunicorn post_fork hook
+    otherwise). Returns the BackgroundRefresher, or None if it is unavailable.
+    """
+    if BackgroundRefresher is None:
+        return None
+    try:
+        from update_jobs import run_update
+    except (ImportError, SystemExit): # update_jobs exits when its own imports fail
+        logging.error("Could not import run_update from update_jobs.py. Background refresh is disabled.")
+        return None
+    refresher = BackgroundRefresher(lambda: run_update(storage_backend=STORAGE_BACKEND), on_change=warm_served_data,
+                                    interval=interval or REFRESH_INTERVAL_SECONDS)
+    return refresher.start()
+
+# Query parameters accepted by /, /jobs.json and /api/jobs (besides cursor and page_size)
+LISTING_FILTERS = ('category', 'job_type', 'location', 'published_after')
+
+def get_listing_filters():
+    """
+    Reads the LISTING_FILTERS query parameters.
+
+    Returns:
+        (dict of the non-empty filters as given, published_after as a datetime or None).
+    Raises:
+        ValueError: If published_after is invalid.
+    """
+    filters = {name: request.args.get(name, '').strip() for name in LISTING_FILTERS}
+    filters = {name: value for name, value in filters.items() if value}
+    published_after = parse_published_after(filters['published_after']) if 'published_after' in filters else None
+    return filters, published_after
+
+def get_listing_page(source):
+    """
+    Applies the filter, cursor and page_size query parameters to a listing
+    source (the mapped snapshot or a JobListingIndex).
+
+    Returns:
+        (page of jobs, next_cursor, dict of the non-empty filters as given).
+    Raises:
+        ValueError: If published_after or the cursor is invalid
+            (InvalidCursorError is a ValueError).
+    """
+    filters, published_after = get_listing_filters()
+    page_size = request.args.get('page_size', DEFAULT_PAGE_SIZE, type=int)
+    page, next_cursor = source.page(
+        category=filters.get('category'), job_type=filters.get('job_type'), location=filters.get('location'),
+        published_after=published_after, cursor=request.args.get('cursor') or None, page_size=page_size)
+    return page, next_cursor, filters
+
+def job_summary(job):
+    """The JSON representation of a job in list and search results (no description)."""
+    summary = job_to_dict(job, include_description=False)
+    del summary['description_html']
+    salary = job.salary_info
+    summary['salary_range'] = {"min": salary.min, "max": salary.max, "currency": salary.currency,
+                               "period": salary.period} if salary is not None and salary.has_amount else None
+    return summary
+
+
+def render_job_card(job):
+    return Markup(render_template('_job_card.html', job=job))
+
+def job_card_key(job):
+    """The fields a job card shows; the card is re-rendered only when one of them changes."""
+    return (job.title, job.company_name, job.category, job.publication_date, job.candidate_required_location,
+            job.salary, job.remotive_url, job.description_html)
+
+def _template_signature():
+    names = ('jobs.html', '_job_card.html')
+    try:
+        return ",".join(str(os.stat(os.path.join(app.root_path, app.template_folder, name)).st_mtime_ns) for name in names)
+    except OSError:
+        return ""
+
+# Job cards are rendered once per job (and again only when the job changes), whole list
+# pages once per dataset version; the template mtimes are part of every ETag, so pages
+# rendered by an older deploy are not revalidated as unchanged
+fragment_cache = FragmentCache(render_job_card, job_card_key) if PageCache else None
+page_cache = PageCache(salt=_template_signature()) if PageCache else None
+app.jinja_env.globals['job_card'] = fragment_cache.get if fragment_cache is not None else render_job_card
+
+def cached_page_response(page, encoding):
+    """A response serving a cached page in the given content coding ('identity' for none)."""
+    response = Response(page.body(encoding), mimetype='text/html')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return cache_headers(response, page.etag(encoding))
+
+def cache_headers(response, etag):
+    response.set_etag(etag)
+    # Caches may keep the page but must revalidate it, which costs a 304 while it is unchanged
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
 
 @app.route('/')
+@timed(REQUEST_SECONDS)
 def list_jobs():
     """
     Main route to display job listings.
-    Loads job data from the JSON file and passes it to the template.
+    Serves job data from the in-memory job store and passes it to the template.
+
+    Rendered pages are cached per dataset version and query string, and sent
+    with a strong ETag (so an unchanged page is answered with 304 Not Modified
+    before anything is rendered) and pre-compressed when the client accepts it.
     """
-    logging.info(f"Attempting to load jobs from: {JOBS_JSON_FILEPATH}")
-    
-    # Check if the JSON file exists before trying to load
-    if not os.path.exists(JOBS_JSON_FILEPATH):
-        logging.warning(f"Jobs data file not found at {JOBS_JSON_FILEPATH}. Displaying empty job list.")
-        logging.warning("Please run the update_jobs.py script to fetch and store job data.")
-        jobs = []
-        file_error = f"Job data file not found. Please run 'python update_jobs.py' to populate it."
+    source = get_snapshot()
+    version = source.version if source is not None else None
+    file_error = None
+    if source is None:
+        jobs, version = get_current_jobs_with_version()
+
+        # A None result means the JSON file does not exist yet
+        if jobs is None:
+            logging.warning(f"Jobs data file not found at {JOBS_DATA_FILEPATH}. Displaying empty job list.")
+            logging.warning("Please run the update_jobs.py script to fetch and store job data.")
+            jobs = []
+            file_error = f"Job data file not found. Please run 'python update_jobs.py' to populate it."
+        elif not jobs:
+            logging.info(f"Loaded jobs from {JOBS_DATA_FILEPATH}, but the list is empty or an error occurred during loading (check logs).")
+
+        if JobListingIndex is None or not jobs:
+            return render_template('jobs.html', jobs=jobs, file_error=file_error)
+        source = get_listing_index(jobs)
+
+    if page_cache is None or version is None:
+        return render_listing_page(source)
+    key = PageCache.page_key(request.args.items(multi=True))
+    encoding = choose_encoding(request.accept_encodings.quality)
+    etag = PageCache.encoded_etag(page_cache.etag_base(version, key), encoding)
+    if request.if_none_match.contains(etag):
+        return cache_headers(Response(status=304), etag)
+    page = page_cache.get(version, key)
+    if page is None:
+        page = page_cache.put(version, key, render_listing_page(source).encode('utf-8'))
+    return cached_page_response(page, encoding)
+
+@timed(RENDER_SECONDS)
+def render_listing_page(source):
+    """Renders one page of the job list for the request's query parameters (400 if they are invalid)."""
+    try:
+        page, next_cursor, filters = get_listing_page(source)
+    except ValueError as e:
+        abort(400, description=str(e))
+    next_url = url_for('list_jobs', cursor=next_cursor, page_size=request.args.get('page_size'), **filters) if next_cursor else None
+    # The 'jobs' variable (one page of Job objects) and 'file_error' will be available in jobs.html
+    return render_template('jobs.html', jobs=page, file_error=None, filters=filters,
+                           filter_choices={field: source.choices(field) for field in ('category', 'job_type')},
+                           next_url=next_url, is_first_page=not request.args.get('cursor'))
+
+@app.route('/jobs.json')
+def list_jobs_json():
+    """
+    JSON twin of the job list: one page of jobs (newest first) for the same
+    category, job_type, location, published_after, page_size and cursor
+    parameters, with the cursor of the next page (null on the last one).
+    """
+    source = get_snapshot()
+    if source is None:
+        if JobListingIndex is None:
+            return jsonify({"error": "Job listing is not available."}), 503
+        jobs = get_current_jobs()
+        if not jobs:
+            return jsonify({"jobs": [], "next_cursor": None})
+        source = get_listing_index(jobs)
+    try:
+        page, next_cursor, _ = get_listing_page(source)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"jobs": [job_summary(job) for job in page], "next_cursor": next_cursor})
+
+@app.route('/facets.json')
+def facet_jobs_json():
+    """
+    Faceted job list. Each of category, job_type, location and salary_band may be
+    repeated (?category=Design&category=Data): values of one facet are OR-ed and
+    facets are AND-ed. Returns one page of matching jobs (newest first, with the
+    same cursor and page_size parameters as /jobs.json), the total number of
+    matches and the per-value counts of every facet. Optional ?min_salary= and
+    ?max_salary= bound the annual salary, and ?sort=salary lists the best paid
+    jobs first (only jobs with a salary amount).
+    """
+    if FacetIndex is None or JobListingIndex is None:
+        return jsonify({"error": "Faceted search is not available."}), 503
+    source = get_snapshot()
+    if source is None:
+        jobs = get_current_jobs()
+        if not jobs:
+            return jsonify({"jobs": [], "next_cursor": None, "total": 0, "facets": {facet: [] for facet in FACETS}})
+        source = get_listing_index(jobs)
+
+    index = get_facet_index(source)
+    selections = {facet: request.args.getlist(facet) for facet in FACETS if request.args.getlist(facet)}
+    try:
+        page, next_cursor, total, counts = index.query(
+            selections, cursor=request.args.get('cursor') or None,
+            page_size=request.args.get('page_size', DEFAULT_PAGE_SIZE, type=int),
+            min_salary=request.args.get('min_salary', type=float), max_salary=request.args.get('max_salary', type=float),
+            sort=request.args.get('sort', 'date'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    facets = {
+        facet: [{"value": value, "label": index.labels[facet].get(value, value), "count": count}
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))]
+        for facet, values in counts.items()
+    }
+    return jsonify({"jobs": [job_summary(job) for job in page], "next_cursor": next_cursor,
+                    "total": total, "facets": facets})
+
+@app.route('/search')
+def search_jobs():
+    """
+    Full-text job search. Returns the top-k jobs for ?q= as JSON, ranked by BM25.
+    Optional ?k= sets the number of results (default 20, max 100). Misspelled
+    terms are matched to close indexed terms unless ?fuzzy=0; the applied
+    corrections are returned alongside the results. When serving SQLite without
+    a persisted search index, the database's FTS5 index answers instead (exact
+    terms only, so no corrections).
+    """
+    if SearchIndex is None:
+        return jsonify({"error": "Search is not available."}), 503
+
+    query = request.args.get('q', '').strip()
+    k = min(max(request.args.get('k', 20, type=int), 1), 100)
+    fuzzy = request.args.get('fuzzy', '1') != '0'
+    if not query:
+        return jsonify({"query": query, "corrections": {}, "results": []})
+
+    index = search_index_cache.get()
+    snapshot = get_snapshot()
+    if index is not None and snapshot is not None:
+        # Both are shared files, so this process never has to load the job list
+        def contains(job_id):
+            return snapshot.find_row(job_id) is not None
+        def lookup(job_id):
+            return snapshot.job(snapshot.find_row(job_id))
+    else:
+        jobs = get_current_jobs()
+        if not jobs:
+            return jsonify({"query": query, "corrections": {}, "results": []})
+        jobs_by_id = job_store.get_jobs_by_id() if job_store is not None else {job.id: job for job in jobs}
+        contains, lookup = jobs_by_id.__contains__, jobs_by_id.__getitem__
+        if index is None and STORAGE_BACKEND == "sqlite" and search_jobs_in_db is not None:
+            # The database keeps its own full-text index, so don't build one in memory
+            results = []
+            for job_id, score in search_jobs_in_db(query, JOBS_DB_FILEPATH, k=k):
+                if contains(job_id):
+                    result = job_summary(lookup(job_id))
+                    result['score'] = round(score, 4)
+                    results.append(result)
+            return jsonify({"query": query, "corrections": {}, "results": results})
+        index = get_search_index(jobs)
+
+    # The index may briefly lag the job data during an update, so only return jobs we can show
+    expansions = index.expand_query(query, None if fuzzy else 0)
+    corrections = {token: [term for term, _ in matches] for token, matches in expansions.items()
+                   if matches and matches[0][1] > 0}
+    hits = index.search(query, k=k, allowed=contains, expansions=expansions)
+    results = []
+    for job_id, score in hits:
+        result = job_summary(lookup(job_id))
+        result['score'] = round(score, 4)
+        results.append(result)
+    return jsonify({"query": query, "corrections": corrections, "results": results})
+
+@app.route('/jobs/<int:job_id>/similar')
+def similar_jobs(job_id):
+    """
+    Jobs most similar to a job (TF-IDF cosine over title, category and
+    description) as JSON, best first. Optional ?k= sets the number of
+    results (default 10, max 50).
+    """
+    index = similarity_index_cache.get() if similarity_index_cache is not None else None
+    if index is None:
+        return jsonify({"error": "Similar jobs are not available."}), 503
+    k = min(max(request.args.get('k', DEFAULT_SIMILAR_K, type=int), 1), MAX_SIMILAR_K)
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        def contains(other_id):
+            return snapshot.find_row(other_id) is not None
+        def lookup(other_id):
+            return snapshot.job(snapshot.find_row(other_id))
+    else:
+        jobs = get_current_jobs() or []
+        jobs_by_id = job_store.get_jobs_by_id() if job_store is not None else {job.id: job for job in jobs}
+        contains, lookup = jobs_by_id.__contains__, jobs_by_id.__getitem__
+
+    # The index may briefly lag the job data during an update, so only return jobs we can show
+    hits = index.similar(job_id, k=k, allowed=contains) if contains(job_id) else None
+    if hits is None:
+        return jsonify({"error": f"Job {job_id} not found."}), 404
+    results = []
+    for other_id, score in hits:
+        result = job_summary(lookup(other_id))
+        result['score'] = round(score, 4)
+        results.append(result)
+    return jsonify({"job_id": job_id, "results": results})
+
+def iter_listing(source, filters, published_after):
+    """Yields every job of a listing source matching the filters, newest first, one page at a time."""
+    cursor = None
+    while True:
+        page, cursor = source.page(
+            category=filters.get('category'), job_type=filters.get('job_type'), location=filters.get('location'),
+            published_after=published_after, cursor=cursor, page_size=MAX_PAGE_SIZE)
+        yield from page
+        if cursor is None:
+            return
+
+@app.route('/api/jobs')
+def export_jobs_ndjson():
+    """
+    Streams all jobs matching the category, job_type, location and
+    published_after filters (newest first) as newline-delimited JSON, one
+    record per line in the format of the jobs JSON file. ?fields=id,title,...
+    limits each record to those fields (default: all, with description_html),
+    and ?since= (a date or ISO 8601 datetime) to jobs added or changed at or
+    after it (see job_export.changed_at), for incremental sync. Removed jobs
+    are not reported. Gzip-compressed if the client accepts it.
+    """
+    if iter_ndjson is None or JobListingIndex is None:
+        return jsonify({"error": "The jobs export is not available."}), 503
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        filters, published_after = get_listing_filters()
+        since = request.args.get('since', '').strip()
+        since = parse_published_after(since) if since else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    source = get_snapshot()
+    if source is None:
+        jobs = get_current_jobs()
+        source = get_listing_index(jobs) if jobs else None
+    jobs = iter_listing(source, filters, published_after) if source is not None else iter(())
+    if since is not None:
+        jobs = (job for job in jobs if is_changed_since(job, since))
+    # Records are serialized as the response is sent, so nothing but the current block is held
+    body = iter_ndjson(jobs, fields, job_store.get_description if job_store is not None else None)
+    if request.accept_encodings.quality('gzip') > 0:
+        response = Response(gzip_stream(body), mimetype='application/x-ndjson')
+        response.headers['Content-Encoding'] = 'gzip'
     else:
-        jobs = load_jobs_from_json(JOBS_JSON_FILEPATH)
-        file_error = None
-        if not jobs and os.path.exists(JOBS_JSON_FILEPATH):
-             logging.info(f"Loaded jobs from {JOBS_JSON_FILEPATH}, but the list is empty or an error occurred during loading (check logs).")
-        elif jobs:
-             logging.info(f"Successfully loaded {len(jobs)} jobs for display.")
+        response = Response(body, mimetype='application/x-ndjson')
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
+@app.route('/metrics')
+def export_metrics():
+    """
+    This process's pipeline metrics (load, render and, when run in-process,
+    fetch/process timings and counters) in the Prometheus text format.
+    """
+    if REGISTRY is None:
+        return jsonify({"error": "Metrics are not available."}), 503
+    return Response(REGISTRY.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
-    # The 'jobs' variable (a list of Job objects) and 'file_error' will be available in jobs.html
-    return render_template('jobs.html', jobs=jobs, file_error=file_error)
+# Not in the spawned workers of job_processor's process pool, which import this module
+# again when the app is run as a script
+background_refresher = start_background_refresh() if BACKGROUND_REFRESH and multiprocessing.parent_process() is None else None
 
 if __name__ == '__main__':
     # Creates the 'templates' directory if it doesn't exist, as Flask expects it.
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import math
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from job_storage import iter_json_records, JSON_READ_CHUNK_SIZE
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_storage.py is accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Source adapter for the atlas jobs collection export (Mongo extended JSON, as written
+# by mongoexport --jsonArray or line by line). Records are streamed and mapped onto the
+# raw job shape of the Remotive API, so they go through process_api_jobs like a fetch.
+EXPORT_FILEPATH = "atlas-jobs_temp_jobs_export.json"
+EXPORT_BATCH_SIZE = 500
+# Preferred source when a record lists several (its id and URL are used for the job)
+PRIMARY_SOURCE = "remotive"
+# Job.source of imported jobs: the feed they were stored from, whichever sites the record lists
+EXPORT_SOURCE = "export"
+# Raw job fields that may be None; missing required ones are left out of the raw job
+_OPTIONAL_FIELDS = ('candidate_required_location', 'salary', 'job_type', 'first_seen', 'last_seen')
+
+
+def _unwrap(value: Any) -> Any:
+    """Unwraps Mongo extended JSON scalars ({"$oid": ...}, {"$date": ...}, {"$numberLong": ...})."""
+    if isinstance(value, dict) and len(value) == 1:
+        (key, inner), = value.items()
+        if key == '$date':
+            if isinstance(inner, dict): # Canonical mode: {"$date": {"$numberLong": "<ms>"}}
+                inner = int(_unwrap(inner))
+            if isinstance(inner, (int, float)):
+                return datetime.fromtimestamp(inner / 1000, timezone.utc)
+            return datetime.fromisoformat(inner.replace('Z', '+00:00'))
+        if key in ('$numberLong', '$numberInt'):
+            return int(inner)
+        if key == '$numberDouble':
+            return float(inner)
+        if key == '$oid':
+            return inner
+    return value
+
+def _export_job_id(record: Dict, source: Optional[str]) -> Optional[int]:
+    """
+    The integer job id: the source's own numeric id (for Remotive that is the
+    id the API returns), else a stable 63-bit id derived from the record id.
+    """
+    source_id = (record.get('sourceIds') or {}).get(source) if source else None
+    if source_id is not None and str(source_id).isdigit():
+        return int(source_id)
+    record_id = record.get('id') or _unwrap(record.get('_id'))
+    if not record_id:
+        return None
+    return int.from_bytes(hashlib.blake2b(str(record_id).encode('utf-8'), digest_size=8).digest(), 'big') >> 1
+
+def _salary_from_range(salary_range: Any) -> Optional[str]:
+    """
+    A salary string for a structured salaryRange ({"min", "max", "currency",
+    "period", "note"}), in a form salary_parser.parse_salary reads back the
+    same, or None if it has no amount (the export writes NaN for those).
+    """
+    if not isinstance(salary_range, dict):
+        return None
+    amounts = [_unwrap(salary_range.get(key)) for key in ('min', 'max')]
+    amounts = [amount for amount in amounts if isinstance(amount, (int, float)) and not math.isnan(amount)]
+    if not amounts:
+        return None
+    salary = " - ".join(f"{int(amount):,}" if float(amount).is_integer() else f"{amount:,.2f}" for amount in amounts)
+    if salary_range.get('currency'):
+        salary += f" {salary_range['currency']}"
+    return salary + f" per {salary_range.get('period') or 'year'}"
+
+def export_record_to_raw_job(record: Dict) -> Optional[Dict]:
+    """
+    Maps one export record onto the raw job dict process_api_jobs expects.
+
+    The export has no publication date, so firstSeen stands in for it (as naive
+    UTC, like the API's timestamps). The salary string is kept as the feed
+    wrote it, since the store persists salaries as strings and parses them on
+    load; salaryRange only fills in a salary for records without one. Fields process_api_jobs validates are
+    left out when missing rather than guessed, so such records are skipped and
+    counted there.
+
+    Returns:
+        The raw job dict, or None if the record is not a JSON object.
+    """
+    if not isinstance(record, dict):
+        return None
+    sources = record.get('sources') or list((record.get('sourceUrls') or {}).keys())
+    source = PRIMARY_SOURCE if PRIMARY_SOURCE in sources else (sources[0] if sources else None)
+    first_seen = _unwrap(record.get('firstSeen'))
+    last_seen = _unwrap(record.get('lastSeen'))
+
+    url = (record.get('sourceUrls') or {}).get(source) if source else None
+    raw_job = {
+        'id': _export_job_id(record, source),
+        'title': record.get('title'),
+        'company_name': record.get('company'),
+        'url': url or None,
+        'category': record.get('category'),
+        'publication_date': first_seen.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+                            if isinstance(first_seen, datetime) else None,
+        'description': record.get('description'),
+        'candidate_required_location': record.get('location'),
+        'salary': record.get('salary') or _salary_from_range(record.get('salaryRange')),
+        'job_type': record.get('jobType'),
+        'first_seen': first_seen,
+        'last_seen': last_seen,
+        'source': EXPORT_SOURCE,
+    }
+    return {key: value for key, value in raw_job.items() if value is not None or key in _OPTIONAL_FIELDS}
+
+def iter_raw_jobs_from_export(filepath: str = EXPORT_FILEPATH, chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Streams raw job dicts from an export file (JSON array or one record per
+    line) without loading the whole file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If a JSON array export is malformed or truncated.
+    """
+    for record in iter_json_records(filepath, chunk_size):
+        try:
+            raw_job = export_record_to_raw_job(record)
+        except (ValueError, TypeError, AttributeError) as e:
+            logging.warning(f"Skipping export record with malformed extended JSON: {e}")
+            continue
+        if raw_job is not None:
+            yield raw_job
+
+def fetch_raw_job_batches(filepath: str = EXPORT_FILEPATH, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    The export counterpart of remotive_client.fetch_raw_jobs: yields the raw
+    jobs of an export in lists of at most batch_size, so only one batch is in
+    memory at a time.
+    """
+    records = iter_raw_jobs_from_export(filepath)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    count = 0
+    for batch in fetch_raw_job_batches(EXPORT_FILEPATH, batch_size=50):
+        count += len(batch)
+    elapsed = time.perf_counter() - start
+    logging.info(f"Streamed {count} raw jobs from {EXPORT_FILEPATH} in {elapsed:.2f}s ({count / elapsed:,.0f} records/s)")
+    if count:
+        sample = next(iter_raw_jobs_from_export(EXPORT_FILEPATH))
+        sample['description'] = (sample.get('description') or '')[:60] + '...'
+        logging.info(f"First raw job: {sample}")
@@ -0,0 +1,171 @@
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_EDIT_DISTANCE = 2
+# Only the first PREFIX_LENGTH characters of a term are used for delete
+# generation (as in SymSpell); this bounds index size for long words while
+# candidates are still verified against the full term.
+PREFIX_LENGTH = 7
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment (Damerau-Levenshtein with adjacent transpositions) distance.
+
+    Returns:
+        The distance, or max_distance + 1 as soon as it is known to exceed max_distance.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+def generate_deletes(word: str, max_edit_distance: int, prefix_length: int = PREFIX_LENGTH) -> Set[str]:
+    """
+    Returns the strings obtained by deleting up to max_edit_distance characters
+    from the first prefix_length characters of word (including the prefix itself).
+    """
+    word = word[:prefix_length]
+    deletes = {word}
+    frontier = {word}
+    for _ in range(max_edit_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            if len(candidate) <= 1:
+                continue
+            for i in range(len(candidate)):
+                next_frontier.add(candidate[:i] + candidate[i + 1:])
+        next_frontier -= deletes
+        deletes |= next_frontier
+        frontier = next_frontier
+    return deletes
+
+
+def allowed_distance(token: str, max_edit_distance: int) -> int:
+    """Scales the allowed edit distance with token length: short tokens get fewer edits."""
+    if len(token) <= 2:
+        return 0
+    if len(token) <= 5:
+        return min(1, max_edit_distance)
+    return max_edit_distance
+
+
+class FuzzyVocabulary:
+    """
+    Symmetric-delete (SymSpell-style) index for typo-tolerant term lookup.
+
+    Every term is indexed under all strings obtained by deleting up to
+    max_edit_distance characters from its prefix. A misspelled token then only
+    needs its own deletes looked up - the candidates are the union of those
+    buckets - instead of comparing it against the whole vocabulary.
+    Terms can be added and removed incrementally.
+    """
+
+    def __init__(self, max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.term_counts: Dict[str, int] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.term_counts)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.term_counts
+
+    def _generate_deletes(self, word: str) -> Set[str]:
+        return generate_deletes(word, self.max_edit_distance, self.prefix_length)
+
+    def add(self, term: str, count: int = 1) -> None:
+        """Adds occurrences of a term, indexing it if it is new."""
+        if term in self.term_counts:
+            self.term_counts[term] += count
+            return
+        self.term_counts[term] = count
+        for delete in self._generate_deletes(term):
+            self._deletes.setdefault(delete, set()).add(term)
+
+    def add_terms(self, terms: Iterable[str]) -> None:
+        for term in terms:
+            self.add(term)
+
+    def remove(self, term: str, count: int = None) -> None:
+        """
+        Removes occurrences of a term (all of them if count is None),
+        dropping it from the index when none are left.
+        """
+        if term not in self.term_counts:
+            return
+        if count is not None and self.term_counts[term] > count:
+            self.term_counts[term] -= count
+            return
+        del self.term_counts[term]
+        for delete in self._generate_deletes(term):
+            bucket = self._deletes.get(delete)
+            if bucket is not None:
+                bucket.discard(term)
+                if not bucket:
+                    del self._deletes[delete]
+
+    def lookup(self, token: str, max_edit_distance: int = None, max_results: int = 3) -> List[Tuple[str, int]]:
+        """
+        Finds vocabulary terms within the allowed edit distance of token.
+
+        Args:
+            token: The (possibly misspelled) query token.
+            max_edit_distance: Optional. Upper bound on edits, never more than the
+                index was built for. Shorter tokens get fewer (see allowed_distance).
+            max_results: Optional. Maximum number of candidates to return.
+
+        Returns:
+            (term, distance) tuples, closest and then most frequent first. An exact
+            match is returned alone with distance 0.
+        """
+        if token in self.term_counts:
+            return [(token, 0)]
+        limit = min(self.max_edit_distance if max_edit_distance is None else max_edit_distance, self.max_edit_distance)
+        limit = allowed_distance(token, limit)
+        if limit == 0:
+            return []
+
+        candidates: Set[str] = set()
+        for delete in self._generate_deletes(token):
+            candidates.update(self._deletes.get(delete, ()))
+
+        matches = []
+        for term in candidates:
+            distance = edit_distance(token, term, limit)
+            if distance <= limit:
+                matches.append((term, distance))
+        matches.sort(key=lambda match: (match[1], -self.term_counts[match[0]], match[0]))
+        return matches[:max_results]
+
+
+if __name__ == '__main__':
+    vocabulary = FuzzyVocabulary()
+    vocabulary.add_terms(["python", "python", "django", "engineer", "designer", "marketing", "manager", "javascript"])
+    for typo in ["pyhton", "enginer", "managr", "javascirpt", "xyz", "dj"]:
+        logging.info(f"{typo!r} -> {vocabulary.lookup(typo)}")
+    vocabulary.remove("python")
+    logging.info(f"'pyhton' after removing 'python' -> {vocabulary.lookup('pyhton')} (expected [])")
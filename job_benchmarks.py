@@ -0,0 +1,336 @@
+import argparse
+import gc
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from job_processor import process_api_jobs, _parse_api_date
+    from job_storage import save_jobs_to_json, load_jobs_from_json, iter_json_records
+    from salary_parser import parse_salary
+    from remotive_client import fetch_raw_jobs
+    from remotive_stub_server import StubRemotiveServer
+    from export_source import EXPORT_FILEPATH
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_storage.py and remotive_stub_server.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Benchmarks for the ingest and serving path on synthetic corpora. Every run writes one
+# JSON file (timings, peak memory, environment and commit), and --compare checks a run
+# against an earlier file, so slowdowns between commits show up as a non-zero exit.
+BENCHMARK_RESULTS_DIR = os.path.join("data", "benchmarks")
+DEFAULT_SIZES = (1_000, 10_000)
+DEFAULT_SEED = 1234
+DEFAULT_REPEAT = 3
+# A benchmark counts as regressed when its best time grows by more than this factor
+REGRESSION_THRESHOLD = 1.25
+# The stub server re-encodes the whole feed per request, so fetches are capped to keep runs short
+MAX_FETCH_JOBS = 10_000
+DESCRIPTION_POOL_SIZE = 256
+
+
+@dataclass
+class CorpusProfile:
+    """
+    Field distributions a synthetic corpus is drawn from: values with their
+    observed weights, the titles and salary strings seen, and a pool of
+    descriptions whose lengths follow the observed ones.
+    """
+    categories: Counter
+    job_types: Counter
+    locations: Counter
+    titles: List[str]
+    salaries: List[str]
+    salary_share: float
+    descriptions: List[str]
+    company_share: float
+    source: str = "built-in"
+    source_sha1: Optional[str] = None
+
+
+def _default_profile() -> CorpusProfile:
+    descriptions = [f"<p>{'We are hiring. ' * (20 * (i % 8 + 1))}</p>" for i in range(16)]
+    return CorpusProfile(
+        categories=Counter({"Software Development": 6, "Design": 2, "Marketing": 2, "Customer Service": 2, "Data": 1}),
+        job_types=Counter({"full_time": 9, "contract": 1}),
+        locations=Counter({"USA": 5, "Worldwide": 2, "Europe": 1, "Canada": 1}),
+        titles=["Software Engineer", "Product Manager", "UI Designer", "Marketing Manager", "Data Engineer"],
+        salaries=["$100k - $120k", "$50/hour", "competitive"], salary_share=0.5,
+        descriptions=descriptions, company_share=0.9)
+
+def load_corpus_profile(export_filepath: str = EXPORT_FILEPATH) -> CorpusProfile:
+    """
+    Derives a CorpusProfile from a jobs collection export (see export_source.py),
+    or returns a small built-in profile if the export cannot be read.
+    """
+    try:
+        with open(export_filepath, 'rb') as f:
+            source_sha1 = hashlib.sha1(f.read()).hexdigest()
+        records = [record for record in iter_json_records(export_filepath) if isinstance(record, dict)]
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read {export_filepath} ({e}); using the built-in corpus profile.")
+        return _default_profile()
+    if not records:
+        return _default_profile()
+
+    salaries = [record['salary'] for record in records if record.get('salary')]
+    descriptions = [record['description'] for record in records if record.get('description')]
+    return CorpusProfile(
+        categories=Counter(record.get('category') or "Other" for record in records),
+        job_types=Counter(record.get('jobType') or "full_time" for record in records),
+        locations=Counter(record.get('location') or "Worldwide" for record in records),
+        titles=[record['title'] for record in records if record.get('title')],
+        salaries=salaries, salary_share=len(salaries) / len(records),
+        descriptions=descriptions or _default_profile().descriptions,
+        company_share=len({record.get('company') for record in records}) / len(records),
+        source=export_filepath, source_sha1=source_sha1)
+
+def _weighted(counter: Counter) -> Tuple[List, List[int]]:
+    values = sorted(counter, key=str)
+    return values, [counter[value] for value in values]
+
+def generate_raw_jobs(count: int, seed: int = DEFAULT_SEED, profile: Optional[CorpusProfile] = None,
+                      max_description_chars: Optional[int] = None) -> List[Dict]:
+    """
+    Builds count raw jobs shaped like the Remotive API's "jobs" entries, with
+    categories, job types, locations, titles, salaries and description
+    lengths drawn from profile. The same seed and profile give the same corpus.
+
+    Descriptions come from a pool shared between jobs, so even 1M jobs stay
+    small in memory until they are processed; max_description_chars truncates
+    them (saved files for large corpora are otherwise dominated by descriptions).
+    """
+    profile = profile or load_corpus_profile()
+    rng = random.Random(seed)
+    categories, category_weights = _weighted(profile.categories)
+    job_types, job_type_weights = _weighted(profile.job_types)
+    locations, location_weights = _weighted(profile.locations)
+    descriptions = [rng.choice(profile.descriptions)[:max_description_chars] for _ in range(DESCRIPTION_POOL_SIZE)]
+    company_count = max(1, int(count * profile.company_share))
+    newest = datetime(2025, 1, 1)
+
+    jobs = []
+    for i in range(count):
+        job_id = 1_000_000 + i
+        published = newest - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+        jobs.append({
+            "id": job_id,
+            "url": f"https://remotive.com/remote-jobs/job-{job_id}",
+            "title": rng.choice(profile.titles),
+            "company_name": f"Company {rng.randrange(company_count)}",
+            "category": rng.choices(categories, category_weights)[0],
+            "job_type": rng.choices(job_types, job_type_weights)[0],
+            "publication_date": published.isoformat(),
+            "candidate_required_location": rng.choices(locations, location_weights)[0],
+            "salary": rng.choice(profile.salaries) if profile.salaries and rng.random() < profile.salary_share else "",
+            "description": rng.choice(descriptions),
+        })
+    return jobs
+
+
+def measure(func: Callable, repeat: int = DEFAULT_REPEAT, setup: Optional[Callable] = None,
+            memory: bool = True) -> Tuple[Dict, object]:
+    """
+    Times func() repeat times, then runs it once more under tracemalloc for its
+    peak Python memory (tracing slows code down, so it is kept out of the timings).
+
+    Returns:
+        ({best_seconds, median_seconds, runs, peak_bytes}, result of the last timed call).
+    """
+    times, result = [], None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"best_seconds": round(min(times), 6), "median_seconds": round(statistics.median(times), 6),
+            "runs": repeat, "peak_bytes": peak}, result
+
+def _clear_parse_caches() -> None:
+    # Each update run starts in a fresh process, so the date/salary caches start cold
+    _parse_api_date.cache_clear()
+    parse_salary.cache_clear()
+
+def bench_process(raw_jobs: List[Dict], repeat: int, workers: Optional[int] = None) -> Tuple[Dict, List]:
+    stats, jobs = measure(lambda: process_api_jobs(raw_jobs, workers=workers), repeat, setup=_clear_parse_caches)
+    stats["records"] = len(raw_jobs)
+    stats["workers"] = workers or os.cpu_count()
+    return stats, jobs
+
+def bench_save(jobs: List, workdir: str, repeat: int) -> Tuple[Dict, str]:
+    filepath = os.path.join(workdir, "jobs.json")
+    stats, _ = measure(lambda: save_jobs_to_json(jobs, filepath, split_descriptions=True), repeat)
+    stats["records"] = len(jobs)
+    stats["file_bytes"] = os.path.getsize(filepath)
+    return stats, filepath
+
+def bench_load(filepath: str, repeat: int) -> Tuple[Dict, List]:
+    # As the web app loads it: descriptions stay in the side file
+    stats, jobs = measure(lambda: load_jobs_from_json(filepath, lazy_descriptions=True), repeat)
+    stats["records"] = len(jobs)
+    return stats, jobs
+
+def bench_render(jobs: List, repeat: int) -> Optional[Dict]:
+    """Renders the first list page through app.render_listing_page, with cold and warm job card caches."""
+    try:
+        import app as web_app
+        from job_listing import JobListingIndex
+    except ImportError as e:
+        logging.warning(f"Skipping the render benchmark: {e}")
+        return None
+    source = JobListingIndex(jobs)
+    results = {}
+    with web_app.app.test_request_context('/'):
+        fragment_cache = web_app.fragment_cache
+        cold_setup = fragment_cache.clear if fragment_cache is not None else None
+        results["cold"], body = measure(lambda: web_app.render_listing_page(source), repeat, setup=cold_setup)
+        if fragment_cache is not None:
+            results["warm"], _ = measure(lambda: web_app.render_listing_page(source), repeat)
+    results["page_bytes"] = len(body.encode('utf-8'))
+    return results
+
+def bench_fetch(raw_jobs: List[Dict], repeat: int) -> Dict:
+    """Fetches the corpus (at most MAX_FETCH_JOBS jobs) from a local stub server in this process."""
+    feed = raw_jobs[:MAX_FETCH_JOBS]
+    with StubRemotiveServer(feed) as stub:
+        stats, fetched = measure(lambda: fetch_raw_jobs(base_url=stub.url), repeat)
+    stats["records"] = len(fetched or [])
+    stats["response_bytes"] = len(json.dumps({"0-legal-notice": "Stub Remotive API", "job-count": len(feed), "jobs": feed}).encode('utf-8'))
+    return stats
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed: int = DEFAULT_SEED, repeat: int = DEFAULT_REPEAT,
+                   workers: Optional[int] = None, max_description_chars: Optional[int] = None,
+                   profile: Optional[CorpusProfile] = None) -> Dict:
+    """
+    Runs every benchmark for each corpus size.
+
+    Returns:
+        {"environment": {...}, "corpus": {...}, "results": {size: {benchmark: stats}}},
+        ready to be written as JSON.
+    """
+    profile = profile or load_corpus_profile()
+    report = {
+        "environment": {"commit": _git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count(), "started_at": datetime.now(timezone.utc).isoformat()},
+        "corpus": {"seed": seed, "profile": profile.source, "profile_sha1": profile.source_sha1,
+                   "max_description_chars": max_description_chars},
+        "results": {},
+    }
+    for size in sizes:
+        logging.info(f"--- Benchmarking a corpus of {size:,} jobs ---")
+        raw_jobs = generate_raw_jobs(size, seed, profile, max_description_chars)
+        results = {}
+        with tempfile.TemporaryDirectory(prefix="atlas-bench-") as workdir:
+            results["process_api_jobs"], jobs = bench_process(raw_jobs, repeat, workers)
+            results["save_jobs_to_json"], filepath = bench_save(jobs, workdir, repeat)
+            del jobs
+            results["load_jobs_from_json"], loaded = bench_load(filepath, repeat)
+        render = bench_render(loaded, repeat)
+        if render is not None:
+            results["render_list_jobs"] = render
+        del loaded
+        results["fetch_raw_jobs"] = bench_fetch(raw_jobs, repeat)
+        for name, stats in results.items():
+            logging.info(f"{size:>9,} {name}: {json.dumps(stats)}")
+        report["results"][str(size)] = results
+    return report
+
+def _timings(report: Dict) -> Dict[Tuple[str, str], float]:
+    """(size, benchmark) -> best seconds, with render variants as 'render_list_jobs.cold' etc."""
+    timings = {}
+    for size, results in report.get("results", {}).items():
+        for name, stats in results.items():
+            if "best_seconds" in stats:
+                timings[(size, name)] = stats["best_seconds"]
+            else:
+                for variant, variant_stats in stats.items():
+                    if isinstance(variant_stats, dict) and "best_seconds" in variant_stats:
+                        timings[(size, f"{name}.{variant}")] = variant_stats["best_seconds"]
+    return timings
+
+def compare_reports(report: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[Dict]:
+    """
+    Lists the benchmarks whose best time grew by more than threshold relative
+    to the baseline (only sizes and benchmarks present in both are compared).
+    """
+    current, previous = _timings(report), _timings(baseline)
+    regressions = []
+    for key in sorted(current.keys() & previous.keys(), key=lambda key: (int(key[0]), key[1])):
+        if previous[key] > 0 and current[key] / previous[key] > threshold:
+            regressions.append({"size": int(key[0]), "benchmark": key[1], "baseline_seconds": previous[key],
+                                "seconds": current[key], "ratio": round(current[key] / previous[key], 3)})
+    return regressions
+
+def write_report(report: Dict, results_dir: str = BENCHMARK_RESULTS_DIR) -> str:
+    """Writes a report to results_dir as <UTC timestamp>-<short commit>.json and returns its path."""
+    os.makedirs(results_dir, exist_ok=True)
+    commit = (report["environment"].get("commit") or "nocommit")[:10]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filepath = os.path.join(results_dir, f"{stamp}-{commit}.json")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return filepath
+
+
+if __name__ == '__main__':
+    # python job_benchmarks.py [--sizes 1000 10000 100000 1000000] [--compare data/benchmarks/<earlier>.json]
+    parser = argparse.ArgumentParser(description="Benchmark the job pipeline on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--workers", type=int, default=None, help="process_api_jobs worker processes (default: one per CPU)")
+    parser.add_argument("--max-description-chars", type=int, default=None)
+    parser.add_argument("--results-dir", default=BENCHMARK_RESULTS_DIR)
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file; exit 1 if a benchmark regressed")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.seed, args.repeat, args.workers, args.max_description_chars)
+    logging.info(f"Results written to {write_report(report, args.results_dir)}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.threshold)
+        for regression in regressions:
+            logging.warning(f"Regression: {json.dumps(regression)}")
+        if regressions:
+            sys.exit(1)
+        logging.info(f"No benchmark regressed by more than {args.threshold}x against {args.compare}.")
@@ -0,0 +1,509 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from job_processor import Job, REMOTIVE_SOURCE
+    from job_storage import iter_jobs_from_json, DATA_DIR, JOBS_JSON_FILEPATH
+    from job_journal import MergeResult, JobId, job_content_hash, journal_filepath, load_jobs_with_journal
+    from text_utils import strip_html, tokenize
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_storage.py and job_journal.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+JOBS_DB_FILEPATH = os.path.join(DATA_DIR, "remotive_jobs.db")
+DB_FILE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# How long a connection waits for another writer's lock before giving up
+BUSY_TIMEOUT_SECONDS = 10
+
+# publication_date is stored twice: as the original ISO string (so it round-trips
+# exactly, timezone included) and as a UTC timestamp for indexed ordering/filtering.
+# jobs_fts is an external-content FTS5 index over the title and the plain text
+# of the description, kept in sync by triggers. sources holds Job.sources as JSON.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    company_name TEXT NOT NULL,
+    remotive_url TEXT NOT NULL,
+    category TEXT NOT NULL,
+    publication_date TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    description_html TEXT,
+    description_text TEXT NOT NULL DEFAULT '',
+    candidate_required_location TEXT,
+    salary TEXT,
+    job_type TEXT,
+    first_seen TEXT,
+    last_seen TEXT,
+    sources TEXT,
+    source TEXT,
+    last_changed TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_category ON jobs (category, published_at);
+CREATE INDEX IF NOT EXISTS jobs_job_type ON jobs (job_type, published_at);
+CREATE INDEX IF NOT EXISTS jobs_published_at ON jobs (published_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, description_text, content='jobs', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, title, description_text) VALUES (new.id, new.title, new.description_text);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, description_text) VALUES ('delete', old.id, old.title, old.description_text);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, description_text ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, description_text) VALUES ('delete', old.id, old.title, old.description_text);
+    INSERT INTO jobs_fts (rowid, title, description_text) VALUES (new.id, new.title, new.description_text);
+END;
+"""
+
+_JOB_COLUMNS = ('id', 'title', 'company_name', 'remotive_url', 'category', 'publication_date', 'published_at',
+                'description_html', 'description_text', 'candidate_required_location', 'salary', 'job_type',
+                'first_seen', 'last_seen', 'sources', 'source', 'last_changed', 'content_hash')
+
+# Columns added to the jobs table after its first release, and their types;
+# connect() adds any that an existing database is missing
+_ADDED_COLUMNS = {'sources': 'TEXT', 'source': 'TEXT', 'last_changed': 'TEXT'}
+
+# Re-inserting a known id keeps its first_seen, and its last_changed unless the content
+# changed, like JobJournal.merge
+_UPSERT_SQL = (
+    f"INSERT INTO jobs ({', '.join(_JOB_COLUMNS)}) VALUES ({', '.join('?' * len(_JOB_COLUMNS))}) "
+    "ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in _JOB_COLUMNS
+                if column not in ('id', 'first_seen', 'last_changed', 'content_hash'))
+    + ", first_seen = COALESCE(jobs.first_seen, excluded.first_seen)"
+    + ", last_changed = CASE WHEN jobs.content_hash = excluded.content_hash THEN jobs.last_changed"
+      " ELSE excluded.last_changed END"
+    + ", content_hash = excluded.content_hash"
+)
+
+_SELECT_COLUMNS = ('id', 'title', 'company_name', 'remotive_url', 'category', 'publication_date',
+                   'candidate_required_location', 'salary', 'job_type', 'first_seen', 'last_seen', 'sources', 'source', 'last_changed')
+
+# BM25 weights for the title and description columns of jobs_fts (mirrors job_search.FIELD_BOOSTS)
+FTS_COLUMN_WEIGHTS = (3.0, 1.0)
+
+
+def is_db_filepath(filepath: str) -> bool:
+    """True if filepath names an SQLite job database rather than a JSON file."""
+    return filepath.endswith(DB_FILE_EXTENSIONS)
+
+def wal_filepath(filepath: str) -> str:
+    """Returns the write-ahead log next to a database; committed writes land here before a checkpoint."""
+    return filepath + "-wal"
+
+def connect(filepath: str = JOBS_DB_FILEPATH) -> sqlite3.Connection:
+    """
+    Opens the job database in WAL mode, creating the schema if needed.
+
+    In WAL mode readers see the last committed state and never block the
+    writer (or each other), so the web app can keep reading while
+    update_jobs.py writes.
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(filepath, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL") # Durable at checkpoints; WAL keeps the database consistent
+    conn.executescript(_SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for column, column_type in _ADDED_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+    return conn
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def _job_row(job: Job, content_hash: Optional[str] = None, description_text: Optional[str] = None,
+             changed_at: Optional[datetime] = None) -> Tuple:
+    """The jobs table row of a job; changed_at is stored as last_changed if the job has none."""
+    if description_text is None:
+        description_text = strip_html(job.description_html)
+    return (job.id, job.title, job.company_name, job.remotive_url, job.category,
+            job.publication_date.isoformat(), _timestamp(job.publication_date),
+            job.description_html, description_text,
+            job.candidate_required_location, job.salary, job.job_type,
+            _isoformat(job.first_seen), _isoformat(job.last_seen),
+            json.dumps(job.sources, ensure_ascii=False) if job.sources else None, job.source,
+            _isoformat(job.last_changed or changed_at),
+            content_hash or job_content_hash(job))
+
+def _job_from_row(row: Tuple, description_html: Optional[str]) -> Job:
+    (job_id, title, company_name, remotive_url, category, publication_date,
+     location, salary, job_type, first_seen, last_seen, sources, source, last_changed) = row
+    return Job(
+        id=job_id,
+        title=title,
+        company_name=company_name,
+        remotive_url=remotive_url,
+        category=category,
+        publication_date=datetime.fromisoformat(publication_date),
+        description_html=description_html,
+        candidate_required_location=location,
+        salary=salary,
+        job_type=job_type,
+        first_seen=datetime.fromisoformat(first_seen) if first_seen else None,
+        last_seen=datetime.fromisoformat(last_seen) if last_seen else None,
+        sources=json.loads(sources) if sources else None,
+        source=source,
+        last_changed=datetime.fromisoformat(last_changed) if last_changed else None
+    )
+
+def _delete_missing(conn: sqlite3.Connection, keep_ids: Iterable[JobId], source: Optional[str] = None) -> List[JobId]:
+    """
+    Deletes every job whose id is not in keep_ids (only jobs of that feed if
+    source is given) and returns the deleted ids.
+    """
+    where = "id NOT IN (SELECT value FROM json_each(?))"
+    params: Tuple = (json.dumps(list(keep_ids)),)
+    if source is not None:
+        where += " AND COALESCE(source, ?) = ?" # Rows stored before sources were recorded came from Remotive
+        params += (REMOTIVE_SOURCE, source)
+    removed = [row[0] for row in conn.execute(f"SELECT id FROM jobs WHERE {where}", params)]
+    conn.execute(f"DELETE FROM jobs WHERE {where}", params)
+    return removed
+
+def upsert_jobs(jobs: Iterable[Job], filepath: str = JOBS_DB_FILEPATH,
+                description_texts: Optional[Dict[JobId, str]] = None) -> bool:
+    """
+    Inserts or updates jobs by id, all in one transaction. Stored first_seen
+    values are kept and last_changed is set to now for new and changed rows;
+    description_texts is used as in save_jobs_to_db.
+
+    Returns:
+        True if the jobs were written, False otherwise (nothing is written then).
+    """
+    try:
+        conn = connect(filepath)
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                texts = description_texts or {}
+                changed_at = datetime.now(timezone.utc)
+                conn.executemany(_UPSERT_SQL, (_job_row(job, description_text=texts.get(job.id), changed_at=changed_at)
+                                               for job in jobs))
+        finally:
+            conn.close()
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"Error upserting jobs into {filepath}: {e}")
+        return False
+
+def save_jobs_to_db(jobs: List[Job], filepath: str = JOBS_DB_FILEPATH,
+                    description_texts: Optional[Dict[JobId, str]] = None) -> bool:
+    """
+    Makes the database hold exactly the given jobs - the counterpart of
+    save_jobs_to_json. Known ids are updated in place (keeping first_seen, and
+    last_changed unless their content changed) and jobs not in the list are
+    deleted, in a single transaction, so readers see either the old or the
+    new job set. last_changed is stored as the jobs carry it: only merges and
+    upserts stamp it, so migrated jobs without one keep none.
+
+    description_texts optionally maps job ids to their already extracted
+    plain-text descriptions (see job_processor.process_api_jobs_batch).
+
+    Returns:
+        True if saving was successful, False otherwise.
+    """
+    try:
+        conn = connect(filepath)
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                texts = description_texts or {}
+                conn.executemany(_UPSERT_SQL, (_job_row(job, description_text=texts.get(job.id)) for job in jobs))
+                _delete_missing(conn, (job.id for job in jobs))
+        finally:
+            conn.close()
+        logging.info(f"Successfully saved {len(jobs)} jobs to {filepath}")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"Error saving jobs to database {filepath}: {e}")
+        return False
+
+def merge_jobs_into_db(fetched_jobs: List[Job], filepath: str = JOBS_DB_FILEPATH,
+                       seen_at: Optional[datetime] = None,
+                       description_texts: Optional[Dict[JobId, str]] = None,
+                       source: str = REMOTIVE_SOURCE) -> Optional[MergeResult]:
+    """
+    Merges a complete, freshly fetched job list of one feed (source) into the
+    database, like JobJournal.merge: only new and changed rows are written
+    (detected by content hash), first_seen is kept, last_seen is bumped for
+    every fetched job, last_changed is set for new and changed ones and jobs
+    of that feed that vanished are deleted - all in one transaction. Jobs of
+    other feeds are kept.
+
+    description_texts is used as in save_jobs_to_db.
+
+    Returns:
+        A MergeResult describing the delta, or None if writing failed.
+    """
+    texts = description_texts or {}
+    seen_at = seen_at or datetime.now(timezone.utc)
+    fetched_by_id = {job.id: job for job in fetched_jobs} # Later duplicates win
+    result = MergeResult()
+    try:
+        conn = connect(filepath)
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                state = {job_id: (content_hash, first_seen, stored_source or REMOTIVE_SOURCE, last_changed)
+                         for job_id, content_hash, first_seen, stored_source, last_changed
+                         in conn.execute("SELECT id, content_hash, first_seen, source, last_changed FROM jobs")}
+                rows = []
+                for job_id, job in fetched_by_id.items():
+                    content_hash = job_content_hash(job)
+                    previous = state.get(job_id)
+                    job.last_seen = seen_at
+                    job.last_changed = seen_at
+                    if previous is None:
+                        job.first_seen = seen_at
+                        result.new.append(job)
+                    else:
+                        previous_hash, first_seen, previous_source, last_changed = previous
+                        job.first_seen = datetime.fromisoformat(first_seen) if first_seen else seen_at
+                        if previous_hash == content_hash and previous_source == (job.source or REMOTIVE_SOURCE):
+                            job.last_changed = datetime.fromisoformat(last_changed) if last_changed else None
+                            result.unchanged += 1
+                            continue
+                        result.changed.append(job)
+                    rows.append(_job_row(job, content_hash, texts.get(job_id)))
+                conn.executemany(_UPSERT_SQL, rows)
+                conn.execute("UPDATE jobs SET last_seen = ? WHERE id IN (SELECT value FROM json_each(?))",
+                             (seen_at.isoformat(), json.dumps(list(fetched_by_id))))
+                result.removed = _delete_missing(conn, fetched_by_id, source)
+                result.kept = sum(1 for job_id, (_, _, stored_source, _) in state.items()
+                                  if job_id not in fetched_by_id and stored_source != source)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Error merging jobs into database {filepath}: {e}")
+        return None
+    logging.info(f"Merge delta: {len(result.new)} new, {len(result.changed)} changed, "
+                 f"{len(result.removed)} removed, {result.unchanged} unchanged.")
+    return result
+
+def load_jobs_from_db(filepath: str = JOBS_DB_FILEPATH, lazy_descriptions: bool = False) -> List[Job]:
+    """
+    Loads all jobs from the database, newest first - the counterpart of load_jobs_from_json.
+
+    Args:
+        filepath: The path to the SQLite database.
+        lazy_descriptions: Optional. If True, description_html is left as None;
+            use SQLiteDescriptionStore to read one on demand.
+
+    Returns:
+        A list of Job objects. Returns an empty list if the database doesn't
+        exist or cannot be read.
+    """
+    if not os.path.exists(filepath):
+        logging.info(f"Database {filepath} not found. Returning empty list.")
+        return []
+    columns = ", ".join(_SELECT_COLUMNS + (() if lazy_descriptions else ('description_html',)))
+    try:
+        conn = connect(filepath)
+        try:
+            rows = conn.execute(f"SELECT {columns} FROM jobs ORDER BY published_at DESC, id DESC").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Error loading jobs from database {filepath}: {e}")
+        return []
+    if lazy_descriptions:
+        jobs = [_job_from_row(row, None) for row in rows]
+    else:
+        jobs = [_job_from_row(row[:-1], row[-1]) for row in rows]
+    logging.info(f"Successfully loaded {len(jobs)} jobs from {filepath}")
+    return jobs
+
+def default_storage_backend(db_filepath: str = JOBS_DB_FILEPATH) -> str:
+    """
+    The storage backend used when none is configured: "sqlite" once the
+    database exists (see migrate_json_to_db), "json" otherwise. app.py serves
+    and update_jobs.py writes whichever this returns, so they always agree.
+    """
+    return "sqlite" if os.path.exists(db_filepath) else "json"
+
+def search_jobs_in_db(query: str, filepath: str = JOBS_DB_FILEPATH, k: int = 20) -> List[Tuple[JobId, float]]:
+    """
+    Full-text search over titles and descriptions with the FTS5 index.
+
+    Query tokens are matched as whole terms and OR-ed together; results
+    are ranked by BM25 with titles weighted higher.
+
+    Returns:
+        Up to k (job id, score) pairs, best first (higher is better).
+    """
+    tokens = tokenize(query)
+    if not tokens or not os.path.exists(filepath):
+        return []
+    # Quote every token so user input can never be parsed as FTS5 query syntax
+    match = " OR ".join('"' + token.replace('"', '""') + '"' for token in dict.fromkeys(tokens))
+    weights = ", ".join(str(weight) for weight in FTS_COLUMN_WEIGHTS)
+    try:
+        conn = connect(filepath)
+        try:
+            rows = conn.execute(f"SELECT rowid, bm25(jobs_fts, {weights}) AS rank FROM jobs_fts "
+                                "WHERE jobs_fts MATCH ? ORDER BY rank LIMIT ?", (match, k)).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Error searching jobs in database {filepath}: {e}")
+        return []
+    # FTS5's bm25() is lower-is-better; flip the sign to match SearchIndex.search
+    return [(job_id, -rank) for job_id, rank in rows]
+
+
+class SQLiteDescriptionStore:
+    """
+    On-demand description lookup for jobs loaded with lazy_descriptions - the
+    database counterpart of job_storage.DescriptionStore. Keeps one read
+    connection per thread.
+    """
+
+    def __init__(self, filepath: str = JOBS_DB_FILEPATH):
+        self.filepath = filepath
+        self._local = threading.local()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filepath)
+
+    def get(self, job_id: JobId) -> Optional[str]:
+        """Returns the description of job_id, or None if it is unknown."""
+        if not self.exists():
+            return None
+        try:
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn = self._local.conn = connect(self.filepath)
+            row = conn.execute("SELECT description_html FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading description of job {job_id} from {self.filepath}: {e}")
+            return None
+        return row[0] if row else None
+
+
+class DataVersion:
+    """
+    Cheap change detector for a job database. PRAGMA data_version on a
+    long-lived connection changes whenever another connection commits, which
+    file stats cannot show reliably in WAL mode (commits go to the -wal file
+    and checkpoints rewrite the database later). Thread-safe.
+    """
+
+    def __init__(self, filepath: str = JOBS_DB_FILEPATH):
+        self.filepath = filepath
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns (database inode, data version), or None if the database does not exist.
+        Reconnects if the database file was replaced.
+        """
+        try:
+            inode = os.stat(self.filepath).st_ino
+        except OSError:
+            return None
+        with self._lock:
+            try:
+                if self._conn is None or inode != self._inode:
+                    if self._conn is not None:
+                        self._conn.close()
+                    self._conn, self._inode = connect(self.filepath), inode
+                return inode, self._conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error as e:
+                logging.error(f"Could not read the data version of {self.filepath}: {e}")
+                self._conn = None
+                return None
+
+
+def migrate_json_to_db(json_filepath: str = JOBS_JSON_FILEPATH, db_filepath: str = JOBS_DB_FILEPATH) -> Optional[int]:
+    """
+    One-shot migration of a JSON job store (including any merge journal and
+    split descriptions) into the database, replacing its contents.
+
+    Returns:
+        The number of jobs migrated, or None if saving failed.
+    """
+    if os.path.exists(journal_filepath(json_filepath)):
+        jobs = load_jobs_with_journal(json_filepath)
+    else:
+        jobs = list(iter_jobs_from_json(json_filepath)) if os.path.exists(json_filepath) else []
+    if not save_jobs_to_db(jobs, db_filepath):
+        return None
+    logging.info(f"Migrated {len(jobs)} jobs from {json_filepath} to {db_filepath}.")
+    return len(jobs)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:] == ['migrate']:
+        migrate_json_to_db()
+        sys.exit(0)
+
+    from datetime import timedelta
+    from job_storage import save_jobs_to_json
+
+    test_db = "test_jobs.db"
+    test_json = "test_jobs_for_db.json"
+    base = datetime(2024, 1, 1)
+    test_jobs = [
+        Job(id=1, title="Senior Python Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="Software Development",
+            publication_date=base, description_html="<p>Build APIs with <b>Python</b> and Flask.</p>", job_type="full_time"),
+        Job(id=2, title="Product Designer", company_name="Design Inc", remotive_url="http://example.com/2", category="Design",
+            publication_date=base + timedelta(days=1), description_html="<p>Design delightful interfaces.</p>", job_type="contract"),
+        Job(id=3, title="Data Engineer", company_name="Tech Co", remotive_url="http://example.com/3", category="Software Development",
+            publication_date=base + timedelta(days=2), description_html="<p>Python pipelines and SQL.</p>", job_type="full_time"),
+    ]
+
+    logging.info(f"--- Migrating {test_json} into {test_db} ---")
+    save_jobs_to_json(test_jobs, test_json)
+    migrated = migrate_json_to_db(test_json, test_db)
+    loaded = load_jobs_from_db(test_db)
+    logging.info(f"Migrated {migrated} jobs; round trip matches (newest first): {loaded == test_jobs[::-1]}")
+
+    logging.info("--- Full-text search ---")
+    logging.info(f"'python' -> {search_jobs_in_db('python', test_db)} (expected jobs 1 and 3, title match first)")
+
+    logging.info("--- Merging a new fetch ---")
+    fetched = [
+        Job(id=1, title="Senior Python Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="Software Development",
+            publication_date=base, description_html="<p>Build APIs with <b>Python</b> and Flask.</p>", job_type="full_time"),
+        Job(id=3, title="Data Engineer (Remote)", company_name="Tech Co", remotive_url="http://example.com/3", category="Software Development",
+            publication_date=base + timedelta(days=2), description_html="<p>Python pipelines and SQL.</p>", job_type="full_time"),
+        Job(id=4, title="Technical Writer", company_name="Docs Ltd", remotive_url="http://example.com/4", category="Writing",
+            publication_date=base + timedelta(days=3), description_html="<p>Write docs.</p>"),
+    ]
+    result = merge_jobs_into_db(fetched, test_db)
+    logging.info(f"Delta (expected 1 new, 1 changed, 1 removed, 1 unchanged): {len(result.new)} new, "
+                 f"{len(result.changed)} changed, {result.removed} removed, {result.unchanged} unchanged")
+    lazy = load_jobs_from_db(test_db, lazy_descriptions=True)
+    descriptions = SQLiteDescriptionStore(test_db)
+    logging.info(f"Lazy load: {[(job.id, job.title) for job in lazy]}, description of job 4: {descriptions.get(4)!r}")
+    logging.info(f"'designer' after removal -> {search_jobs_in_db('designer', test_db)} (expected [])")
+
+    for path in (test_db, wal_filepath(test_db), test_db + "-shm", test_json):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,273 @@
+import base64
+import json
+import logging
+import os
+import random
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+try:
+    from job_processor import Job, pack_datetime, REMOTIVE_SOURCE
+    from job_journal import JobId, job_content_hash
+    from text_utils import strip_html, tokenize
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_journal.py and text_utils.py are accessible.")
+    raise
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # Signatures are computed in pure Python (same values, slower)
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SIGNATURES_FILEPATH = os.path.join("data", "job_signatures.json")
+_FORMAT_VERSION = 1
+
+SHINGLE_SIZE = 3 # Words per shingle
+NUM_PERMUTATIONS = 128
+# LSH: signatures are cut into LSH_BANDS bands of NUM_PERMUTATIONS // LSH_BANDS rows; jobs that
+# agree on all rows of any band become candidates. 16 bands of 8 rows catch pairs above
+# roughly (1/16) ** (1/8) ~ 0.7 Jaccard similarity with high probability.
+LSH_BANDS = 16
+# Estimated Jaccard similarity from which candidates are treated as the same posting
+DUPLICATE_THRESHOLD = 0.8
+
+# h_i(x) = (a_i * x + b_i) mod p over 31-bit shingle hashes: every product fits in 64 bits,
+# so the numpy path gives exactly the pure Python values. Fixed seed, as signatures are persisted.
+_PRIME = (1 << 31) - 1
+_rng = random.Random(1_000_003)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+del _rng
+
+
+def shingle_hashes(job: Job) -> Set[int]:
+    """Hashes of the word shingles of a job's title, company and description text."""
+    text = " ".join((job.title or "", job.company_name or "", strip_html(job.description_html or "")))
+    tokens = tokenize(text, remove_stopwords=False)
+    if not tokens:
+        return set()
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(tokens).encode('utf-8')) % _PRIME}
+    return {zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode('utf-8')) % _PRIME
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(hashes: Set[int]) -> array:
+    """
+    Returns the MinHash signature (NUM_PERMUTATIONS unsigned 32-bit ints) of a
+    non-empty set of shingle hashes. The fraction of equal positions in two
+    signatures estimates the Jaccard similarity of the two shingle sets.
+    """
+    if numpy is not None:
+        values = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        a = numpy.array([a for a, _ in _PERMUTATIONS], dtype=numpy.uint64)[:, None]
+        b = numpy.array([b for _, b in _PERMUTATIONS], dtype=numpy.uint64)[:, None]
+        return array('I', ((a * values + b) % _PRIME).min(axis=1).tolist())
+    values = list(hashes)
+    return array('I', [min([(a * x + b) % _PRIME for x in values]) for a, b in _PERMUTATIONS])
+
+def estimated_similarity(signature_a: array, signature_b: array) -> float:
+    return sum(1 for x, y in zip(signature_a, signature_b) if x == y) / len(signature_a)
+
+def candidate_pairs(signatures: Dict[JobId, array], bands: int = LSH_BANDS) -> Set[Tuple[JobId, JobId]]:
+    """
+    Finds pairs of jobs that share at least one LSH band bucket. Runs in time
+    linear in the number of jobs plus the number of pairs found.
+    """
+    rows = NUM_PERMUTATIONS // bands
+    pairs = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[JobId]] = {}
+        start = band * rows
+        for job_id, signature in signatures.items():
+            buckets.setdefault(signature[start:start + rows].tobytes(), []).append(job_id)
+        for members in buckets.values():
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    a, b = members[i], members[j]
+                    pairs.add((a, b) if str(a) < str(b) else (b, a))
+    return pairs
+
+def _find(parents: Dict[JobId, JobId], job_id: JobId) -> JobId:
+    while parents[job_id] != job_id:
+        parents[job_id] = parents[parents[job_id]] # Path halving
+        job_id = parents[job_id]
+    return job_id
+
+def _source(job: Job) -> Dict:
+    return {"source": job.source or REMOTIVE_SOURCE, "id": job.id, "url": job.remotive_url}
+
+
+@dataclass
+class DedupResult:
+    # One canonical job per group of near-duplicates, in input order
+    jobs: List[Job] = field(default_factory=list)
+    # Canonical job id -> ids of the duplicates merged into it
+    duplicates: Dict[JobId, List[JobId]] = field(default_factory=dict)
+    # Canonical job id -> every posting of the group ({"source", "id", "url"}), canonical first
+    sources: Dict[JobId, List[Dict]] = field(default_factory=dict)
+    hashed: int = 0 # Jobs whose signature had to be computed (new or changed)
+
+
+class JobDeduplicator:
+    """
+    Near-duplicate detection for the processed job list.
+
+    Each job gets a MinHash signature over the word shingles of its title,
+    company and description. LSH banding finds candidate pairs without
+    comparing every job with every other one, and candidates whose signatures
+    agree on at least DUPLICATE_THRESHOLD of the positions are merged. Of each
+    group, the most recently published posting is kept as the canonical job,
+    and the postings of the group are recorded as its sources (Job.sources,
+    stored with the job).
+
+    Signatures are persisted with the content hash they were computed for, so
+    a rerun only hashes new or changed jobs.
+    """
+
+    def __init__(self, filepath: str = SIGNATURES_FILEPATH, threshold: float = DUPLICATE_THRESHOLD):
+        self.filepath = filepath
+        self.threshold = threshold
+
+    def _load(self) -> Dict[JobId, Tuple[str, array]]:
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') != _FORMAT_VERSION or state.get('num_permutations') != NUM_PERMUTATIONS:
+                logging.info(f"Signatures in {self.filepath} were computed differently; rehashing all jobs.")
+                return {}
+            signatures = {}
+            for job_id, content_hash, encoded in state['signatures']:
+                signature = array('I')
+                signature.frombytes(base64.b64decode(encoded))
+                signatures[job_id] = (content_hash, signature)
+            return signatures
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Could not read job signatures from {self.filepath}: {e}. Rehashing all jobs.")
+            return {}
+
+    def _save(self, signatures: Dict[JobId, Tuple[str, array]]) -> bool:
+        state = {
+            'version': _FORMAT_VERSION,
+            'num_permutations': NUM_PERMUTATIONS,
+            'signatures': [[job_id, content_hash, base64.b64encode(signature.tobytes()).decode('ascii')]
+                           for job_id, (content_hash, signature) in signatures.items()],
+        }
+        temp_filepath = self.filepath + ".tmp"
+        try:
+            directory = os.path.dirname(self.filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(temp_filepath, self.filepath)
+            return True
+        except (OSError, TypeError) as e:
+            logging.error(f"Could not save job signatures to {self.filepath}: {e}")
+            return False
+
+    def deduplicate(self, jobs: List[Job], save: bool = True) -> DedupResult:
+        """
+        Merges near-duplicate jobs. Sets Job.sources on the canonical jobs
+        (None for jobs without near-duplicates).
+
+        Args:
+            jobs: The processed jobs (with descriptions), e.g. from process_api_jobs.
+            save: Optional. If True (default), the signatures of the given jobs
+                (and no others) are written back to filepath.
+
+        Returns:
+            A DedupResult with the canonical jobs in input order.
+        """
+        stored = self._load()
+        signatures: Dict[JobId, Tuple[str, array]] = {}
+        result = DedupResult()
+        for job in jobs:
+            job.sources = None # Regrouped below, and not part of the hashed content
+            content_hash = job_content_hash(job)
+            previous = stored.get(job.id)
+            if previous is not None and previous[0] == content_hash:
+                signatures[job.id] = previous
+                continue
+            hashes = shingle_hashes(job)
+            if hashes:
+                signatures[job.id] = (content_hash, minhash_signature(hashes))
+                result.hashed += 1
+
+        parents = {job.id: job.id for job in jobs}
+        signature_of = {job_id: signature for job_id, (_, signature) in signatures.items()}
+        for a, b in candidate_pairs(signature_of):
+            if estimated_similarity(signature_of[a], signature_of[b]) >= self.threshold:
+                root_a, root_b = _find(parents, a), _find(parents, b)
+                if root_a != root_b:
+                    parents[root_b] = root_a
+
+        groups: Dict[JobId, List[Job]] = {}
+        for job in jobs:
+            groups.setdefault(_find(parents, job.id), []).append(job)
+        canonical_ids = set()
+        for members in groups.values():
+            # Newest posting wins (pack_datetime >> 1 orders naive and aware dates alike)
+            canonical = max(members, key=lambda job: (pack_datetime(job.publication_date) >> 1, str(job.id)))
+            canonical_ids.add(id(canonical))
+            if len(members) > 1:
+                result.duplicates[canonical.id] = [job.id for job in members if job is not canonical]
+                result.sources[canonical.id] = [_source(canonical)] + [_source(job) for job in members if job is not canonical]
+                canonical.sources = result.sources[canonical.id]
+        result.jobs = [job for job in jobs if id(job) in canonical_ids]
+
+        duplicate_count = len(jobs) - len(result.jobs)
+        logging.info(f"Deduplicated {len(jobs)} jobs: {duplicate_count} near-duplicates merged into "
+                     f"{len(result.duplicates)} canonical jobs ({result.hashed} signatures computed).")
+        if save:
+            self._save(signatures)
+        return result
+
+def deduplicate_jobs(jobs: List[Job], filepath: str = SIGNATURES_FILEPATH) -> DedupResult:
+    """Shortcut for JobDeduplicator(filepath).deduplicate(jobs)."""
+    return JobDeduplicator(filepath).deduplicate(jobs)
+
+
+if __name__ == '__main__':
+    import time
+    from datetime import datetime, timedelta
+
+    words = ("python django react kubernetes remote team product design data pipeline customer "
+             "support growth marketing backend frontend platform cloud security analytics mobile").split()
+    rng = random.Random(42)
+    test_jobs = []
+    for i in range(5000):
+        description = " ".join(rng.choice(words) for _ in range(150))
+        test_jobs.append(Job(id=i, title=f"Engineer {i % 50}", company_name=f"Company {i % 300}",
+                             remotive_url=f"https://remotive.com/remote-jobs/job-{i}", category="Software Development",
+                             publication_date=datetime(2024, 1, 1) + timedelta(hours=i), description_html=f"<p>{description}</p>"))
+    # Repost 100 jobs under new ids with one or two words changed
+    for i in range(100):
+        original = test_jobs[i * 37]
+        tokens = original.description_html[3:-4].split()
+        tokens[rng.randrange(len(tokens))] = "tweaked"
+        test_jobs.append(Job(id=10_000 + i, title=original.title, company_name=original.company_name,
+                             remotive_url=f"https://remotive.com/remote-jobs/repost-{i}", category=original.category,
+                             publication_date=original.publication_date + timedelta(days=3),
+                             description_html=f"<p>{' '.join(tokens)}</p>"))
+
+    test_filepath = "test_job_signatures.json"
+    deduplicator = JobDeduplicator(test_filepath)
+    start = time.perf_counter()
+    result = deduplicator.deduplicate(test_jobs)
+    logging.info(f"First run over {len(test_jobs)} jobs: {time.perf_counter() - start:.2f}s "
+                 f"({'numpy' if numpy is not None else 'pure Python'} MinHash)")
+    found = {frozenset([canonical] + others) for canonical, others in result.duplicates.items()}
+    expected = {frozenset([i * 37, 10_000 + i]) for i in range(100)}
+    logging.info(f"Found exactly the 100 reposts: {found == expected}; the newer repost is kept: "
+                 f"{all(canonical >= 10_000 for canonical in result.duplicates)}")
+
+    start = time.perf_counter()
+    rerun = deduplicator.deduplicate(test_jobs)
+    logging.info(f"Rerun: {rerun.hashed} signatures recomputed, {time.perf_counter() - start:.2f}s")
+    os.remove(test_filepath)
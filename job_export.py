@@ -0,0 +1,145 @@
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+try:
+    from job_processor import Job
+    from job_storage import job_to_dict
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py and job_storage.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Newline-delimited JSON export of jobs (app.py's /api/jobs): one job_to_dict record per
+# line, serialized a job at a time, so an export of any size runs in constant memory.
+# Fields of an exported record, in output order (the keys of job_to_dict)
+EXPORT_FIELDS = ('id', 'title', 'company_name', 'remotive_url', 'category', 'publication_date', 'description_html',
+                 'candidate_required_location', 'salary', 'job_type', 'first_seen', 'last_seen', 'sources', 'source', 'last_changed')
+# Serialized records are handed to the server in blocks of about this many bytes
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_GZIP_LEVEL = 6
+
+
+def parse_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parses a comma-separated fields projection (e.g. "id,title,salary").
+
+    Returns:
+        The requested fields in EXPORT_FIELDS order, or all of them if value is empty.
+    Raises:
+        ValueError: If a field is unknown.
+    """
+    names = {name.strip() for name in (value or "").split(',') if name.strip()}
+    if not names:
+        return EXPORT_FIELDS
+    unknown = names.difference(EXPORT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(EXPORT_FIELDS)}.")
+    return tuple(field for field in EXPORT_FIELDS if field in names)
+
+def changed_at(job: Job) -> datetime:
+    """
+    When the stored job was last added or changed: last_changed, else (for
+    jobs stored before it was tracked) first_seen or the publication date (as UTC).
+    """
+    value = job.last_changed or job.first_seen or job.publication_date
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+def is_changed_since(job: Job, since: datetime) -> bool:
+    """True if the job was added or changed at or after since (naive values are UTC), for incremental sync."""
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return changed_at(job) >= since
+
+def iter_ndjson(jobs: Iterable[Job], fields: Sequence[str] = EXPORT_FIELDS,
+                get_description: Optional[Callable[[Job], Optional[str]]] = None,
+                flush_bytes: int = EXPORT_FLUSH_BYTES) -> Iterator[bytes]:
+    """
+    Serializes jobs as UTF-8 newline-delimited JSON, one record at a time.
+
+    Args:
+        jobs: The jobs to export; consumed lazily.
+        fields: Optional. The record fields, from parse_fields.
+        get_description: Optional. Supplies description_html for jobs loaded
+            without it (e.g. JobStore.get_description); only called when the
+            field is requested.
+        flush_bytes: Optional. Lines are yielded in blocks of about this size.
+
+    Yields:
+        Blocks of complete lines.
+    """
+    with_description = 'description_html' in fields
+    projected = tuple(fields) != EXPORT_FIELDS
+    lines, size = [], 0
+    for job in jobs:
+        record = job_to_dict(job, include_description=with_description)
+        if with_description and record['description_html'] is None and get_description is not None:
+            record['description_html'] = get_description(job)
+        if projected:
+            record = {field: record[field] for field in fields}
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        lines.append(line)
+        size += len(line)
+        if size >= flush_bytes:
+            yield b"".join(lines)
+            lines, size = [], 0
+    if lines:
+        yield b"".join(lines)
+
+def gzip_stream(blocks: Iterable[bytes], level: int = EXPORT_GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Gzip-compresses a stream of blocks as it goes. Each block is sync-flushed,
+    so the client can decompress everything it has received so far.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits 31: gzip header and trailer
+    for block in blocks:
+        data = compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+if __name__ == '__main__':
+    import gzip
+    import time
+    import tracemalloc
+    from datetime import timedelta
+
+    def generate_jobs(count):
+        for i in range(count):
+            yield Job(id=i, title=f"Engineer {i}", company_name=f"Company {i % 97}", remotive_url=f"https://remotive.com/remote-jobs/{i}",
+                      category="Software Development", publication_date=datetime(2025, 1, 1) + timedelta(minutes=i),
+                      description_html="<p>" + "Build and run remote systems. " * 40 + "</p>", salary="$100k",
+                      first_seen=datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i),
+                      last_changed=datetime(2025, 1, 2, tzinfo=timezone.utc) if i == 0 else None)
+
+    count = 100_000
+    start = time.perf_counter()
+    blocks = gzip_stream(iter_ndjson(generate_jobs(count)))
+    first_at = None
+    compressed = 0
+    for block in blocks:
+        first_at = first_at if first_at is not None else time.perf_counter() - start
+        compressed += len(block)
+    elapsed = time.perf_counter() - start
+    logging.info(f"{count:,} jobs: first bytes after {first_at * 1000:.1f} ms, {compressed / 1e6:.1f} MB gzipped in "
+                 f"{elapsed:.2f}s ({count / elapsed:,.0f} jobs/s)")
+
+    # Peak memory does not grow with the number of jobs exported
+    for count in (5_000, 20_000):
+        tracemalloc.start()
+        for block in gzip_stream(iter_ndjson(generate_jobs(count))):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        logging.info(f"{count:,} jobs: peak memory {peak / 1e6:.2f} MB")
+
+    sample = b"".join(gzip_stream(iter_ndjson(generate_jobs(3), parse_fields("id,title,first_seen"))))
+    logging.info(f"Projected records: {gzip.decompress(sample).decode('utf-8').splitlines()}")
+    since = datetime(2025, 1, 1, 0, 1)
+    logging.info(f"Changed since {since}: {[job.id for job in generate_jobs(3) if is_changed_since(job, since)]} "
+                 f"(expected 0, changed later, and 1 and 2)")
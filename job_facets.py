@@ -0,0 +1,348 @@
+import base64
+import binascii
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    from job_processor import Job
+    from job_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, encode_cursor
+    from salary_parser import parse_salary
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_listing.py and salary_parser.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FACETS = ('category', 'job_type', 'location', 'salary_band')
+SORT_ORDERS = ('date', 'salary')
+# Bitmaps of recently queried salary ranges kept per index
+MAX_CACHED_SALARY_RANGES = 64
+
+# Spellings of the same region in candidate_required_location
+_LOCATION_ALIASES = {
+    "anywhere": "worldwide", "global": "worldwide", "remote": "worldwide", "world": "worldwide",
+    "us": "usa", "u.s.": "usa", "u.s.a.": "usa", "united states": "usa", "united states of america": "usa",
+    "uk": "united kingdom", "u.k.": "united kingdom", "gb": "united kingdom", "great britain": "united kingdom",
+    "eu": "europe", "emea": "europe, middle east & africa", "latam": "latin america", "apac": "asia-pacific",
+}
+_LOCATION_SPLIT_RE = re.compile(r"\s*(?:,|/|;|\||\bor\b|\band\b|&)\s*", re.IGNORECASE)
+_LOCATION_NOISE_RE = re.compile(r"\b(?:only|based|timezones?|time zones?)\b|\(.*?\)", re.IGNORECASE)
+
+# (key, label, lower bound) of each salary band, in annual terms
+SALARY_BANDS = (
+    ("under-50k", "Under $50k", 0),
+    ("50k-100k", "$50k - $100k", 50_000),
+    ("100k-150k", "$100k - $150k", 100_000),
+    ("150k-plus", "$150k+", 150_000),
+)
+NO_SALARY_BAND = ("unspecified", "Not specified")
+SALARY_BANDS_LABELS = tuple((key, label) for key, label, _ in SALARY_BANDS) + (NO_SALARY_BAND,)
+
+
+def normalize_locations(location: Optional[str]) -> List[str]:
+    """
+    Splits a free-text candidate_required_location ("USA Only", "Americas, Europe",
+    "UK/EU") into normalized region keys, e.g. ["usa"] or ["americas", "europe"].
+    """
+    if not location:
+        return []
+    regions = []
+    for part in _LOCATION_SPLIT_RE.split(location):
+        key = _LOCATION_NOISE_RE.sub(" ", part).strip(" .-").casefold()
+        key = " ".join(key.split())
+        key = _LOCATION_ALIASES.get(key, key)
+        if key and key not in regions:
+            regions.append(key)
+    return regions
+
+def annual_salary(salary: Optional[str]) -> Optional[float]:
+    """Annual midpoint of a free-text salary (see salary_parser), or None if it has no amount."""
+    parsed = parse_salary(salary)
+    return parsed.annual_midpoint if parsed is not None else None
+
+def salary_band(salary: Optional[str]) -> str:
+    """Returns the key of the salary band a free-text salary falls into."""
+    annual = annual_salary(salary)
+    if annual is None or annual < 1000: # Too small to be a real annual figure
+        return NO_SALARY_BAND[0]
+    band = SALARY_BANDS[0][0]
+    for key, _, lower_bound in SALARY_BANDS:
+        if annual >= lower_bound:
+            band = key
+    return band
+
+def _encode_salary_cursor(job: Job) -> str:
+    """Encodes the position just after job in salary order (see encode_cursor)."""
+    raw = f"salary:{annual_salary(job.salary)!r}:{job.id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_salary_cursor(cursor: str) -> Tuple[float, int]:
+    """Decodes a cursor from _encode_salary_cursor into its ascending sort key (-annual salary, -id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        kind, annual, job_id = raw.split(':')
+        if kind != 'salary':
+            raise ValueError(kind)
+        return -float(annual), -int(job_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}") from e
+
+def _bitmap(rows: List[int], size: int) -> int:
+    """Builds an int bitset with the given (ascending) row bits set."""
+    buffer = bytearray((size + 7) // 8)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class FacetIndex:
+    """
+    Bitmap index for faceted filtering over a listing source (a JobListingIndex
+    or a job_snapshot.SnapshotVersion), built once per job list.
+
+    Bit i of every bitmap stands for row i of the source, i.e. the i-th newest
+    job. There is one bitmap per distinct value of category, job_type, normalized
+    location (a job can be in several regions) and salary band. Bitmaps are plain
+    Python ints, so AND/OR and popcount (int.bit_count) run in C over machine
+    words. At 100k jobs each one is 12.5 KB, small enough that compressing them
+    would only slow down the bitwise operations.
+
+    Selections are {facet: [values]}: values of one facet are OR-ed and facets
+    are AND-ed. Counts are disjunctive (each facet's counts apply the other
+    facets' selections but not its own), which is what a multi-select filter UI shows.
+
+    Jobs whose salary has an amount are also kept sorted by annual salary
+    (highest first, id descending as a tie-break), for salary range filters
+    and for paging in salary order.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.size = len(source)
+        self.all_rows = (1 << self.size) - 1
+        rows: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        self.labels: Dict[str, Dict[str, str]] = {facet: {} for facet in FACETS}
+        self.labels['salary_band'] = dict(SALARY_BANDS_LABELS)
+        salary_cache: Dict[Optional[str], str] = {}
+        location_cache: Dict[Optional[str], List[str]] = {}
+
+        salaries: List[Tuple[float, int, int]] = [] # (-annual salary, -id, row)
+
+        for row, (job_id, category, job_type, location, salary) in enumerate(source.facet_rows()):
+            for facet, value in (('category', category), ('job_type', job_type)):
+                if value:
+                    key = value.strip().casefold()
+                    rows[facet].setdefault(key, []).append(row)
+                    self.labels[facet].setdefault(key, value)
+            regions = location_cache.get(location)
+            if regions is None:
+                regions = location_cache[location] = normalize_locations(location)
+            for region in regions:
+                rows['location'].setdefault(region, []).append(row)
+                self.labels['location'].setdefault(region, region.title() if len(region) > 3 else region.upper())
+            band = salary_cache.get(salary)
+            if band is None:
+                band = salary_cache[salary] = salary_band(salary)
+            rows['salary_band'].setdefault(band, []).append(row)
+            annual = annual_salary(salary) # parse_salary is cached per distinct string
+            if annual is not None:
+                salaries.append((-annual, -job_id, row))
+
+        salaries.sort()
+        # Ascending sort keys for bisect, and the row of each
+        self._salary_keys = [(negative_annual, negative_id) for negative_annual, negative_id, _ in salaries]
+        self._salary_rows = [row for _, _, row in salaries]
+        self.with_salary = _bitmap(sorted(self._salary_rows), self.size)
+        self._salary_ranges: Dict[Tuple[Optional[float], Optional[float]], int] = {}
+
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            facet: {value: _bitmap(value_rows, self.size) for value, value_rows in values.items()}
+            for facet, values in rows.items()
+        }
+
+    def _facet_filter(self, facet: str, values: Iterable[str]) -> Optional[int]:
+        """OR of the bitmaps of the selected values of one facet, or None if nothing is selected."""
+        bitmaps = self.bitmaps[facet]
+        selected = None
+        for value in values:
+            key = value.strip().casefold()
+            if facet == 'location':
+                key = _LOCATION_ALIASES.get(key, key)
+            if not key:
+                continue
+            selected = (selected or 0) | bitmaps.get(key, 0)
+        return selected
+
+    def _filters(self, selections: Mapping[str, Iterable[str]]) -> Dict[str, int]:
+        filters = {}
+        for facet in FACETS:
+            selected = self._facet_filter(facet, selections.get(facet, ()))
+            if selected is not None:
+                filters[facet] = selected
+        return filters
+
+    def match(self, selections: Mapping[str, Iterable[str]]) -> int:
+        """Returns the bitmap of rows matching all selected facets."""
+        result = self.all_rows
+        for selected in self._filters(selections).values():
+            result &= selected
+        return result
+
+    def counts(self, selections: Mapping[str, Iterable[str]], within: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Returns {facet: {value: matching jobs}} with disjunctive semantics
+        (see class docstring), optionally only counting rows in the bitmap
+        within. Values with no matches are left out.
+        """
+        filters = self._filters(selections)
+        counts = {}
+        for facet in FACETS:
+            base = self.all_rows if within is None else within
+            for other, selected in filters.items():
+                if other != facet:
+                    base &= selected
+            facet_counts = {}
+            for value, bitmap in self.bitmaps[facet].items():
+                count = (base & bitmap).bit_count()
+                if count:
+                    facet_counts[value] = count
+            counts[facet] = facet_counts
+        return counts
+
+    def salary_range(self, min_annual: Optional[float] = None, max_annual: Optional[float] = None) -> int:
+        """Returns the bitmap of rows whose annual salary lies within [min_annual, max_annual]."""
+        key = (min_annual, max_annual)
+        bitmap = self._salary_ranges.get(key)
+        if bitmap is None:
+            low = bisect_left(self._salary_keys, (-max_annual, float('-inf'))) if max_annual is not None else 0
+            high = bisect_right(self._salary_keys, (-min_annual, float('inf'))) if min_annual is not None else len(self._salary_keys)
+            bitmap = _bitmap(sorted(self._salary_rows[low:high]), self.size)
+            if len(self._salary_ranges) >= MAX_CACHED_SALARY_RANGES:
+                self._salary_ranges.clear()
+            self._salary_ranges[key] = bitmap
+        return bitmap
+
+    @staticmethod
+    def _iter_rows(bitmap: int, start: int = 0) -> Iterator[int]:
+        """Yields the set bits of bitmap at or above start, lowest first."""
+        bitmap >>= start
+        while bitmap:
+            lowest = bitmap & -bitmap
+            row = lowest.bit_length() - 1
+            yield start + row
+            bitmap ^= lowest
+
+    def _salary_page(self, result: int, cursor: Optional[str], page_size: int) -> Tuple[List[int], bool]:
+        """Walks the salary order from cursor, keeping rows set in result."""
+        start = 0
+        if cursor:
+            start = bisect_right(self._salary_keys, _decode_salary_cursor(cursor))
+        matches = result.to_bytes((self.size + 7) // 8, 'little')
+        rows = []
+        for row in self._salary_rows[start:]:
+            if matches[row >> 3] >> (row & 7) & 1:
+                if len(rows) == page_size:
+                    return rows, True
+                rows.append(row)
+        return rows, False
+
+    def query(self, selections: Mapping[str, Iterable[str]], cursor: Optional[str] = None,
+              page_size: int = DEFAULT_PAGE_SIZE, min_salary: Optional[float] = None,
+              max_salary: Optional[float] = None,
+              sort: str = 'date') -> Tuple[List[Job], Optional[str], int, Dict[str, Dict[str, int]]]:
+        """
+        Filters and counts in one go.
+
+        Args:
+            selections: {facet: [values]} (see class docstring).
+            cursor: Optional. next_cursor from the previous page (of the same sort).
+            page_size: Optional. Number of jobs per page (1 to MAX_PAGE_SIZE).
+            min_salary, max_salary: Optional. Bounds on the annual salary; jobs
+                without a salary amount are left out when either is given.
+            sort: Optional. 'date' (newest first, the default) or 'salary'
+                (highest annual salary first; only jobs with a salary amount).
+
+        Returns:
+            (page of jobs, next_cursor or None, total matches, facet counts).
+            The counts include the salary bounds.
+        Raises:
+            InvalidCursorError: If cursor is malformed.
+            ValueError: If sort is not 'date' or 'salary'.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Invalid sort {sort!r}; expected one of {', '.join(SORT_ORDERS)}.")
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        within = None
+        if min_salary is not None or max_salary is not None:
+            within = self.salary_range(min_salary, max_salary)
+        if sort == 'salary':
+            within = self.with_salary if within is None else within
+        result = self.match(selections)
+        if within is not None:
+            result &= within
+
+        if sort == 'salary':
+            rows, has_more = self._salary_page(result, cursor, page_size)
+        else:
+            rows = []
+            has_more = False
+            for row in self._iter_rows(result, self.source.start_row(cursor)):
+                if len(rows) == page_size:
+                    has_more = True
+                    break
+                rows.append(row)
+        page = [self.source.job(row) for row in rows]
+        next_cursor = None
+        if page and has_more:
+            next_cursor = _encode_salary_cursor(page[-1]) if sort == 'salary' else encode_cursor(page[-1])
+        return page, next_cursor, result.bit_count(), self.counts(selections, within)
+
+if __name__ == '__main__':
+    import time
+    from datetime import datetime, timedelta
+    from job_listing import JobListingIndex
+
+    for location in ["USA Only", "Americas, Europe", "UK/EU", "Anywhere", "Canada or US (EST timezone)"]:
+        logging.info(f"{location!r} -> {normalize_locations(location)}")
+    for salary in ["$100k - $120k", "50,000 USD", "$40/hour", "80-100k", "Competitive", None]:
+        logging.info(f"{salary!r} -> {annual_salary(salary)} ({salary_band(salary)})")
+
+    categories = ["Software Development", "Design", "Marketing", "Customer Service", "Data", "Sales", "Writing"]
+    locations = ["USA Only", "Worldwide", "Europe", "Americas, Europe", "UK/EU", "Canada or US", "LATAM"]
+    salaries = ["", "$60k - $80k", "$120,000", "$40/hour", "$150k-$200k", "Competitive"]
+    job_types = ["full_time", "contract", "part_time", "freelance"]
+    test_jobs = [
+        Job(id=i, title=f"Job {i}", company_name=f"Company {i % 500}", remotive_url=f"https://remotive.com/remote-jobs/job-{i}",
+            category=categories[i % 7], publication_date=datetime(2024, 1, 1) + timedelta(minutes=i), description_html=None,
+            candidate_required_location=locations[i % 11 % 7], salary=salaries[i % 13 % 6], job_type=job_types[i % 4])
+        for i in range(100_000)
+    ]
+    listing = JobListingIndex(test_jobs)
+    start = time.perf_counter()
+    facets = FacetIndex(listing)
+    logging.info(f"Built facet index over {facets.size} jobs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    selections = {'category': ['Design', 'Data'], 'location': ['usa', 'europe'], 'salary_band': ['100k-150k', '150k-plus']}
+    start = time.perf_counter()
+    page, next_cursor, total, counts = facets.query(selections, page_size=20)
+    elapsed = (time.perf_counter() - start) * 1000
+    expected = [job for job in listing.ordered if job.category in ('Design', 'Data')
+                and set(normalize_locations(job.candidate_required_location)) & {'usa', 'europe'}
+                and salary_band(job.salary) in ('100k-150k', '150k-plus')]
+    logging.info(f"Filtered, counted query: {total} matches in {elapsed:.2f} ms; matches a linear scan: "
+                 f"{total == len(expected) and page == expected[:20]}")
+    logging.info(f"Category counts with the other selections applied: {counts['category']}")
+    page, _, _, _ = facets.query(selections, cursor=next_cursor, page_size=20)
+    logging.info(f"Second page continues the first: {page == expected[20:40]}")
+
+    start = time.perf_counter()
+    page, next_cursor, total, _ = facets.query({'category': ['Design']}, min_salary=100_000, sort='salary', page_size=20)
+    elapsed = (time.perf_counter() - start) * 1000
+    expected = sorted((job for job in listing.ordered if job.category == 'Design'
+                       and (annual_salary(job.salary) or 0) >= 100_000), key=lambda job: (-annual_salary(job.salary), -job.id))
+    second_page, _, _, _ = facets.query({'category': ['Design']}, cursor=next_cursor, min_salary=100_000, sort='salary', page_size=20)
+    logging.info(f"Salary-sorted query with a minimum salary: {total} matches in {elapsed:.2f} ms; matches a linear scan: "
+                 f"{total == len(expected) and page + second_page == expected[:40]}")
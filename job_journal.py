@@ -0,0 +1,457 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from job_processor import Job, REMOTIVE_SOURCE
+    from job_storage import (save_jobs_to_json, load_jobs_from_json, job_to_dict, job_from_dict,
+                             description_filepath, _fsync_directory, JOBS_JSON_FILEPATH)
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py and job_storage.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Next to the compacted snapshot (the regular jobs JSON file) live:
+#   <file>.journal     - newline-delimited JSON ops appended by each merge:
+#                        {"op": "upsert", "job": {...}, "hash": ...}
+#                        {"op": "remove", "id": ...}
+#                        {"op": "commit", "at": ..., "source": ...}  (ends one merge, all live
+#                                            jobs of that feed were seen "at")
+#                        {"op": "commit", "at": ..., "complete": false}  (ends an upsert() that
+#                                            only added or updated some jobs)
+#   <file>.index.json  - [[id, content hash, first_seen, source, last_changed], ...] as of the last compaction,
+#                        so a merge never has to re-read the full snapshot
+JOURNAL_FILE_SUFFIX = ".journal"
+INDEX_FILE_SUFFIX = ".index.json"
+
+# Compact once the journal holds more ops than this, or than this fraction of live jobs
+COMPACT_MIN_OPS = 500
+COMPACT_RATIO = 0.5
+# Times load_jobs_with_journal re-reads the store when a compaction replaced it mid-load
+LOAD_ATTEMPTS = 3
+
+# Fields that make up a job's content hash (first_seen/last_seen/last_changed are bookkeeping, not content)
+_HASHED_FIELDS = ('title', 'company_name', 'remotive_url', 'category', 'publication_date',
+                  'description_html', 'candidate_required_location', 'salary', 'job_type')
+
+JobId = Union[int, str]
+# Stored state of a job: (content hash, first_seen, source, last_changed), datetimes as ISO strings
+JobState = Tuple[str, Optional[str], str, Optional[str]]
+
+
+def journal_filepath(filepath: str) -> str:
+    """Returns the path of the merge journal belonging to a jobs JSON file."""
+    return filepath + JOURNAL_FILE_SUFFIX
+
+def index_filepath(filepath: str) -> str:
+    """Returns the path of the id/hash index belonging to a jobs JSON file."""
+    return filepath + INDEX_FILE_SUFFIX
+
+def job_content_hash(job: Job) -> str:
+    """
+    Returns a stable hash of a job's content, used to detect changed postings.
+    The postings merged into a job (Job.sources) count as content once it has
+    any, so a changed duplicate group is stored even if the job itself is not.
+    """
+    job_dict = job_to_dict(job)
+    content = [job_dict[k] for k in _HASHED_FIELDS]
+    if job.sources:
+        content.append(job.sources)
+    payload = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _job_state(job: Job, content_hash: str) -> JobState:
+    return (content_hash, job.first_seen.isoformat() if job.first_seen else None, job.source or REMOTIVE_SOURCE,
+            job.last_changed.isoformat() if job.last_changed else None)
+
+def _op_state(op: Dict) -> JobState:
+    """The state of the job written by an upsert op."""
+    job = op['job']
+    return (op['hash'], job.get('first_seen'), job.get('source') or REMOTIVE_SOURCE, job.get('last_changed'))
+
+
+@dataclass
+class MergeResult:
+    new: List[Job] = field(default_factory=list)
+    changed: List[Job] = field(default_factory=list)
+    removed: List[JobId] = field(default_factory=list)
+    unchanged: int = 0
+    kept: int = 0 # Stored jobs of other feeds, left as they were
+    compacted: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.new or self.changed or self.removed)
+
+
+def _read_journal(filepath: str) -> Tuple[List[Tuple[List[Dict], Optional[str], str]], int]:
+    """
+    Reads the committed groups of ops from a journal file.
+
+    A trailing group without a commit line (e.g. a writer that crashed or is still
+    appending) is ignored, so readers only ever apply whole merges.
+
+    Returns:
+        A tuple of ([(ops, committed_at, source), ...], total number of op lines).
+        committed_at is None for groups written by JobJournal.upsert, which
+        did not see the complete job set; source is the feed a merge covered.
+    """
+    groups = []
+    op_count = 0
+    pending: List[Dict] = []
+    try:
+        with open(journal_filepath(filepath), 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break # Partially written line
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logging.error(f"Corrupt line in journal for {filepath}: {e}. Ignoring the rest of the journal.")
+                    break
+                op_count += 1
+                if op.get('op') == 'commit':
+                    groups.append((pending, op['at'] if op.get('complete', True) else None,
+                                   op.get('source', REMOTIVE_SOURCE)))
+                    pending = []
+                else:
+                    pending.append(op)
+    except FileNotFoundError:
+        pass
+    return groups, op_count
+
+def _stat_signature(filepath: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def load_jobs_with_journal(filepath: str, lazy_descriptions: bool = False) -> List[Job]:
+    """
+    Loads the compacted snapshot via load_jobs_from_json and replays the merge
+    journal on top of it. Behaves exactly like load_jobs_from_json when there is no journal.
+
+    If a compaction replaces the snapshot while it is being read (and then
+    empties the journal), the load is repeated, so the old snapshot is never
+    combined with the emptied journal.
+
+    Args:
+        filepath: The path to the jobs JSON file.
+        lazy_descriptions: Optional. Passed through to load_jobs_from_json. Jobs
+            upserted through the journal always carry their description.
+
+    Returns:
+        A list of Job objects, newest publication_date first if a journal was applied.
+    """
+    for attempt in range(1, LOAD_ATTEMPTS + 1):
+        signature = _stat_signature(filepath)
+        jobs = load_jobs_from_json(filepath, lazy_descriptions=lazy_descriptions)
+        groups, _ = _read_journal(filepath)
+        if _stat_signature(filepath) == signature:
+            break
+        logging.info(f"Job store {filepath} was compacted while it was loaded (attempt {attempt}); reloading.")
+    if not groups:
+        return jobs
+
+    jobs_by_id = {job.id: job for job in jobs}
+    upserted_in: Dict[JobId, int] = {} # Job id -> position of the last group that upserted it
+    for position, (ops, _, _) in enumerate(groups):
+        for op in ops:
+            if op['op'] == 'upsert':
+                job = job_from_dict(op['job'])
+                if job is not None:
+                    jobs_by_id[job.id] = job
+                    upserted_in[job.id] = position
+            elif op['op'] == 'remove':
+                jobs_by_id.pop(op['id'], None)
+
+    # Every merge covers the full fetched set of its feed, so all live jobs of that feed were
+    # seen at its last merge's commit; jobs upserted after it keep the last_seen they were written with
+    last_merges: Dict[str, Tuple[int, datetime]] = {} # Feed -> (position, commit time) of its last merge
+    for position, (_, committed_at, source) in enumerate(groups):
+        if committed_at is not None:
+            last_merges[source] = (position, datetime.fromisoformat(committed_at))
+    if last_merges:
+        for job in jobs_by_id.values():
+            last_merge = last_merges.get(job.source or REMOTIVE_SOURCE)
+            if last_merge is not None and upserted_in.get(job.id, -1) <= last_merge[0]:
+                job.last_seen = last_merge[1]
+
+    merged = list(jobs_by_id.values())
+    merged.sort(key=lambda job: job.publication_date, reverse=True)
+    logging.info(f"Applied {len(groups)} journaled merge(s) on top of {filepath}: {len(merged)} jobs.")
+    return merged
+
+
+class JobJournal:
+    """
+    Append-only merge store for one jobs JSON file.
+
+    merge() diffs a freshly fetched job list against the stored jobs of the same
+    feed (Job.source) by Job.id and content hash, appends only the new/changed/
+    removed jobs to the journal and periodically compacts everything back into
+    the regular JSON file (written with split descriptions), so a refresh costs
+    O(changes) in I/O. Jobs of other feeds are kept as they are.
+    """
+
+    def __init__(self, filepath: str = JOBS_JSON_FILEPATH,
+                 compact_min_ops: int = COMPACT_MIN_OPS, compact_ratio: float = COMPACT_RATIO):
+        self.filepath = filepath
+        self.compact_min_ops = compact_min_ops
+        self.compact_ratio = compact_ratio
+        self._upsert_state: Optional[Dict[JobId, JobState]] = None
+
+    def _load_state(self) -> Tuple[Dict[JobId, JobState], int, bool]:
+        """
+        Rebuilds {id: (hash, first_seen, source, last_changed)} from the index file plus the journal.
+
+        Returns:
+            A tuple of (state, journal op count, whether a compaction is required
+            because there was no index yet).
+        """
+        state: Dict[JobId, JobState] = {}
+        needs_compaction = False
+        try:
+            with open(index_filepath(self.filepath), 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    job_id, content_hash, first_seen = entry[:3]
+                    # Indexes written before sources and change times were recorded have fewer columns
+                    state[job_id] = (content_hash, first_seen, entry[3] if len(entry) > 3 else REMOTIVE_SOURCE,
+                                     entry[4] if len(entry) > 4 else None)
+        except FileNotFoundError:
+            # First merge, or a snapshot written by the old overwrite strategy: hash it once
+            needs_compaction = True
+            for job in load_jobs_from_json(self.filepath):
+                state[job.id] = _job_state(job, job_content_hash(job))
+
+        groups, op_count = _read_journal(self.filepath)
+        for ops, _, _ in groups:
+            for op in ops:
+                if op['op'] == 'upsert':
+                    state[op['job']['id']] = _op_state(op)
+                elif op['op'] == 'remove':
+                    state.pop(op['id'], None)
+        return state, op_count, needs_compaction
+
+    def merge(self, fetched_jobs: List[Job], seen_at: Optional[datetime] = None,
+              source: str = REMOTIVE_SOURCE) -> Optional[MergeResult]:
+        """
+        Merges a complete, freshly fetched job list of one feed into the store.
+
+        Sets first_seen/last_seen on the given Job objects, and last_changed
+        (seen_at for new and changed jobs, the stored one otherwise). Stored jobs of the
+        same feed that are missing from fetched_jobs are treated as vanished
+        and removed; jobs of other feeds (e.g. imported with upsert) are kept.
+
+        Args:
+            fetched_jobs: All jobs currently returned by the source.
+            seen_at: Optional. Timestamp of the fetch; defaults to now (UTC).
+            source: Optional. The feed fetched_jobs come from (Job.source);
+                defaults to the Remotive API.
+
+        Returns:
+            A MergeResult describing the delta, or None if writing failed.
+        """
+        seen_at = seen_at or datetime.now(timezone.utc)
+        seen_at_str = seen_at.isoformat()
+        state, op_count, needs_compaction = self._load_state()
+        self._upsert_state = None
+
+        result = MergeResult()
+        ops: List[Dict] = []
+        fetched_by_id: Dict[JobId, Job] = {}
+        for job in fetched_jobs:
+            fetched_by_id[job.id] = job # Later duplicates win
+
+        for job_id, job in fetched_by_id.items():
+            content_hash = job_content_hash(job)
+            previous = state.get(job_id)
+            job.last_seen = seen_at
+            job.last_changed = seen_at
+            if previous is None:
+                job.first_seen = seen_at
+                result.new.append(job)
+            else:
+                previous_hash, first_seen, previous_source, last_changed = previous
+                job.first_seen = datetime.fromisoformat(first_seen) if first_seen else seen_at
+                # A job taken over from another feed is rewritten, so it vanishes with this one
+                if previous_hash == content_hash and previous_source == (job.source or REMOTIVE_SOURCE):
+                    job.last_changed = datetime.fromisoformat(last_changed) if last_changed else None
+                    result.unchanged += 1
+                    continue
+                result.changed.append(job)
+            ops.append({"op": "upsert", "hash": content_hash, "job": job_to_dict(job)})
+
+        kept_ids = set()
+        for job_id, (_, _, job_source, _) in state.items():
+            if job_id in fetched_by_id:
+                continue
+            if job_source == source:
+                result.removed.append(job_id)
+                ops.append({"op": "remove", "id": job_id})
+            else:
+                kept_ids.add(job_id)
+        ops.append({"op": "commit", "at": seen_at_str, "source": source})
+
+        logging.info(f"Merge delta: {len(result.new)} new, {len(result.changed)} changed, "
+                     f"{len(result.removed)} removed, {result.unchanged} unchanged.")
+
+        result.kept = len(kept_ids)
+        live_count = len(fetched_by_id) + len(kept_ids)
+        compact = needs_compaction or op_count + len(ops) > max(self.compact_min_ops, self.compact_ratio * live_count)
+        # A journal that already holds ops gets this merge's ops too before it is compacted
+        # (see compact()); an empty one can be left as it is
+        journaled = op_count > 0 or not compact
+        if journaled and not self._append(ops):
+            return None
+        if compact:
+            live_jobs = list(fetched_by_id.values())
+            if kept_ids:
+                # This merge does not touch other feeds' jobs, so the stored copies are current
+                live_jobs += [job for job in load_jobs_with_journal(self.filepath) if job.id in kept_ids]
+            result.compacted = self.compact(live_jobs)
+            if not result.compacted and not journaled:
+                return None
+        return result
+
+    def _append(self, ops: List[Dict]) -> bool:
+        """Appends ops (ending with their commit line) to the journal and fsyncs it."""
+        try:
+            with open(journal_filepath(self.filepath), 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(op, ensure_ascii=False) + '\n' for op in ops))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logging.error(f"Could not append to journal for {self.filepath}: {e}")
+            return False
+        return True
+
+    def upsert(self, jobs: List[Job], seen_at: Optional[datetime] = None) -> Optional[MergeResult]:
+        """
+        Adds or updates some jobs without treating the rest as vanished, e.g.
+        one batch of a secondary source. Nothing is removed and the journal is
+        not compacted here (the next merge() takes care of that).
+
+        Keeps the stored first_seen of known jobs. New jobs keep the
+        first_seen/last_seen they carry, defaulting to seen_at. last_changed
+        is set as in merge().
+
+        Returns:
+            A MergeResult (removed is always empty), or None if writing failed.
+        """
+        seen_at = seen_at or datetime.now(timezone.utc)
+        # Consecutive batches reuse the state instead of re-reading the growing journal
+        if self._upsert_state is None:
+            self._upsert_state, _, _ = self._load_state()
+        state = self._upsert_state
+        result = MergeResult()
+        ops: List[Dict] = []
+        for job in {job.id: job for job in jobs}.values(): # Later duplicates win
+            content_hash = job_content_hash(job)
+            previous = state.get(job.id)
+            job.last_seen = job.last_seen or seen_at
+            job.last_changed = seen_at
+            if previous is None:
+                job.first_seen = job.first_seen or seen_at
+                result.new.append(job)
+            else:
+                previous_hash, first_seen, previous_source, last_changed = previous
+                job.first_seen = datetime.fromisoformat(first_seen) if first_seen else (job.first_seen or seen_at)
+                if previous_hash == content_hash and previous_source == (job.source or REMOTIVE_SOURCE):
+                    job.last_changed = datetime.fromisoformat(last_changed) if last_changed else None
+                    result.unchanged += 1
+                    continue
+                result.changed.append(job)
+            ops.append({"op": "upsert", "hash": content_hash, "job": job_to_dict(job)})
+        if not ops:
+            return result
+        ops.append({"op": "commit", "at": seen_at.isoformat(), "complete": False})
+
+        if not self._append(ops):
+            self._upsert_state = None
+            return None
+        for op in ops[:-1]:
+            state[op['job']['id']] = _op_state(op)
+        return result
+
+    def compact(self, jobs: List[Job]) -> bool:
+        """
+        Writes the full live job list as a new snapshot and index and empties the journal.
+
+        jobs must be the state the journal replays to (merge() appends its ops
+        first unless the journal is empty). Replaying the journal over the new
+        snapshot then changes nothing, so the snapshot, description file and
+        index are swapped in first and the journal is only emptied once they
+        are on disk: a concurrent reader, or a crash at any point, sees the old
+        snapshot with its journal or the new one, never a snapshot missing
+        journaled changes.
+
+        Returns:
+            True if compaction succeeded, False otherwise.
+        """
+        jobs = sorted(jobs, key=lambda job: job.publication_date, reverse=True)
+        tmp_filepath = self.filepath + ".tmp"
+        if not save_jobs_to_json(jobs, tmp_filepath, split_descriptions=True):
+            return False
+        try:
+            index = [[job.id, *_job_state(job, job_content_hash(job))] for job in jobs]
+            with open(index_filepath(tmp_filepath), 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            open(journal_filepath(tmp_filepath), 'w').close()
+
+            os.replace(description_filepath(tmp_filepath), description_filepath(self.filepath))
+            os.replace(tmp_filepath, self.filepath)
+            os.replace(index_filepath(tmp_filepath), index_filepath(self.filepath))
+            _fsync_directory(self.filepath)
+            os.replace(journal_filepath(tmp_filepath), journal_filepath(self.filepath))
+        except OSError as e:
+            logging.error(f"Could not compact job store {self.filepath}: {e}")
+            return False
+        logging.info(f"Compacted job store {self.filepath} ({len(jobs)} jobs).")
+        return True
+
+    def discard(self) -> None:
+        """
+        Removes the journal and index, e.g. before the JSON file is overwritten
+        wholesale, so stale ops are not replayed on top of the new file.
+        """
+        for path in (journal_filepath(self.filepath), index_filepath(self.filepath)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == '__main__':
+    test_filepath = "test_journal_jobs.json"
+
+    def make_job(job_id: int, title: str) -> Job:
+        return Job(id=job_id, title=title, company_name="Tech Co", remotive_url=f"http://example.com/{job_id}",
+                   category="dev", publication_date=datetime(2023, 1, job_id), description_html=f"<p>Job {job_id}</p>")
+
+    journal = JobJournal(test_filepath)
+    first = journal.merge([make_job(1, "Engineer"), make_job(2, "Designer")])
+    logging.info(f"First merge (expected 2 new, compacted): {len(first.new)} new, compacted={first.compacted}")
+
+    second = journal.merge([make_job(1, "Senior Engineer"), make_job(3, "Writer")])
+    logging.info(f"Second merge (expected 1 new, 1 changed, 1 removed): "
+                 f"{len(second.new)} new, {len(second.changed)} changed, {len(second.removed)} removed")
+
+    loaded = load_jobs_with_journal(test_filepath)
+    logging.info(f"Replayed store: {[(job.id, job.title) for job in loaded]} (expected ids 3 and 1)")
+    first_seen_kept = next(job for job in loaded if job.id == 1).first_seen == first.new[0].first_seen
+    logging.info(f"first_seen preserved across changes: {first_seen_kept}")
+
+    for path in (test_filepath, description_filepath(test_filepath), journal_filepath(test_filepath), index_filepath(test_filepath)):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,252 @@
+import base64
+import binascii
+import heapq
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from job_processor import Job
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py is accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def _timestamp(value: datetime) -> float:
+    """POSIX timestamp of a datetime, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+def _iter_from(items: List[int], start: int) -> Iterator[int]:
+    """Iterates items[start:] without copying (islice would step through items[:start])."""
+    for i in range(start, len(items)):
+        yield items[i]
+
+def parse_published_after(value: str) -> datetime:
+    """
+    Parses a published-after filter value (a date or an ISO 8601 datetime).
+
+    Raises:
+        ValueError: If the value is not a valid date.
+    """
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+def encode_cursor(job: Job) -> str:
+    """Encodes the keyset position just after job as an opaque URL-safe string."""
+    raw = f"{_timestamp(job.publication_date)!r}:{job.id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decodes a cursor from encode_cursor into its (timestamp, job id) key.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        timestamp, job_id = raw.split(':')
+        return float(timestamp), int(job_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}") from e
+
+
+class JobListingIndex:
+    """
+    Read-only index for paging through jobs newest first with filters.
+
+    Jobs are sorted once by publication_date descending (id descending as a
+    tie-break) into `ordered`. For each filterable field, the positions of
+    matching jobs in that order are kept as ascending lists. A page is then read
+    by bisecting to the cursor position and walking forward, so its cost
+    depends on the page size rather than the number of jobs. Filtering on a
+    rare value only walks that value's position list.
+
+    Cursors are keyset-based: (timestamp, id) of the last job of a page. They
+    stay valid when the index is rebuilt from a newer job list, and never skip
+    or repeat jobs that were already on the list.
+    """
+
+    FILTER_FIELDS = ('category', 'job_type', 'location')
+
+    def __init__(self, jobs: List[Job]):
+        self.ordered = sorted(jobs, key=lambda job: (_timestamp(job.publication_date), job.id), reverse=True)
+        # Ascending sort keys for bisect: (-timestamp, -id)
+        self._keys = [(-_timestamp(job.publication_date), -job.id) for job in self.ordered]
+        self._postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.FILTER_FIELDS}
+        # Original spelling of each normalized value, for building filter choices
+        self.values: Dict[str, Dict[str, str]] = {field: {} for field in self.FILTER_FIELDS}
+        for position, job in enumerate(self.ordered):
+            for field, value in (('category', job.category), ('job_type', job.job_type),
+                                 ('location', job.candidate_required_location)):
+                key = _normalize(value)
+                if key:
+                    self._postings[field].setdefault(key, []).append(position)
+                    self.values[field].setdefault(key, value)
+
+    def __len__(self) -> int:
+        return len(self.ordered)
+
+    def choices(self, field: str) -> List[str]:
+        """Distinct values of a filter field ('category', 'job_type' or 'location'), sorted."""
+        return sorted(self.values[field].values())
+
+    def job(self, row: int) -> Job:
+        return self.ordered[row]
+
+    def start_row(self, cursor: Optional[str]) -> int:
+        """
+        Returns the first row after a cursor (0 without one).
+
+        Raises:
+            InvalidCursorError: If cursor is malformed.
+        """
+        if not cursor:
+            return 0
+        timestamp, job_id = decode_cursor(cursor)
+        return bisect_right(self._keys, (-timestamp, -job_id))
+
+    def facet_rows(self) -> Iterator[Tuple]:
+        """Yields (id, category, job_type, candidate_required_location, salary) for every row, in order."""
+        for job in self.ordered:
+            yield job.id, job.category, job.job_type, job.candidate_required_location, job.salary
+
+    def _positions_from(self, field: str, value: str, start: int, partial: bool = False) -> Tuple[Iterator[int], int]:
+        """
+        Iterates, from position start on, the positions of jobs whose field
+        equals value (case-insensitive), or contains it if partial is True.
+
+        Returns:
+            (position iterator, upper bound on the number of matches).
+        """
+        key = _normalize(value)
+        postings = self._postings[field]
+        if partial:
+            matching = [positions for candidate, positions in postings.items() if key in candidate]
+        else:
+            matching = [postings[key]] if key in postings else []
+        # Each list is already ascending, so a lazy merge keeps the walk proportional to the page
+        iterators = [_iter_from(positions, bisect_left(positions, start)) for positions in matching]
+        return heapq.merge(*iterators), sum(len(positions) for positions in matching)
+
+    def page(self, category: Optional[str] = None, job_type: Optional[str] = None,
+             location: Optional[str] = None, published_after: Optional[datetime] = None,
+             cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Job], Optional[str]]:
+        """
+        Returns one page of jobs, newest first.
+
+        Args:
+            category: Optional. Exact category (case-insensitive).
+            job_type: Optional. Exact job type, e.g. "full_time" (case-insensitive).
+            location: Optional. Substring of candidate_required_location (case-insensitive).
+            published_after: Optional. Only jobs published at or after this time
+                (naive values are taken as UTC).
+            cursor: Optional. next_cursor from the previous page.
+            page_size: Optional. Number of jobs per page (1 to MAX_PAGE_SIZE).
+
+        Returns:
+            (jobs, next_cursor). next_cursor is None on the last page.
+        Raises:
+            InvalidCursorError: If cursor is malformed.
+        """
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        start = self.start_row(cursor)
+        stop = len(self.ordered)
+        if published_after is not None:
+            stop = bisect_right(self._keys, (-_timestamp(published_after), float('inf')))
+
+        filters = []
+        if category:
+            key = _normalize(category)
+            filters.append(('category', category, False, lambda job: _normalize(job.category) == key))
+        if job_type:
+            key_type = _normalize(job_type)
+            filters.append(('job_type', job_type, False, lambda job: _normalize(job.job_type) == key_type))
+        if location:
+            key_location = _normalize(location)
+            filters.append(('location', location, True, lambda job: key_location in _normalize(job.candidate_required_location)))
+
+        if not filters:
+            end = min(start + page_size, stop)
+            page = self.ordered[start:end]
+            has_more = end < stop
+        else:
+            # Walk the positions of the most selective filter and check the others per job
+            walks = [(self._positions_from(field, value, start, partial), predicate)
+                     for field, value, partial, predicate in filters]
+            walks.sort(key=lambda walk: walk[0][1])
+            (driver, _), _ = walks[0]
+            predicates = [predicate for _, predicate in walks[1:]]
+            page = []
+            has_more = False
+            for position in driver:
+                if position >= stop:
+                    break
+                job = self.ordered[position]
+                if all(predicate(job) for predicate in predicates):
+                    if len(page) == page_size:
+                        has_more = True
+                        break
+                    page.append(job)
+
+        next_cursor = encode_cursor(page[-1]) if page and has_more else None
+        return page, next_cursor
+
+
+if __name__ == '__main__':
+    from datetime import timedelta
+
+    base = datetime(2024, 1, 1)
+    categories = ["Software Development", "Design", "Marketing"]
+    test_jobs = [
+        Job(id=i, title=f"Job {i}", company_name="Tech Co", remotive_url=f"http://example.com/{i}",
+            category=categories[i % 3], publication_date=base + timedelta(hours=i // 2), description_html=None,
+            candidate_required_location="USA Only" if i % 2 else "Worldwide", job_type="full_time" if i % 4 else "contract")
+        for i in range(1, 101)
+    ]
+    index = JobListingIndex(test_jobs)
+
+    # Walking every page must return each job exactly once, newest first
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.page(cursor=cursor, page_size=7)
+        seen.extend(page)
+        if cursor is None:
+            break
+    expected = sorted(test_jobs, key=lambda job: (job.publication_date, job.id), reverse=True)
+    logging.info(f"Unfiltered paging returned all {len(seen)} jobs in order: {seen == expected}")
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.page(category="design", location="usa", cursor=cursor, page_size=5)
+        seen.extend(page)
+        if cursor is None:
+            break
+    expected = [job for job in expected if job.category == "Design" and "USA" in job.candidate_required_location]
+    logging.info(f"Filtered paging (design, usa) returned {len(seen)} jobs, matches a full scan: {seen == expected}")
+
+    page, _ = index.page(job_type="CONTRACT", published_after=base + timedelta(hours=40))
+    logging.info(f"Contract jobs published after hour 40: {[job.id for job in page]} (expected [100, 96, 92, 88, 84, 80])")
+
+    try:
+        index.page(cursor="not-a-cursor")
+    except InvalidCursorError as e:
+        logging.info(f"Bad cursor rejected: {e}")
@@ -1,90 +1,476 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import repeat
 import logging
+import multiprocessing
+import os
+import sys
 from typing import Optional, List, Dict, Union # Changed from typing.Optional for newer Python versions
 
+try:
+    from text_utils import strip_html
+    from salary_parser import Salary, parse_salary, NO_SALARY_DISPLAY
+    from metrics import timed, PROCESS_SECONDS, RECORDS_PROCESSED, RECORDS_SKIPPED
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure text_utils.py, salary_parser.py and metrics.py are accessible.")
+    raise
+
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+def pack_datetime(value: Optional[datetime]) -> Optional[int]:
+    """
+    Packs a datetime into one int: microseconds since the epoch, shifted left one
+    bit, with the low bit set for timezone-aware values (normalized to UTC).
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return ((value - _EPOCH) // _MICROSECOND) << 1
+    return (((value - _EPOCH_UTC) // _MICROSECOND) << 1) | 1
+
+def unpack_datetime(packed: Optional[int]) -> Optional[datetime]:
+    if packed is None:
+        return None
+    if packed & 1:
+        return _EPOCH_UTC + timedelta(microseconds=packed >> 1)
+    return _EPOCH + timedelta(microseconds=packed >> 1)
+
+
+class _PackedDatetime:
+    """
+    Descriptor exposing a datetime that is stored packed (see pack_datetime) in a slot.
+    With shared=True, equal packed values are shared between jobs; meant for
+    fields like first_seen/last_seen that take one value per update run.
+    """
+
+    SHARED_CACHE_SIZE = 4096
+
+    def __init__(self, shared: bool = False):
+        self.shared = shared
+        self._cache: Dict[int, int] = {}
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return unpack_datetime(getattr(instance, self.slot))
+
+    def __set__(self, instance, value):
+        packed = pack_datetime(value)
+        if self.shared and packed is not None:
+            if len(self._cache) >= self.SHARED_CACHE_SIZE:
+                self._cache.clear()
+            packed = self._cache.setdefault(packed, packed)
+        setattr(instance, self.slot, packed)
+
+
+class _InternedStr:
+    """
+    Descriptor for categorical string fields. Values are interned so that the
+    thousands of jobs sharing a category, job type, company or location all
+    point at a single string object.
+    """
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(instance, self.slot)
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, sys.intern(value) if type(value) is str else value)
+
+
+class _PrefixedStr:
+    """
+    Descriptor for URL fields. A known common prefix is stripped before storing
+    and put back on access, so only the part unique to each job is kept.
+    Any other value is stored wrapped in a 1-tuple, which marks it as not
+    stripped; such values are rare, so the wrapper costs little overall.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if type(value) is str:
+            return self.prefix + value
+        return value if value is None else value[0]
+
+    def __set__(self, instance, value):
+        if value is not None:
+            if type(value) is str and value.startswith(self.prefix):
+                value = value[len(self.prefix):]
+            else:
+                value = (value,)
+        setattr(instance, self.slot, value)
+
+
+class _ParsedSalary:
+    """
+    Descriptor for the raw salary string. It is parsed when set (see
+    salary_parser.parse_salary) and the shared Salary is stored in the slot, so
+    the numeric range and display string come for free on every construction
+    path (API ingest, JSON, SQLite, snapshot). Reading the field gives the raw string back.
+    """
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        return value.raw if type(value) is Salary else value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, parse_salary(value) if type(value) is str else value)
+
+
+REMOTIVE_JOB_URL_PREFIX = "https://remotive.com/remote-jobs/"
+# Job.source of jobs fetched from the Remotive API, and of jobs stored before sources were recorded
+REMOTIVE_SOURCE = "remotive"
+
 class Job:
-    id: int
-    title: str
-    company_name: str
-    remotive_url: str
-    category: str
-    publication_date: datetime
-    description_html: str
-    candidate_required_location: Optional[str] = None
-    salary: Optional[str] = None
-    job_type: Optional[str] = None
-    # company_logo: Optional[str] = None # Example of another optional field from API
+    """
+    A job posting.
 
-def process_api_jobs(api_job_list: List[Dict]) -> List[Job]:
+    Memory-optimized stand-in for a dataclass, since the app keeps every job in
+    memory: instances use __slots__ instead of a per-instance __dict__,
+    categorical fields are interned, datetimes are stored as a single packed
+    int, the common Remotive URL prefix is not stored per job and salaries are
+    parsed once per distinct string and shared (see salary_info). Attribute
+    access, keyword construction, equality and repr behave like the dataclass
+    this replaces; datetimes come back as new (equal) datetime objects on every
+    access, and aware ones are returned in UTC.
     """
-    Processes a list of raw job dictionaries from the Remotive API
-    and converts them into a list of structured Job objects.
 
-    Args:
-        api_job_list: A list of job dictionaries from fetch_raw_jobs.
+    __slots__ = ('id', 'title', '_company_name', '_remotive_url', '_category', '_publication_date',
+                 'description_html', '_candidate_required_location', '_salary', '_job_type',
+                 '_first_seen', '_last_seen', 'sources', '_source', '_last_changed')
 
-    Returns:
-        A list of Job dataclass objects.
+    # Field names in constructor order (what dataclasses.fields() used to provide)
+    FIELDS = ('id', 'title', 'company_name', 'remotive_url', 'category', 'publication_date',
+              'description_html', 'candidate_required_location', 'salary', 'job_type',
+              'first_seen', 'last_seen', 'sources', 'source', 'last_changed')
+
+    company_name = _InternedStr()
+    remotive_url = _PrefixedStr(REMOTIVE_JOB_URL_PREFIX)
+    category = _InternedStr()
+    publication_date = _PackedDatetime()
+    candidate_required_location = _InternedStr()
+    salary = _ParsedSalary()
+    job_type = _InternedStr()
+    # Tracked by job_journal when merging updates (mirrors firstSeen/lastSeen in the Mongo export)
+    first_seen = _PackedDatetime(shared=True)
+    last_seen = _PackedDatetime(shared=True)
+    # When a merge last stored new content for the job (None for jobs stored before it was
+    # tracked); what incremental exports filter on, see job_export.is_changed_since
+    last_changed = _PackedDatetime(shared=True)
+    # sources: every posting merged into this one by job_dedup ({"source", "id", "url"},
+    # this job first), or None if it has no near-duplicates
+    # Feed the job was stored from (REMOTIVE_SOURCE, export_source.EXPORT_SOURCE); a merge
+    # only removes vanished jobs of its own feed. None means REMOTIVE_SOURCE.
+    source = _InternedStr()
+    # company_logo: Optional[str] = None # Example of another optional field from API
+
+    def __init__(self, id: int, title: str, company_name: str, remotive_url: str, category: str,
+                 publication_date: datetime,
+                 description_html: Optional[str], # None when loaded with lazy_descriptions (see job_storage.DescriptionStore)
+                 candidate_required_location: Optional[str] = None, salary: Optional[str] = None,
+                 job_type: Optional[str] = None, first_seen: Optional[datetime] = None,
+                 last_seen: Optional[datetime] = None, sources: Optional[List[Dict]] = None,
+                 source: Optional[str] = None, last_changed: Optional[datetime] = None):
+        self.id = id
+        self.title = title
+        self.company_name = company_name
+        self.remotive_url = remotive_url
+        self.category = category
+        self.publication_date = publication_date
+        self.description_html = description_html
+        self.candidate_required_location = candidate_required_location
+        self.salary = salary
+        self.job_type = job_type
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self.sources = sources
+        self.source = source
+        self.last_changed = last_changed
+
+    @property
+    def salary_info(self) -> Optional[Salary]:
+        """The parsed salary (None if the job has none)."""
+        value = self._salary
+        return value if type(value) is Salary else None
+
+    @property
+    def salary_display(self) -> str:
+        """The salary as shown on the job list."""
+        info = self.salary_info
+        return info.display if info is not None else NO_SALARY_DISPLAY
+
+    def _astuple(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None # Mutable, like a non-frozen dataclass
+
+    def __reduce__(self):
+        # Unpickle through __init__ (e.g. jobs returned from worker processes), so
+        # strings are interned and datetimes packed in the receiving process
+        return (self.__class__, tuple(getattr(self, name) for name in self.FIELDS))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{self.__class__.__qualname__}({fields})"
+
+REQUIRED_API_FIELDS = ('id', 'title', 'company_name', 'url', 'category', 'publication_date', 'description')
+# Optional fields that are stripped of surrounding whitespace along with the required text fields
+_OPTIONAL_TEXT_FIELDS = ('candidate_required_location', 'salary', 'job_type')
+
+# Below this many raw jobs, process_api_jobs stays in-process: starting a pool and
+# pickling the records costs more than it saves
+PARALLEL_MIN_JOBS = 5000
+PARALLEL_CHUNK_SIZE = 1000
+# Pool workers are started fresh, not forked: run_update also runs in app.py's background
+# refresher thread, and a child forked from a multithreaded process can deadlock on a lock
+# (logging, malloc, the GIL's helpers) that another thread held at the time of the fork
+POOL_START_METHOD = "spawn"
+# Skipped records quoted in the summary log line
+MAX_SAMPLE_PROBLEMS = 5
+
+
+@dataclass
+class ProcessingResult:
+    jobs: List[Job] = field(default_factory=list)
+    # Plain-text descriptions by job id (see process_api_jobs_batch's extract_text)
+    description_texts: Dict[Union[int, str], str] = field(default_factory=dict)
+    missing_fields: int = 0
+    bad_dates: int = 0
+    errors: int = 0
+    sample_problems: List[str] = field(default_factory=list)
+
+    @property
+    def skipped(self) -> int:
+        return self.missing_fields + self.bad_dates + self.errors
+
+    def _note(self, problem: str) -> None:
+        if len(self.sample_problems) < MAX_SAMPLE_PROBLEMS:
+            self.sample_problems.append(problem)
+
+    def extend(self, other: "ProcessingResult") -> None:
+        """Appends the result of the next chunk, keeping input order."""
+        self.jobs.extend(other.jobs)
+        self.description_texts.update(other.description_texts)
+        self.missing_fields += other.missing_fields
+        self.bad_dates += other.bad_dates
+        self.errors += other.errors
+        for problem in other.sample_problems:
+            self._note(problem)
+
+
+@lru_cache(maxsize=4096)
+def _parse_api_date(date_str: str) -> datetime:
     """
-    processed_jobs = []
-    if not api_job_list:
-        return processed_jobs
+    Parses an API timestamp like "2023-10-26T10:00:00", with optional fractional
+    seconds or a 'Z' suffix. Cached, since many jobs of a feed share a timestamp.
+    """
+    # fromisoformat only accepts 'Z' from Python 3.11 on
+    if date_str.endswith('Z'):
+        date_str = date_str[:-1] + '+00:00'
+    return datetime.fromisoformat(date_str)
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
 
+def _process_chunk(api_job_list: List[Dict], extract_text: bool = False) -> ProcessingResult:
+    """
+    Validates and converts a list of raw jobs, in order. Runs in the worker
+    processes of process_api_jobs_batch, so problems are counted, not logged.
+    """
+    result = ProcessingResult()
     for raw_job in api_job_list:
         try:
-            # Ensure required fields are present
-            if not all(k in raw_job for k in ['id', 'title', 'company_name', 'url', 'category', 'publication_date', 'description']):
-                logging.warning(f"Skipping job due to missing required fields: {raw_job.get('id', 'Unknown ID')}")
+            if not all(k in raw_job for k in REQUIRED_API_FIELDS):
+                result.missing_fields += 1
+                result._note(f"job {raw_job.get('id', 'Unknown ID')}: missing required fields")
                 continue
-
-            # Convert publication_date string to datetime object
-            # The API format is like "2023-10-26T10:00:00"
-            # Sometimes it might have milliseconds or 'Z' for UTC, robust parsing is good.
-            date_str = raw_job['publication_date']
             try:
-                # Attempt to parse with 'Z' if present, then try without
-                # Python's fromisoformat handles 'Z' as UTC correctly since 3.11
-                # For broader compatibility, replace 'Z' if older Python or handle explicitly
-                if date_str.endswith('Z'):
-                    parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    parsed_date = datetime.fromisoformat(date_str)
-            except ValueError as ve_date:
-                logging.warning(f"Could not parse date string '{date_str}' for job ID {raw_job['id']}: {ve_date}. Skipping date.")
-                # Fallback or skip job if date is crucial and unparseable
-                # For now, let's make it a required field, so if it fails, we skip the job or handle as an error.
-                # Alternatively, set publication_date to None or a default if it's optional in your model.
-                logging.warning(f"Skipping job ID {raw_job['id']} due to unparseable publication_date.")
+                parsed_date = _parse_api_date(raw_job['publication_date'])
+            except (ValueError, TypeError, AttributeError):
+                result.bad_dates += 1
+                result._note(f"job {raw_job['id']}: unparseable publication_date {raw_job['publication_date']!r}")
                 continue
-            
+
             job = Job(
                 id=raw_job['id'],
-                title=raw_job['title'],
-                company_name=raw_job['company_name'],
+                title=_clean(raw_job['title']),
+                company_name=_clean(raw_job['company_name']),
                 remotive_url=raw_job['url'], # Mapping 'url' from API to 'remotive_url'
-                category=raw_job['category'],
+                category=_clean(raw_job['category']),
                 publication_date=parsed_date,
                 description_html=raw_job['description'], # Storing HTML as is for now
-                candidate_required_location=raw_job.get('candidate_required_location'),
-                salary=raw_job.get('salary'),
-                job_type=raw_job.get('job_type')
+                candidate_required_location=_clean(raw_job.get('candidate_required_location')),
+                salary=_clean(raw_job.get('salary')),
+                job_type=_clean(raw_job.get('job_type')),
+                # Not sent by the Remotive API; set by source adapters such as export_source
+                first_seen=raw_job.get('first_seen'),
+                last_seen=raw_job.get('last_seen'),
+                source=raw_job.get('source', REMOTIVE_SOURCE)
                 # company_logo=raw_job.get('company_logo')
             )
-            processed_jobs.append(job)
-        except KeyError as e:
-            logging.warning(f"Skipping job due to missing key: {e}. Raw job data: {raw_job}")
+            if extract_text:
+                result.description_texts[job.id] = strip_html(job.description_html)
+            result.jobs.append(job)
         except Exception as e:
-            logging.error(f"An unexpected error occurred while processing job ID {raw_job.get('id', 'Unknown ID')}: {e}")
-            # Depending on severity, you might want to re-raise or just skip the job
-    
-    return processed_jobs
+            result.errors += 1
+            result._note(f"job {raw_job.get('id', 'Unknown ID') if isinstance(raw_job, dict) else raw_job!r}: {e!r}")
+    return result
+
+@timed(PROCESS_SECONDS)
+def process_api_jobs_batch(api_job_list: List[Dict], workers: Optional[int] = None,
+                           chunk_size: int = PARALLEL_CHUNK_SIZE, extract_text: bool = False) -> ProcessingResult:
+    """
+    Processes raw jobs like process_api_jobs, splitting large lists into chunks
+    that are processed across a process pool. Jobs come back in input order;
+    skipped records are counted and summarized in one log line.
+
+    Args:
+        api_job_list: A list of job dictionaries from fetch_raw_jobs.
+        workers: Optional. Number of worker processes (default: one per CPU).
+            Lists shorter than PARALLEL_MIN_JOBS, or workers=1, are processed
+            in this process.
+        chunk_size: Optional. Raw jobs per pool task.
+        extract_text: Optional. If True, also converts each description to plain
+            text (text_utils.strip_html) in the workers, for job_db's full-text index.
+
+    Returns:
+        A ProcessingResult with the jobs, the plain-text descriptions (if
+        requested) and the skip counts.
+    """
+    if not api_job_list:
+        return ProcessingResult()
+
+    workers = workers or os.cpu_count() or 1
+    result = None
+    if workers > 1 and len(api_job_list) >= PARALLEL_MIN_JOBS:
+        chunks = [api_job_list[i:i + chunk_size] for i in range(0, len(api_job_list), chunk_size)]
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                     mp_context=multiprocessing.get_context(POOL_START_METHOD)) as pool:
+                result = ProcessingResult()
+                # map() yields chunk results in submission order
+                for chunk_result in pool.map(_process_chunk, chunks, repeat(extract_text)):
+                    result.extend(chunk_result)
+        except (OSError, BrokenProcessPool) as e:
+            logging.warning(f"Could not process jobs in a process pool ({e}); processing them serially.")
+            result = None
+    if result is None:
+        result = _process_chunk(api_job_list, extract_text)
+
+    RECORDS_PROCESSED.inc(len(result.jobs))
+    RECORDS_SKIPPED.inc(result.skipped)
+    if result.skipped:
+        logging.warning(f"Skipped {result.skipped} of {len(api_job_list)} raw jobs: {result.missing_fields} missing required fields, "
+                        f"{result.bad_dates} with an unparseable publication_date, {result.errors} unexpected errors "
+                        f"(e.g. {'; '.join(result.sample_problems)}).")
+    return result
+
+def process_api_jobs(api_job_list: List[Dict], workers: Optional[int] = None) -> List[Job]:
+    """
+    Processes a list of raw job dictionaries from the Remotive API
+    and converts them into a list of structured Job objects.
+
+    Args:
+        api_job_list: A list of job dictionaries from fetch_raw_jobs.
+        workers: Optional. Worker processes for large lists (see process_api_jobs_batch).
+
+    Returns:
+        A list of Job objects, in input order. Jobs with missing required fields
+        or an unparseable publication_date are skipped.
+    """
+    return process_api_jobs_batch(api_job_list, workers=workers).jobs
+
+def _measure_job_memory(job_count: int = 100_000) -> Dict[str, float]:
+    """
+    Measures the memory (tracemalloc) per job of holding job_count processed jobs,
+    for this Job and for the plain @dataclass it replaced. Descriptions are left
+    out, as the app loads them lazily.
+    """
+    import json
+    import tracemalloc
+    from dataclasses import make_dataclass
+
+    PlainJob = make_dataclass('PlainJob', [(name, object, field(default=None)) for name in Job.FIELDS])
+    categories = ["Software Development", "Design", "Marketing", "Customer Service", "Data"]
+    locations = ["Worldwide", "USA Only", "Europe", "Americas, Europe"]
+    # Round-trip through JSON so every record gets its own string objects, as when loading from disk
+    payload = json.dumps([{
+        'id': 1_900_000 + i, 'title': f"Senior Software Engineer {i}", 'company_name': f"Company {i % 500}",
+        'remotive_url': f"{REMOTIVE_JOB_URL_PREFIX}{categories[i % len(categories)].lower().replace(' ', '-')}/senior-software-engineer-{1_900_000 + i}",
+        'category': categories[i % len(categories)], 'publication_date': f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+        'candidate_required_location': locations[i % len(locations)], 'salary': "", 'job_type': "full_time",
+        'first_seen': "2024-02-01T00:00:00", 'last_seen': "2024-02-02T00:00:00"} for i in range(job_count)])
+
+    results = {}
+    for label, cls in (('dataclass', PlainJob), ('slotted', Job)):
+        tracemalloc.start()
+        jobs = [cls(id=r['id'], title=r['title'], company_name=r['company_name'], remotive_url=r['remotive_url'],
+                    category=r['category'], publication_date=datetime.fromisoformat(r['publication_date']),
+                    description_html=None, candidate_required_location=r['candidate_required_location'],
+                    salary=r['salary'], job_type=r['job_type'], first_seen=datetime.fromisoformat(r['first_seen']),
+                    last_seen=datetime.fromisoformat(r['last_seen'])) for r in json.loads(payload)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = current / job_count
+        del jobs
+    return results
 
 if __name__ == '__main__':
+    logging.info("--- Measuring Job memory footprint at 100k jobs ---")
+    bytes_per_job = _measure_job_memory()
+    logging.info(f"Plain dataclass: {bytes_per_job['dataclass']:.0f} B/job, slotted Job: {bytes_per_job['slotted']:.0f} B/job "
+                 f"({bytes_per_job['dataclass'] / bytes_per_job['slotted']:.1f}x smaller)")
+
+    logging.info("--- Comparing serial and process-pool ingestion of 50k raw jobs ---")
+    try:
+        import time
+        from remotive_stub_server import make_raw_jobs
+        synthetic_raw_jobs = make_raw_jobs(50_000)
+        for raw_job in synthetic_raw_jobs:
+            raw_job['description'] = "<div><p>We are <strong>hiring</strong> &amp; growing.</p><ul>" + "<li>Python, SQL</li>" * 10 + "</ul></div>"
+        timings = {}
+        for label, workers in (('serial', 1), ('pool', None)):
+            start = time.perf_counter()
+            timings[label] = process_api_jobs_batch(synthetic_raw_jobs, workers=workers, extract_text=True), time.perf_counter() - start
+        (serial_result, serial_seconds), (pool_result, pool_seconds) = timings['serial'], timings['pool']
+        logging.info(f"Serial: {serial_seconds:.2f}s, {os.cpu_count()} CPU pool: {pool_seconds:.2f}s; "
+                     f"same jobs in the same order: {serial_result.jobs == pool_result.jobs}")
+    except ImportError:
+        logging.error("remotive_stub_server.py not found; skipping the ingestion comparison.")
+
     # This requires remotive_client.py to be in the same directory or Python path
     try:
         from remotive_client import fetch_raw_jobs
@@ -0,0 +1,787 @@
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate, compress
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fuzzy_vocabulary import DEFAULT_MAX_EDIT_DISTANCE, PREFIX_LENGTH, allowed_distance, edit_distance, generate_deletes
+from text_utils import strip_html, tokenize
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DATA_DIR = "data"
+SEARCH_INDEX_FILEPATH = os.path.join(DATA_DIR, "search_index.bin")
+
+# Indexed Job fields and their boosts (BM25F-style: per-field term frequencies
+# are length-normalized and weighted before BM25 saturation)
+FIELD_BOOSTS = (
+    ("title", 3.0),
+    ("company_name", 2.0),
+    ("category", 1.5),
+    ("candidate_required_location", 1.0),
+    ("description", 1.0),
+)
+K1 = 1.2
+B = 0.75
+# Score multiplier per edit for fuzzy matches, so exact hits rank first
+FUZZY_PENALTY = 0.6
+# Indexed terms a misspelled query token is expanded to at most
+MAX_FUZZY_EXPANSIONS = 3
+# save() drops removed documents from the file once they make up more than this share of it
+COMPACT_RATIO = 0.25
+
+# Index file layout (all sections in machine byte order, each 8-byte aligned),
+# like job_snapshot.py: [sections][json footer][trailer]
+# Documents and terms are numbered in the order they were added. Removing a
+# job only marks its document dead, so saving an updated index copies the
+# existing postings as they are and appends the new ones.
+# Sections:
+#   doc_ids                    int64 job id per document
+#   dead                       uint8 per document, 1 once it was removed or replaced
+#   by_id                      uint32 document numbers ordered by job id, for lookups
+#   lengths_<field>            uint32 tokens in the field per document
+#   term_offsets, term_heap    uint64 offsets (terms + 1) into the utf-8 terms
+#   term_table                 uint32 term number + 1 per slot of a hash table (crc32, linear probing)
+#   postings_offsets           uint64 offsets (terms + 1) into the postings
+#   postings_docs              uint32 document numbers, ascending within each term
+#   tf_<field>                 uint16 term frequency in the field, parallel to postings_docs
+#   deletes                    uint64 crc32 of a delete << 32 | term number, ascending: the
+#                              symmetric-delete index of fuzzy_vocabulary.FuzzyVocabulary
+_INDEX_MAGIC = b"ATLSRCH1"
+_INDEX_TRAILER = struct.Struct(">Q8s")
+_FORMAT_VERSION = 1
+_MAX_TF = 0xFFFF
+_TERM_MASK = 0xFFFFFFFF
+
+_FIELD_NAMES = tuple(name for name, _ in FIELD_BOOSTS)
+_SECTION_FORMATS = {'doc_ids': 'q', 'dead': 'B', 'by_id': 'I', 'term_offsets': 'Q', 'term_heap': 'B',
+                    'term_table': 'I', 'postings_offsets': 'Q', 'postings_docs': 'I', 'deletes': 'Q'}
+_SECTION_FORMATS.update({'lengths_' + name: 'I' for name in _FIELD_NAMES})
+_SECTION_FORMATS.update({'tf_' + name: 'H' for name in _FIELD_NAMES})
+
+
+def job_field_texts(job, description_html: Optional[str] = None) -> List[str]:
+    """
+    Returns the text of each indexed field of a job, in FIELD_BOOSTS order.
+
+    Args:
+        job: The Job to index.
+        description_html: Optional. The job's description if job.description_html
+            was not loaded (see job_storage.DescriptionStore).
+    """
+    description = description_html if description_html is not None else job.description_html
+    return [
+        job.title or "",
+        job.company_name or "",
+        job.category or "",
+        job.candidate_required_location or "",
+        strip_html(description or ""),
+    ]
+
+def _empty_sections() -> Dict[str, array]:
+    sections = {name: array(code) for name, code in _SECTION_FORMATS.items()}
+    sections['term_offsets'].append(0)
+    sections['postings_offsets'].append(0)
+    return sections
+
+def _raw(section) -> memoryview:
+    """A section (array or mapped memoryview) as bytes, for array.frombytes."""
+    return memoryview(section).cast('B')
+
+def _insert_term(table: array, encoded: bytes, number: int) -> None:
+    mask = len(table) - 1
+    slot = zlib.crc32(encoded) & mask
+    while table[slot]:
+        slot = (slot + 1) & mask
+    table[slot] = number + 1
+
+def _term_table(term_heap: bytearray, term_offsets: array) -> array:
+    """Builds the term_table section for the terms in term_heap, sized to be at most half full."""
+    term_count = len(term_offsets) - 1
+    table = array('I', [0]) * (1 << (2 * term_count).bit_length())
+    for number in range(term_count):
+        _insert_term(table, bytes(term_heap[term_offsets[number]:term_offsets[number + 1]]), number)
+    return table
+
+def _compact(sections: Dict[str, object], footer: Dict) -> None:
+    """
+    Drops the dead documents, and the terms left without postings, from the
+    sections built by SearchIndex.save(), renumbering both.
+    """
+    live = bytes(1 - flag for flag in sections['dead'])
+    renumbered = array('I', accumulate(live, initial=0)) # live documents before each document
+    doc_ids = array('q', compress(sections['doc_ids'], live))
+    sections['doc_ids'] = doc_ids
+    sections['dead'] = bytearray(len(doc_ids))
+    sections['by_id'] = array('I', sorted(range(len(doc_ids)), key=doc_ids.__getitem__))
+    for name in _FIELD_NAMES:
+        sections['lengths_' + name] = array('I', compress(sections['lengths_' + name], live))
+
+    docs = sections['postings_docs']
+    kept = bytes(live[doc] for doc in docs)
+    kept_before = array('Q', accumulate(kept, initial=0)) # kept postings before each posting
+    sections['postings_docs'] = array('I', (renumbered[doc] for doc in compress(docs, kept)))
+    for name in _FIELD_NAMES:
+        sections['tf_' + name] = array('H', compress(sections['tf_' + name], kept))
+
+    postings_offsets, term_offsets, term_heap = sections['postings_offsets'], sections['term_offsets'], sections['term_heap']
+    kept_postings_offsets, kept_term_offsets, kept_term_heap = array('Q', [0]), array('Q', [0]), bytearray()
+    renumbered_terms = array('q', [-1]) * (len(term_offsets) - 1)
+    for number in range(len(term_offsets) - 1):
+        end = kept_before[postings_offsets[number + 1]]
+        if end > kept_postings_offsets[-1]:
+            renumbered_terms[number] = len(kept_postings_offsets) - 1
+            kept_postings_offsets.append(end)
+            kept_term_heap += term_heap[term_offsets[number]:term_offsets[number + 1]]
+            kept_term_offsets.append(len(kept_term_heap))
+    sections['term_offsets'] = kept_term_offsets
+    sections['term_heap'] = kept_term_heap
+    sections['term_table'] = _term_table(kept_term_heap, kept_term_offsets)
+    sections['postings_offsets'] = kept_postings_offsets
+    # Renumbering keeps the order of the terms, so the deletes stay sorted
+    sections['deletes'] = array('Q', (entry >> 32 << 32 | renumbered_terms[entry & _TERM_MASK] for entry in sections['deletes']
+                                      if renumbered_terms[entry & _TERM_MASK] >= 0))
+    footer['documents'] = len(doc_ids)
+    footer['terms'] = len(kept_term_offsets) - 1
+
+
+class SearchIndex:
+    """
+    Inverted index over Job records with BM25F ranking.
+
+    Postings are packed arrays: per term, the ascending document numbers
+    (uint32) and, in parallel, one uint16 term frequency per indexed field.
+    A saved index is memory-mapped by load(), like job_snapshot.py, so
+    loading it does not parse anything and processes share its pages.
+    Jobs can be added and removed incrementally: additions are kept in
+    memory after the mapped postings and removals only mark documents dead
+    (they are skipped when scoring), until save() writes both out.
+
+    Misspelled query terms are expanded through a symmetric-delete index
+    (as in fuzzy_vocabulary.FuzzyVocabulary) that is saved with the index:
+    save() only generates the deletes of new terms, and a loaded index looks
+    them up in the mapped file instead of building a vocabulary first.
+    """
+
+    def __init__(self, max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE):
+        self.max_edit_distance = max_edit_distance
+        # The mapped file's sections (empty arrays for a new index)
+        self._base: Dict[str, object] = _empty_sections()
+        self._base_docs = 0
+        self._base_terms = 0
+        self._mm: Optional[mmap.mmap] = None
+        # Documents and terms added since, numbered after the base ones
+        self._added_ids = array('q')
+        self._added_lengths = [array('I') for _ in FIELD_BOOSTS]
+        self._added_docs: Dict[int, int] = {} # job id -> document number
+        self._new_terms: List[str] = []
+        # term -> (term number, document numbers, per-field term frequencies interleaved)
+        self._added_postings: Dict[str, Tuple[int, array, array]] = {}
+        self._dead = bytearray()
+        self._live = 0
+        self._total_field_lengths = [0] * len(FIELD_BOOSTS)
+        # delete -> numbers of new terms, built on the first fuzzy lookup that needs it
+        self._added_deletes: Dict[str, List[int]] = {}
+        self._added_deletes_terms = 0 # new terms in _added_deletes so far
+        self._added_deletes_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _term_count(self) -> int:
+        return self._base_terms + len(self._new_terms)
+
+    def _term(self, number: int) -> str:
+        if number >= self._base_terms:
+            return self._new_terms[number - self._base_terms]
+        offsets = self._base['term_offsets']
+        return str(self._base['term_heap'][offsets[number]:offsets[number + 1]], 'utf-8')
+
+    def _term_number(self, term: str) -> Optional[int]:
+        """Returns the number of an indexed term, or None."""
+        added = self._added_postings.get(term)
+        if added is not None or not self._base_terms:
+            return added[0] if added is not None else None
+        encoded = term.encode('utf-8')
+        table, offsets, heap = self._base['term_table'], self._base['term_offsets'], self._base['term_heap']
+        mask = len(table) - 1
+        slot = zlib.crc32(encoded) & mask
+        while table[slot]:
+            number = table[slot] - 1
+            if heap[offsets[number]:offsets[number + 1]] == encoded:
+                return number
+            slot = (slot + 1) & mask
+        return None
+
+    def _doc_id(self, doc: int) -> int:
+        if doc >= self._base_docs:
+            return self._added_ids[doc - self._base_docs]
+        return self._base['doc_ids'][doc]
+
+    def _doc_length(self, field_number: int, doc: int) -> int:
+        if doc >= self._base_docs:
+            return self._added_lengths[field_number][doc - self._base_docs]
+        return self._base['lengths_' + _FIELD_NAMES[field_number]][doc]
+
+    def _find_doc(self, job_id: int) -> Optional[int]:
+        """Returns the live document number of a job, or None if it is not indexed."""
+        doc = self._added_docs.get(job_id)
+        if doc is not None:
+            return None if self._dead[doc] else doc
+        by_id, ids = self._base['by_id'], self._base['doc_ids']
+        low, high = 0, self._base_docs
+        while low < high:
+            middle = (low + high) // 2
+            if ids[by_id[middle]] < job_id:
+                low = middle + 1
+            else:
+                high = middle
+        # Replaced versions of a job stay in the file (dead) next to the live one
+        while low < self._base_docs and ids[by_id[low]] == job_id:
+            if not self._dead[by_id[low]]:
+                return by_id[low]
+            low += 1
+        return None
+
+    def _segments(self, number: int) -> List[Tuple]:
+        """
+        Returns the postings of a term as (document numbers, per-field term
+        frequencies, per-field document lengths, first document number of the
+        lengths) tuples: one for the mapped file and one for the added jobs.
+        """
+        segments = []
+        if number < self._base_terms:
+            offsets = self._base['postings_offsets']
+            start, end = offsets[number], offsets[number + 1]
+            segments.append((self._base['postings_docs'][start:end],
+                             [self._base['tf_' + name][start:end] for name in _FIELD_NAMES],
+                             [self._base['lengths_' + name] for name in _FIELD_NAMES], 0))
+        added = self._added_postings.get(self._term(number))
+        if added is not None:
+            _, docs, tfs = added
+            segments.append((docs, [tfs[field_number::len(FIELD_BOOSTS)] for field_number in range(len(FIELD_BOOSTS))],
+                             self._added_lengths, self._base_docs))
+        return segments
+
+    def _is_live(self, number: int) -> bool:
+        """True if a live document contains the term."""
+        dead = self._dead
+        return any(not dead[doc] for docs, _, _, _ in self._segments(number) for doc in docs)
+
+    def _document_frequency(self, number: int) -> int:
+        """Number of live documents containing the term."""
+        dead = self._dead
+        return sum(not dead[doc] for docs, _, _, _ in self._segments(number) for doc in docs)
+
+    def add(self, job, description_html: Optional[str] = None) -> None:
+        """
+        Indexes a job, replacing any previous version with the same id.
+        """
+        self.remove(job.id)
+
+        field_tokens = [tokenize(text) for text in job_field_texts(job, description_html)]
+        lengths = [len(tokens) for tokens in field_tokens]
+        frequencies: Dict[str, Sequence[int]] = {}
+        for field_number, tokens in enumerate(field_tokens[:-1]):
+            for term, count in Counter(tokens).items():
+                frequencies.setdefault(term, [0] * len(FIELD_BOOSTS))[field_number] = count
+        # Most terms only occur in the description (the last field) and get a tuple instead of a list
+        other_fields = (0,) * (len(FIELD_BOOSTS) - 1)
+        for term, count in Counter(field_tokens[-1]).items():
+            tfs = frequencies.get(term)
+            if tfs is None:
+                frequencies[term] = other_fields + (count,)
+            else:
+                tfs[-1] = count
+        if max(lengths) > _MAX_TF:
+            frequencies = {term: [min(tf, _MAX_TF) for tf in tfs] for term, tfs in frequencies.items()}
+
+        doc = self._base_docs + len(self._added_ids)
+        self._added_ids.append(job.id)
+        for field_number, length in enumerate(lengths):
+            self._added_lengths[field_number].append(length)
+            self._total_field_lengths[field_number] += length
+        self._added_docs[job.id] = doc
+        self._dead.append(0)
+        self._live += 1
+
+        added_postings = self._added_postings
+        for term, tfs in frequencies.items():
+            postings = added_postings.get(term)
+            if postings is None:
+                number = self._term_number(term)
+                if number is None:
+                    number = self._term_count()
+                    self._new_terms.append(term)
+                postings = added_postings[term] = (number, array('I'), array('H'))
+            postings[1].append(doc)
+            postings[2].extend(tfs)
+
+    def remove(self, job_id: int) -> bool:
+        """
+        Removes a job from the index. Returns False if it was not indexed.
+        """
+        doc = self._find_doc(job_id)
+        if doc is None:
+            return False
+        self._dead[doc] = 1
+        self._live -= 1
+        for field_number in range(len(FIELD_BOOSTS)):
+            self._total_field_lengths[field_number] -= self._doc_length(field_number, doc)
+        return True
+
+    def _delete_candidates(self, delete: str) -> Iterable[int]:
+        """Numbers of the saved terms indexed under a delete (plus crc32 collisions)."""
+        deletes = self._base['deletes']
+        key = zlib.crc32(delete.encode('utf-8'))
+        position = bisect_left(deletes, key << 32)
+        while position < len(deletes) and deletes[position] >> 32 == key:
+            yield deletes[position] & _TERM_MASK
+            position += 1
+
+    def _new_term_deletes(self) -> Dict[str, List[int]]:
+        """The delete index of the terms added since the index was loaded, extended to the current ones."""
+        if self._added_deletes_terms < len(self._new_terms):
+            with self._added_deletes_lock:
+                for number in range(self._base_terms + self._added_deletes_terms, self._term_count()):
+                    for delete in generate_deletes(self._term(number), self.max_edit_distance):
+                        self._added_deletes.setdefault(delete, []).append(number)
+                    self._added_deletes_terms += 1
+        return self._added_deletes
+
+    def fuzzy_lookup(self, token: str, max_edit_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Finds indexed terms within the allowed edit distance of token, like
+        fuzzy_vocabulary.FuzzyVocabulary.lookup.
+
+        Args:
+            token: The (possibly misspelled) query token.
+            max_edit_distance: Optional. Upper bound on edits, never more than the
+                index was built for. Shorter tokens get fewer (see allowed_distance).
+
+        Returns:
+            Up to MAX_FUZZY_EXPANSIONS (term, distance) tuples, closest and then
+            most frequent first. An exact match is returned alone with distance 0.
+        """
+        number = self._term_number(token)
+        if number is not None and self._is_live(number):
+            return [(token, 0)]
+        limit = min(self.max_edit_distance if max_edit_distance is None else max_edit_distance, self.max_edit_distance)
+        limit = allowed_distance(token, limit)
+        if limit == 0:
+            return []
+
+        new_term_deletes = self._new_term_deletes()
+        candidates = set()
+        for delete in generate_deletes(token, self.max_edit_distance):
+            candidates.update(self._delete_candidates(delete))
+            candidates.update(new_term_deletes.get(delete, ()))
+
+        matches = []
+        for number in candidates:
+            term = self._term(number)
+            distance = edit_distance(token, term, limit)
+            if distance <= limit:
+                # Terms of removed jobs stay in the delete index until the file is compacted
+                document_frequency = self._document_frequency(number)
+                if document_frequency:
+                    matches.append((term, distance, document_frequency))
+        matches.sort(key=lambda match: (match[1], -match[2], match[0]))
+        return [(term, distance) for term, distance, _ in matches[:MAX_FUZZY_EXPANSIONS]]
+
+    def expand_query(self, query: str, max_edit_distance: Optional[int] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Maps each query token to the indexed terms it should match.
+
+        Tokens that are indexed map to themselves; unknown tokens map to the
+        closest indexed terms within the edit distance (empty if none).
+
+        Returns:
+            {token: [(term, edit distance), ...]}
+        """
+        return {token: self.fuzzy_lookup(token, max_edit_distance) for token in dict.fromkeys(tokenize(query))}
+
+    def search(self, query: str, k: int = 10, allowed: Optional[Callable[[int], bool]] = None,
+               fuzzy: bool = True, expansions: Optional[Dict[str, List[Tuple[str, int]]]] = None) -> List[Tuple[int, float]]:
+        """
+        Ranks indexed jobs against a free-text query.
+
+        Args:
+            query: The search text.
+            k: Optional. Number of results to return.
+            allowed: Optional. Predicate on job ids; jobs failing it are skipped.
+            fuzzy: Optional. If True, misspelled tokens also match close indexed
+                terms (weighted down by FUZZY_PENALTY per edit).
+            expansions: Optional. A precomputed expand_query() result.
+
+        Returns:
+            Up to k (job id, score) tuples, best first. Uses a heap, so only the
+            top k are ever ordered.
+        """
+        doc_count = self._live
+        if not doc_count:
+            return []
+        if expansions is None:
+            expansions = self.expand_query(query, None if fuzzy else 0)
+        # term -> weight; a term reached from several tokens keeps its best weight
+        term_weights: Dict[str, float] = {}
+        for matches in expansions.values():
+            for term, distance in matches:
+                term_weights[term] = max(term_weights.get(term, 0.0), FUZZY_PENALTY ** distance)
+        if not term_weights:
+            return []
+
+        average_lengths = [max(total / doc_count, 1e-9) for total in self._total_field_lengths]
+        boosts = [boost for _, boost in FIELD_BOOSTS]
+        dead = self._dead
+        scores: Dict[int, float] = {}
+        for term, term_weight in term_weights.items():
+            number = self._term_number(term)
+            if number is None:
+                continue
+            # document number -> boosted, length-normalized term frequency summed over the fields
+            weighted_tfs: Dict[int, float] = {}
+            for docs, field_tfs, field_lengths, first_doc in self._segments(number):
+                for field_number, tfs in enumerate(field_tfs):
+                    lengths, boost, average_length = field_lengths[field_number], boosts[field_number], average_lengths[field_number]
+                    for doc, tf in zip(compress(docs, tfs), compress(tfs, tfs)):
+                        if not dead[doc]:
+                            norm = 1 - B + B * lengths[doc - first_doc] / average_length
+                            weighted_tfs[doc] = weighted_tfs.get(doc, 0.0) + boost * tf / norm
+            if not weighted_tfs:
+                continue
+            idf = term_weight * math.log(1 + (doc_count - len(weighted_tfs) + 0.5) / (len(weighted_tfs) + 0.5))
+            for doc, weighted_tf in weighted_tfs.items():
+                scores[doc] = scores.get(doc, 0.0) + idf * weighted_tf * (K1 + 1) / (weighted_tf + K1)
+
+        candidates: Iterable[Tuple[int, float]] = ((self._doc_id(doc), score) for doc, score in scores.items())
+        if allowed is not None:
+            candidates = ((job_id, score) for job_id, score in candidates if allowed(job_id))
+        return heapq.nlargest(k, candidates, key=lambda item: item[1])
+
+    def _sections(self) -> Tuple[Dict[str, object], Dict]:
+        """Builds the section arrays and the footer (without section offsets) for save()."""
+        base = self._base
+        sections: Dict[str, object] = {}
+        doc_ids = array('q')
+        doc_ids.frombytes(_raw(base['doc_ids']))
+        doc_ids.extend(self._added_ids)
+        sections['doc_ids'] = doc_ids
+        sections['dead'] = self._dead
+        sections['by_id'] = array('I', sorted(range(len(doc_ids)), key=doc_ids.__getitem__))
+        for field_number, name in enumerate(_FIELD_NAMES):
+            lengths = array('I')
+            lengths.frombytes(_raw(base['lengths_' + name]))
+            lengths.extend(self._added_lengths[field_number])
+            sections['lengths_' + name] = lengths
+
+        term_offsets = array('Q')
+        term_offsets.frombytes(_raw(base['term_offsets']))
+        term_heap = bytearray(base['term_heap'])
+        encoded_terms = [term.encode('utf-8') for term in self._new_terms]
+        for encoded in encoded_terms:
+            term_heap += encoded
+            term_offsets.append(len(term_heap))
+        sections['term_offsets'] = term_offsets
+        sections['term_heap'] = term_heap
+
+        # The table stays at most half full; it is only rebuilt when it has to grow
+        term_count = self._term_count()
+        if len(base['term_table']) >= 2 * term_count:
+            term_table = array('I')
+            term_table.frombytes(_raw(base['term_table']))
+            for number, encoded in enumerate(encoded_terms, self._base_terms):
+                _insert_term(term_table, encoded, number)
+        else:
+            term_table = _term_table(term_heap, term_offsets)
+        sections['term_table'] = term_table
+
+        # Runs of terms without new postings are copied from the mapped file in one go
+        base_offsets, base_docs = base['postings_offsets'], base['postings_docs']
+        base_tfs = [base['tf_' + name] for name in _FIELD_NAMES]
+        postings_offsets = array('Q')
+        docs = array('I')
+        field_tfs = [array('H') for _ in FIELD_BOOSTS]
+
+        def copy_base(start_term: int, end_term: int) -> None:
+            start, end = base_offsets[start_term], base_offsets[end_term]
+            docs.frombytes(_raw(base_docs[start:end]))
+            for tfs, base_field_tfs in zip(field_tfs, base_tfs):
+                tfs.frombytes(_raw(base_field_tfs[start:end]))
+
+        copied = 0 # base terms before this one have been written
+        for number, added_docs, added_tfs in sorted(self._added_postings.values()) + [(term_count, None, None)]:
+            run_end = min(number, self._base_terms)
+            if copied < run_end:
+                shift = len(docs) - base_offsets[copied]
+                postings_offsets.extend(offset + shift for offset in base_offsets[copied:run_end])
+                copy_base(copied, run_end)
+                copied = run_end
+            if number == term_count:
+                break
+            postings_offsets.append(len(docs))
+            if number < self._base_terms:
+                copy_base(number, number + 1)
+                copied = number + 1
+            docs.extend(added_docs)
+            for field_number, tfs in enumerate(field_tfs):
+                tfs.extend(added_tfs[field_number::len(FIELD_BOOSTS)])
+        postings_offsets.append(len(docs))
+        sections['postings_offsets'] = postings_offsets
+        sections['postings_docs'] = docs
+        for name, tfs in zip(_FIELD_NAMES, field_tfs):
+            sections['tf_' + name] = tfs
+
+        # Only the new terms' deletes are generated; they are merged into the saved ones
+        new_deletes = sorted(zlib.crc32(delete.encode('utf-8')) << 32 | number
+                             for number, term in enumerate(self._new_terms, self._base_terms)
+                             for delete in generate_deletes(term, self.max_edit_distance))
+        base_deletes = base['deletes']
+        if not len(base_deletes):
+            deletes = array('Q', new_deletes)
+        else:
+            deletes = array('Q')
+            copied = 0
+            for entry in new_deletes:
+                position = bisect_left(base_deletes, entry, copied)
+                deletes.frombytes(_raw(base_deletes[copied:position]))
+                deletes.append(entry)
+                copied = position
+            deletes.frombytes(_raw(base_deletes[copied:]))
+        sections['deletes'] = deletes
+
+        footer = {"version": _FORMAT_VERSION, "byteorder": sys.byteorder, "fields": list(_FIELD_NAMES),
+                  "documents": len(doc_ids), "live": self._live, "terms": term_count,
+                  "total_field_lengths": self._total_field_lengths,
+                  "max_edit_distance": self.max_edit_distance, "prefix_length": PREFIX_LENGTH}
+        return sections, footer
+
+    def save(self, filepath: str = SEARCH_INDEX_FILEPATH) -> bool:
+        """
+        Writes the index via a temporary file and os.replace, so readers that
+        mapped the previous file keep using it. Dead documents are dropped
+        once they make up more than COMPACT_RATIO of them.
+
+        Returns:
+            True if saving was successful, False otherwise.
+        """
+        try:
+            sections, footer = self._sections()
+            if footer['documents'] - footer['live'] > COMPACT_RATIO * footer['documents']:
+                _compact(sections, footer)
+        except (TypeError, ValueError, OverflowError) as e: # e.g. non-integer job ids
+            logging.error(f"Could not build search index {filepath}: {e}")
+            return False
+
+        tmp_filepath = filepath + ".tmp"
+        try:
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            layout = {}
+            with open(tmp_filepath, 'wb') as f:
+                offset = 0
+                for name, data in sections.items():
+                    padding = -offset % 8
+                    f.write(b"\0" * padding)
+                    offset += padding
+                    raw = memoryview(data)
+                    f.write(raw)
+                    layout[name] = [offset, raw.nbytes]
+                    offset += raw.nbytes
+                footer["sections"] = layout
+                f.write(json.dumps(footer, separators=(',', ':')).encode('utf-8'))
+                f.write(_INDEX_TRAILER.pack(offset, _INDEX_MAGIC))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_filepath, filepath)
+        except OSError as e:
+            logging.error(f"Could not save search index to {filepath}: {e}")
+            return False
+        logging.info(f"Saved search index with {footer['live']} jobs and {footer['terms']} terms to {filepath}")
+        return True
+
+    def _open(self, filepath: str) -> None:
+        with open(filepath, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_offset, magic = _INDEX_TRAILER.unpack(mm[-_INDEX_TRAILER.size:])
+        if magic != _INDEX_MAGIC:
+            mm.close()
+            raise ValueError("not in the expected format")
+        footer = json.loads(mm[footer_offset:-_INDEX_TRAILER.size].decode('utf-8'))
+        if footer['version'] != _FORMAT_VERSION or footer['byteorder'] != sys.byteorder:
+            mm.close()
+            raise ValueError("unsupported version or byte order")
+        if footer['fields'] != list(_FIELD_NAMES) or footer['prefix_length'] != PREFIX_LENGTH:
+            mm.close()
+            raise ValueError("built with a different field layout or fuzzy prefix length")
+
+        buffer = memoryview(mm)
+        self._base = {name: buffer[offset:offset + length].cast(_SECTION_FORMATS[name])
+                      for name, (offset, length) in footer['sections'].items()}
+        self._mm = mm
+        self._base_docs = footer['documents']
+        self._base_terms = footer['terms']
+        self._dead = bytearray(self._base['dead'])
+        self._live = footer['live']
+        self._total_field_lengths = footer['total_field_lengths']
+        self.max_edit_distance = footer['max_edit_distance']
+
+    @classmethod
+    def load(cls, filepath: str = SEARCH_INDEX_FILEPATH) -> Optional["SearchIndex"]:
+        """
+        Maps an index saved with save(). Returns None if it is missing or unreadable.
+        """
+        index = cls()
+        try:
+            index._open(filepath)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logging.error(f"Could not load search index from {filepath}: {e}")
+            return None
+        logging.info(f"Loaded search index with {len(index)} jobs from {filepath}")
+        return index
+
+    @classmethod
+    def build(cls, jobs, get_description: Optional[Callable] = None) -> "SearchIndex":
+        """
+        Builds an index from scratch.
+
+        Args:
+            jobs: The Job objects to index.
+            get_description: Optional. Called with a job to obtain its description
+                when descriptions were loaded lazily.
+        """
+        index = cls()
+        for job in jobs:
+            index.add(job, get_description(job) if get_description else None)
+        return index
+
+
+def update_search_index(added_jobs, removed_ids: Iterable[int], all_jobs=None,
+                        filepath: str = SEARCH_INDEX_FILEPATH) -> bool:
+    """
+    Applies an ingest delta to the persisted search index.
+
+    Args:
+        added_jobs: New or changed jobs to (re-)index.
+        removed_ids: Ids of jobs that disappeared.
+        all_jobs: Optional. The complete job list, used to build the index from
+            scratch if none has been persisted yet.
+        filepath: Optional. Where the index is stored.
+
+    Returns:
+        True if the index was saved, False otherwise.
+    """
+    index = SearchIndex.load(filepath)
+    if index is None:
+        index = SearchIndex.build(all_jobs if all_jobs is not None else added_jobs)
+    else:
+        for job_id in removed_ids:
+            index.remove(job_id)
+        for job in added_jobs:
+            index.add(job)
+    return index.save(filepath)
+
+
+class SearchIndexCache:
+    """
+    Process-wide holder for the persisted search index that reloads it when the
+    file is replaced (by update_jobs.py), mirroring job_store.JobStore.
+
+    With background_reload=True, get() keeps returning the loaded index after
+    the file changed until reload() is called (e.g. by a background thread),
+    so no request waits for a reload; only the very first load happens on demand.
+    """
+
+    def __init__(self, filepath: str = SEARCH_INDEX_FILEPATH, background_reload: bool = False):
+        self.filepath = filepath
+        self.background_reload = background_reload
+        self._lock = threading.Lock()
+        self._snapshot: Tuple[Optional[Tuple[int, int, int]], Optional[SearchIndex]] = (None, None)
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _load(self, signature: Tuple[int, int, int]) -> Optional[SearchIndex]:
+        with self._lock:
+            cached_signature, index = self._snapshot
+            if cached_signature != signature:
+                index = SearchIndex.load(self.filepath)
+                self._snapshot = (signature, index)
+        return index
+
+    def get(self) -> Optional[SearchIndex]:
+        """Returns the current index, or None if none has been persisted."""
+        signature = self._signature()
+        if signature is None:
+            return None
+        cached_signature, index = self._snapshot
+        if cached_signature == signature:
+            return index
+        if self.background_reload and cached_signature is not None:
+            return index
+        return self._load(signature)
+
+    def reload(self) -> bool:
+        """
+        Loads the index file now if it changed since the last load.
+
+        Returns:
+            True if a new index was swapped in, False if nothing changed or the file does not exist.
+        """
+        signature = self._signature()
+        if signature is None or signature == self._snapshot[0]:
+            return False
+        self._load(signature)
+        return True
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    from job_processor import Job
+
+    test_jobs = [
+        Job(id=1, title="Senior Python Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="Software Development",
+            publication_date=datetime(2023, 1, 15), description_html="<p>Build <b>Django</b> APIs in Python.</p>", candidate_required_location="USA"),
+        Job(id=2, title="Product Designer", company_name="Design Inc", remotive_url="http://example.com/2", category="Design",
+            publication_date=datetime(2023, 1, 16), description_html="<p>Figma and user research. Some Python scripting is a plus.</p>"),
+        Job(id=3, title="Marketing Manager", company_name="Biz Inc", remotive_url="http://example.com/3", category="Marketing",
+            publication_date=datetime(2023, 1, 17), description_html="<p>Own our B2B campaigns.</p>", candidate_required_location="Europe"),
+    ]
+    index = SearchIndex.build(test_jobs)
+    logging.info(f"'python' -> {index.search('python')} (expected job 1 ranked above job 2)")
+    logging.info(f"'design figma' -> {index.search('design figma')}")
+    logging.info(f"'pyhton enginer' expands to {index.expand_query('pyhton enginer')} -> {index.search('pyhton enginer')}")
+
+    index.remove(2)
+    logging.info(f"'python' after removing job 2 -> {index.search('python')}")
+
+    test_filepath = "test_search_index.bin"
+    index.save(test_filepath)
+    reloaded = SearchIndex.load(test_filepath)
+    logging.info(f"Reloaded index returns the same results: {reloaded.search('python europe') == index.search('python europe')}")
+    logging.info(f"'pyhton' on the reloaded index (deletes read from the file) expands to {reloaded.expand_query('pyhton')}")
+
+    reloaded.add(Job(id=4, title="Python Developer", company_name="Snake Co", remotive_url="http://example.com/4", category="Software Development",
+                     publication_date=datetime(2023, 1, 18), description_html="<p>Python and Flask.</p>"))
+    reloaded.remove(1)
+    reloaded.save(test_filepath)
+    logging.info(f"'python' after adding job 4 and removing job 1 -> {SearchIndex.load(test_filepath).search('python')} (expected job 4)")
+    os.remove(test_filepath)
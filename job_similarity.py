@@ -0,0 +1,383 @@
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # Similar jobs are then unavailable; everything else works without NumPy
+
+try:
+    from job_processor import Job
+    from job_storage import DATA_DIR
+    from text_utils import strip_html, tokenize
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_storage.py and text_utils.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# "More like this job": TF-IDF vectors of title, category and description (L2-normalized,
+# so a dot product is the cosine similarity) kept as a sparse matrix in .npy files that
+# every process memory-maps. The manifest names the current generation of array files;
+# update_jobs.py writes a new generation and then swaps the manifest with os.replace.
+SIMILARITY_MANIFEST_FILEPATH = os.path.join(DATA_DIR, "similar_jobs.json")
+SIMILARITY_DIR = os.path.join(DATA_DIR, "similar_jobs")
+# Term counts are multiplied by these before TF weighting
+FIELD_WEIGHTS = (
+    ("title", 3.0),
+    ("category", 2.0),
+    ("description", 1.0),
+)
+# Default max_terms of TfidfSimilarityIndex.similar: a query job is compared on its
+# highest-weighted terms only (of those shared with at least one other job); the rest
+# barely move the ranking but cost the most. None compares on all terms (exact cosine).
+QUERY_MAX_TERMS = 64
+DEFAULT_SIMILAR_K = 10
+MAX_SIMILAR_K = 50
+# Array files of this many generations (the current one included) are kept, so
+# processes still mapping the previous generation keep working until they reload
+KEEP_GENERATIONS = 2
+
+JobId = int
+
+# False without NumPy: update_jobs.py then skips the index and /jobs/<id>/similar answers 503
+SIMILARITY_AVAILABLE = np is not None
+
+
+def job_term_weights(job: Job, description_html: Optional[str] = None) -> Counter:
+    """The weighted term counts of a job's title, category and (stripped) description."""
+    description = description_html if description_html is not None else job.description_html
+    texts = {"title": job.title, "category": job.category, "description": strip_html(description or "")}
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(texts[field] or ""):
+            counts[token] += weight
+    return counts
+
+
+class SimilarityIndexBuilder:
+    """
+    Collects the term counts of jobs one at a time (add), so the jobs
+    themselves need not be kept, and turns them into a SimilarityIndex (build).
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.ids = array('q')
+        self.indptr = array('q', [0])
+        self.terms = array('i')
+        self.counts = array('f')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, job: Job, description_html: Optional[str] = None) -> None:
+        """Adds a job (jobs without an integer id are skipped, like in the snapshot)."""
+        try:
+            job_id = int(job.id)
+        except (TypeError, ValueError):
+            return
+        vocabulary = self.vocabulary
+        for term, count in job_term_weights(job, description_html).items():
+            self.terms.append(vocabulary.setdefault(term, len(vocabulary)))
+            self.counts.append(count)
+        self.ids.append(job_id)
+        self.indptr.append(len(self.terms))
+
+    def build(self) -> "SimilarityIndex":
+        if np is None:
+            raise RuntimeError("NumPy is required to build the similarity index.")
+        count = len(self.ids)
+        indptr = np.array(self.indptr, dtype=np.int64)
+        terms = np.array(self.terms, dtype=np.int32)
+        counts = np.array(self.counts, dtype=np.float32)
+        rows = np.repeat(np.arange(count, dtype=np.int32), np.diff(indptr))
+
+        # Row-normalized TF-IDF: (1 + log tf) * smoothed idf, scaled to unit length
+        document_frequency = np.bincount(terms, minlength=len(self.vocabulary))
+        idf = (np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts)) * idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=count)).astype(np.float32)
+        weights /= np.where(norms > 0, norms, 1)[rows]
+
+        # The same matrix by term (CSC), for the product with a query vector
+        order = np.argsort(terms, kind='stable')
+        postings_indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=postings_indptr[1:])
+        ids = np.array(self.ids, dtype=np.int64)
+        return SimilarityIndex({
+            "ids": ids, "id_order": np.argsort(ids, kind='stable'),
+            "indptr": indptr, "terms": terms, "weights": weights.astype(np.float32),
+            "postings_indptr": postings_indptr, "postings_rows": rows[order], "postings_weights": weights[order].astype(np.float32),
+        })
+
+
+class SimilarityIndex:
+    """
+    Sparse L2-normalized TF-IDF matrix with one row per job, stored twice: by
+    row (indptr/terms/weights) to read a job's vector, and by term
+    (postings_*) to multiply the matrix with it.
+    """
+
+    ARRAYS = ("ids", "id_order", "indptr", "terms", "weights", "postings_indptr", "postings_rows", "postings_weights")
+
+    def __init__(self, arrays: Dict[str, "np.ndarray"]):
+        self.arrays = arrays
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, jobs: Iterable[Job], get_description: Optional[Callable] = None) -> "SimilarityIndex":
+        """
+        Builds an index from scratch.
+
+        Args:
+            jobs: The Job objects to index.
+            get_description: Optional. Called with a job to obtain its description
+                when descriptions were loaded lazily.
+        """
+        builder = SimilarityIndexBuilder()
+        for job in jobs:
+            builder.add(job, get_description(job) if get_description else None)
+        return builder.build()
+
+    def row(self, job_id: JobId) -> Optional[int]:
+        """The matrix row of a job, or None if it is not indexed."""
+        try:
+            job_id = int(job_id)
+        except (TypeError, ValueError):
+            return None
+        position = int(np.searchsorted(self.ids, job_id, sorter=self.id_order))
+        if position < len(self.ids) and self.ids[self.id_order[position]] == job_id:
+            return int(self.id_order[position])
+        return None
+
+    def similar(self, job_id: JobId, k: int = DEFAULT_SIMILAR_K,
+                allowed: Optional[Callable[[JobId], bool]] = None,
+                max_terms: Optional[int] = QUERY_MAX_TERMS) -> Optional[List[Tuple[JobId, float]]]:
+        """
+        The k jobs most similar to a job (cosine of their TF-IDF vectors).
+
+        The scores of all jobs come from one sparse matrix-vector product: the
+        postings of the query's terms are gathered and summed per row with
+        np.bincount, and the top k are picked with np.argpartition.
+
+        Args:
+            job_id: The job to find similar jobs for.
+            k: Optional. Number of results.
+            allowed: Optional. Predicate on job ids; other jobs are left out.
+            max_terms: Optional. Only the job's max_terms highest-weighted terms
+                are compared (default QUERY_MAX_TERMS), so scores are a lower
+                bound of the cosine for jobs with more terms. None gives the
+                exact cosine, at a cost that grows with the job's term count.
+
+        Returns:
+            (job id, score) pairs, best first, or None if the job is not indexed.
+        """
+        row = self.row(job_id)
+        if row is None:
+            return None
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        terms, weights = self.terms[start:end], self.weights[start:end]
+        # Terms no other job has cannot contribute; keep the heaviest max_terms of the rest
+        shared = np.diff(self.postings_indptr)[terms] > 1
+        terms, weights = terms[shared], weights[shared]
+        if max_terms is not None and len(terms) > max_terms:
+            top = np.argpartition(weights, -max_terms)[-max_terms:]
+            terms, weights = terms[top], weights[top]
+        if not len(terms):
+            return []
+
+        starts, ends = self.postings_indptr[terms], self.postings_indptr[terms + 1]
+        lengths = ends - starts
+        # Positions of all gathered postings: each term's range, laid end to end
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        positions = np.arange(int(lengths.sum()), dtype=np.int64) + offsets
+        scores = np.bincount(self.postings_rows[positions], minlength=len(self.ids),
+                             weights=self.postings_weights[positions] * np.repeat(weights, lengths))
+        scores[row] = -1.0
+
+        k = max(1, k)
+        # Extra candidates for the ones allowed() may drop
+        candidates = min(len(scores), (2 * k if allowed is not None else k) + 1)
+        top = np.argpartition(scores, -candidates)[-candidates:]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        results = []
+        for candidate in top:
+            score = float(scores[candidate])
+            if score <= 0:
+                break
+            candidate_id = int(self.ids[candidate])
+            if allowed is not None and not allowed(candidate_id):
+                continue
+            results.append((candidate_id, score))
+            if len(results) == k:
+                break
+        return results
+
+    def save(self, manifest_filepath: str = SIMILARITY_MANIFEST_FILEPATH, directory: str = SIMILARITY_DIR) -> bool:
+        """
+        Writes the arrays as a new generation of .npy files, then points the
+        manifest at them (via a temporary file and os.replace). Generations
+        beyond KEEP_GENERATIONS are removed.
+
+        Returns:
+            True if saving was successful, False otherwise.
+        """
+        generation = f"{time.time_ns():x}"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            files = {}
+            for name in self.ARRAYS:
+                files[name] = f"{generation}.{name}.npy"
+                with open(os.path.join(directory, files[name]), 'wb') as f:
+                    np.save(f, np.ascontiguousarray(self.arrays[name]))
+                    f.flush()
+                    os.fsync(f.fileno())
+            manifest = {"generation": generation, "directory": os.path.relpath(directory, os.path.dirname(manifest_filepath) or "."),
+                        "count": len(self), "files": files}
+            tmp_filepath = manifest_filepath + ".tmp"
+            with open(tmp_filepath, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_filepath, manifest_filepath)
+        except OSError as e:
+            logging.error(f"Could not save similarity index to {directory}: {e}")
+            return False
+        logging.info(f"Saved similarity index with {len(self)} jobs and {len(self.postings_indptr) - 1} terms to {manifest_filepath}")
+
+        generations = sorted({filename.split('.', 1)[0] for filename in os.listdir(directory) if filename.endswith(".npy")})
+        for old in generations[:-KEEP_GENERATIONS]:
+            for name in self.ARRAYS:
+                try:
+                    os.remove(os.path.join(directory, f"{old}.{name}.npy"))
+                except OSError:
+                    pass
+        return True
+
+    @classmethod
+    def load(cls, manifest_filepath: str = SIMILARITY_MANIFEST_FILEPATH) -> Optional["SimilarityIndex"]:
+        """
+        Memory-maps the arrays of the generation the manifest names. Returns
+        None if there is no index, it is unreadable or NumPy is missing.
+        """
+        if np is None:
+            return None
+        try:
+            with open(manifest_filepath, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            directory = os.path.join(os.path.dirname(manifest_filepath), manifest["directory"])
+            arrays = {name: np.load(os.path.join(directory, manifest["files"][name]), mmap_mode='r') for name in cls.ARRAYS}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Could not load similarity index from {manifest_filepath}: {e}")
+            return None
+        return cls(arrays)
+
+
+def write_similarity_index(jobs: Iterable[Job], get_description: Optional[Callable] = None,
+                           manifest_filepath: str = SIMILARITY_MANIFEST_FILEPATH, directory: str = SIMILARITY_DIR) -> bool:
+    """
+    Builds the similarity index of jobs and saves it (see SimilarityIndex.save).
+
+    Returns:
+        True if it was saved, False otherwise (including when NumPy is not installed).
+    """
+    if np is None:
+        logging.info("NumPy is not installed; skipping the similar-jobs index.")
+        return False
+    return SimilarityIndex.build(jobs, get_description).save(manifest_filepath, directory)
+
+
+class SimilarityIndexCache:
+    """
+    Process-wide holder for the persisted similarity index that re-maps it when
+    the manifest is replaced (by update_jobs.py), mirroring job_search.SearchIndexCache.
+    """
+
+    def __init__(self, manifest_filepath: str = SIMILARITY_MANIFEST_FILEPATH):
+        self.manifest_filepath = manifest_filepath
+        self._lock = threading.Lock()
+        self._snapshot: Tuple[Optional[Tuple[int, int, int]], Optional[SimilarityIndex]] = (None, None)
+
+    def get(self) -> Optional[SimilarityIndex]:
+        """Returns the current index, or None if none has been persisted (or NumPy is missing)."""
+        if np is None:
+            return None
+        try:
+            st = os.stat(self.manifest_filepath)
+        except OSError:
+            return None
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached_signature, index = self._snapshot
+        if cached_signature == signature:
+            return index
+        with self._lock:
+            cached_signature, index = self._snapshot
+            if cached_signature != signature:
+                index = SimilarityIndex.load(self.manifest_filepath)
+                self._snapshot = (signature, index)
+        return index
+
+
+if __name__ == '__main__':
+    import random
+    import tempfile
+    from datetime import datetime, timedelta
+
+    if np is None:
+        raise SystemExit("NumPy is required for this demo.")
+
+    rng = random.Random(3)
+    # Jobs drawn from a few topics, so similar jobs share a topic's vocabulary
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "qu", "br", "ex", "ion", "ar"]
+    vocabulary = sorted({"".join(rng.sample(syllables, 3)) for _ in range(5000)})
+    topics = [rng.sample(vocabulary, 150) for _ in range(40)]
+    categories = ["Software Development", "Design", "Marketing", "Data", "DevOps / Sysadmin"]
+    job_count = 100_000
+    jobs = []
+    for i in range(job_count):
+        topic = i % len(topics)
+        words = rng.sample(topics[topic], 40) + rng.sample(vocabulary, 40)
+        jobs.append(Job(id=i + 1, title=f"{words[0].title()} {words[1].title()} Engineer", company_name=f"Company {i % 97}",
+                        remotive_url=f"https://remotive.com/remote-jobs/{i + 1}", category=categories[topic % len(categories)],
+                        publication_date=datetime(2025, 1, 1) + timedelta(minutes=i), description_html=f"<p>{' '.join(words)}</p>"))
+
+    workdir = tempfile.mkdtemp(prefix="atlas-similar-")
+    manifest_filepath = os.path.join(workdir, "similar_jobs.json")
+    start = time.perf_counter()
+    write_similarity_index(jobs, manifest_filepath=manifest_filepath, directory=os.path.join(workdir, "similar_jobs"))
+    logging.info(f"Built and saved the index of {job_count:,} jobs in {time.perf_counter() - start:.1f}s")
+
+    index = SimilarityIndexCache(manifest_filepath).get()
+    queries = rng.sample(range(1, job_count + 1), 200)
+    start = time.perf_counter()
+    results = [index.similar(job_id, k=10) for job_id in queries]
+    per_query = (time.perf_counter() - start) / len(queries)
+    same_topic = sum((job_id - 1) % len(topics) == (query - 1) % len(topics)
+                     for query, hits in zip(queries, results) for job_id, _ in hits) / sum(map(len, results))
+    logging.info(f"similar(): {per_query * 1000:.2f} ms per query at {job_count:,} jobs; {same_topic:.0%} of results share the query's topic")
+
+    # Cross-check one query against a dense cosine over the same vectors
+    query = queries[0]
+    dense = np.zeros((len(index), len(index.postings_indptr) - 1), dtype=np.float32)
+    for row in range(len(index)):
+        start, end = index.indptr[row], index.indptr[row + 1]
+        dense[row, index.terms[start:end]] = index.weights[start:end]
+    scores = dense @ dense[index.row(query)]
+    scores[index.row(query)] = -1
+    best = int(index.ids[int(np.argmax(scores))])
+    top_id, top_score = results[0][0]
+    exact_id, exact_score = index.similar(query, k=1, max_terms=None)[0]
+    logging.info(f"Top match for job {query}: {top_id}, score {top_score:.3f} on its {QUERY_MAX_TERMS} heaviest terms; "
+                 f"on all terms: {exact_id}, score {exact_score:.3f} (full dense product: {best}, score {scores.max():.3f})")
@@ -0,0 +1,439 @@
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from job_processor import Job, pack_datetime, unpack_datetime
+    from job_storage import DATA_DIR
+    from job_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_processor.py, job_storage.py and job_listing.py are accessible.")
+    raise
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SNAPSHOT_FILEPATH = os.path.join(DATA_DIR, "remotive_jobs.snapshot")
+
+# Snapshot layout (all columns in machine byte order, each section 8-byte aligned):
+#   [sections][json footer][trailer]
+# Rows are sorted newest first (publication date, then id, descending) - the
+# order of the job list page - so a page is a contiguous run of rows.
+# Sections:
+#   id, published, first_seen, last_seen, last_changed
+#                                         int64 per row (datetimes packed as in job_processor.pack_datetime)
+#   <categorical>                         uint32 code per row into the footer's code table (NO_VALUE for None)
+#   <string>_offsets, heap                uint64 offsets (rows + 1) into a shared utf-8 string heap
+#                                         (sources is stored as JSON, empty for None)
+#   by_id                                 uint32 row numbers ordered by job id, for lookups
+#   <filter>_postings                     uint32 ascending row numbers per code, back to back
+# The trailer is the byte offset of the footer followed by a magic marker, like
+# the description side file in job_storage, so the snapshot is one file that
+# update_jobs.py swaps in with a single os.replace.
+_SNAPSHOT_MAGIC = b"ATLSNAP1"
+_SNAPSHOT_TRAILER = struct.Struct(">Q8s")
+_FORMAT_VERSION = 4
+
+NO_VALUE = 0xFFFFFFFF # Categorical code for None
+_NO_DATETIME = -2 ** 63 # Packed datetime for None
+
+_DATETIME_COLUMNS = ('published', 'first_seen', 'last_seen', 'last_changed')
+_CATEGORICAL_COLUMNS = ('company_name', 'category', 'candidate_required_location', 'salary', 'job_type', 'source')
+_STRING_COLUMNS = ('title', 'remotive_url', 'sources')
+# Filter name (as in JobListingIndex.page) -> categorical column
+_FILTER_COLUMNS = {'category': 'category', 'job_type': 'job_type', 'location': 'candidate_required_location'}
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+def _string_value(job: Job, column: str) -> str:
+    if column == 'sources':
+        return json.dumps(job.sources, ensure_ascii=False, separators=(',', ':')) if job.sources else ""
+    return getattr(job, column) or ""
+
+def _sort_key(job: Job) -> Tuple[int, int]:
+    return pack_datetime(job.publication_date) >> 1, job.id
+
+def write_snapshot(jobs: List[Job], filepath: str = SNAPSHOT_FILEPATH) -> bool:
+    """
+    Writes jobs (without descriptions) as a columnar snapshot, using a
+    temporary file and os.replace so readers never see a partial file.
+
+    Returns:
+        True if the snapshot was written, False otherwise.
+    """
+    try:
+        sections, footer = _build_sections(jobs)
+    except (TypeError, ValueError, OverflowError) as e: # e.g. non-integer job ids
+        logging.error(f"Could not build job snapshot {filepath}: {e}")
+        return False
+
+    tmp_filepath = filepath + ".tmp"
+    try:
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        layout = {}
+        with open(tmp_filepath, 'wb') as f:
+            offset = 0
+            for name, data in sections.items():
+                padding = -offset % 8
+                f.write(b"\0" * padding)
+                offset += padding
+                raw = data.tobytes() if isinstance(data, array) else bytes(data)
+                f.write(raw)
+                layout[name] = [offset, len(raw)]
+                offset += len(raw)
+            footer["sections"] = layout
+            f.write(json.dumps(footer, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            f.write(_SNAPSHOT_TRAILER.pack(offset, _SNAPSHOT_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filepath, filepath)
+    except OSError as e:
+        logging.error(f"Could not write job snapshot {filepath}: {e}")
+        return False
+    logging.info(f"Wrote job snapshot with {footer['count']} jobs to {filepath}.")
+    return True
+
+def _build_sections(jobs: List[Job]) -> Tuple[Dict[str, object], Dict]:
+    """Builds the section arrays and the footer (without section offsets) for write_snapshot."""
+    unique = {job.id: job for job in jobs} # Later duplicates win, as in JobJournal.merge
+    rows = sorted(unique.values(), key=_sort_key, reverse=True)
+    sections: Dict[str, object] = {}
+
+    sections['id'] = array('q', (job.id for job in rows))
+    for column in _DATETIME_COLUMNS:
+        attribute = 'publication_date' if column == 'published' else column
+        values = (pack_datetime(getattr(job, attribute)) for job in rows)
+        sections[column] = array('q', (_NO_DATETIME if value is None else value for value in values))
+
+    code_tables: Dict[str, List[str]] = {}
+    for column in _CATEGORICAL_COLUMNS:
+        codes: Dict[str, int] = {}
+        column_codes = array('I')
+        for job in rows:
+            value = getattr(job, column)
+            column_codes.append(NO_VALUE if value is None else codes.setdefault(value, len(codes)))
+        sections[column] = column_codes
+        code_tables[column] = list(codes)
+
+    heap = bytearray()
+    for column in _STRING_COLUMNS:
+        offsets = array('Q', [0] * (len(rows) + 1))
+        for i, job in enumerate(rows):
+            offsets[i] = len(heap)
+            heap += _string_value(job, column).encode('utf-8')
+        offsets[len(rows)] = len(heap)
+        sections[column + '_offsets'] = offsets
+    sections['heap'] = heap
+
+    sections['by_id'] = array('I', sorted(range(len(rows)), key=lambda row: rows[row].id))
+
+    posting_offsets: Dict[str, List[int]] = {}
+    for column in _FILTER_COLUMNS.values():
+        postings: List[array] = [array('I') for _ in code_tables[column]]
+        for row, code in enumerate(sections[column]):
+            if code != NO_VALUE:
+                postings[code].append(row)
+        concatenated = array('I')
+        offsets = [0]
+        for positions in postings:
+            concatenated.extend(positions)
+            offsets.append(len(concatenated))
+        sections[column + '_postings'] = concatenated
+        posting_offsets[column] = offsets
+
+    footer = {"version": _FORMAT_VERSION, "byteorder": sys.byteorder, "count": len(rows),
+              "codes": code_tables, "postings": posting_offsets}
+    return sections, footer
+
+def _iter_from(items, start: int) -> Iterator[int]:
+    for i in range(start, len(items)):
+        yield items[i]
+
+
+class SnapshotVersion:
+    """
+    One opened, immutable version of a snapshot file.
+
+    Columns are memoryviews cast straight onto the read-only mapping, so every
+    process that opens the same file shares its pages through the OS page
+    cache, and only the rows that are actually read are turned into objects.
+
+    version identifies the mapped file (inode, size and mtime of the opened
+    file itself), e.g. for ETags and per-version page caches.
+    """
+
+    def __init__(self, filepath: str):
+        with open(filepath, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.version = f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_offset, magic = _SNAPSHOT_TRAILER.unpack(self._mm[-_SNAPSHOT_TRAILER.size:])
+        if magic != _SNAPSHOT_MAGIC:
+            self._mm.close()
+            raise ValueError(f"Snapshot {filepath} is not in the expected format.")
+        footer = json.loads(self._mm[footer_offset:-_SNAPSHOT_TRAILER.size].decode('utf-8'))
+        if footer['version'] != _FORMAT_VERSION or footer['byteorder'] != sys.byteorder:
+            self._mm.close()
+            raise ValueError(f"Snapshot {filepath} has an unsupported version or byte order.")
+
+        self.count: int = footer['count']
+        buffer = memoryview(self._mm)
+        formats = {'heap': 'B', 'by_id': 'I'}
+        formats.update({column: 'q' for column in ('id',) + _DATETIME_COLUMNS})
+        formats.update({column: 'I' for column in _CATEGORICAL_COLUMNS})
+        formats.update({column + '_offsets': 'Q' for column in _STRING_COLUMNS})
+        formats.update({column + '_postings': 'I' for column in _FILTER_COLUMNS.values()})
+        self.columns: Dict[str, memoryview] = {}
+        for name, (offset, length) in footer['sections'].items():
+            self.columns[name] = buffer[offset:offset + length].cast(formats[name])
+        self.codes: Dict[str, List[str]] = {column: [sys.intern(value) for value in values]
+                                            for column, values in footer['codes'].items()}
+        self._posting_offsets: Dict[str, List[int]] = footer['postings']
+        # Normalized value -> codes, for case-insensitive filtering
+        self._codes_by_value: Dict[str, Dict[str, List[int]]] = {}
+        for column in _FILTER_COLUMNS.values():
+            by_value: Dict[str, List[int]] = {}
+            for code, value in enumerate(self.codes[column]):
+                by_value.setdefault(_normalize(value), []).append(code)
+            self._codes_by_value[column] = by_value
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, column: str, row: int) -> str:
+        offsets = self.columns[column + '_offsets']
+        return str(self.columns['heap'][offsets[row]:offsets[row + 1]], 'utf-8')
+
+    def _code_value(self, column: str, row: int) -> Optional[str]:
+        code = self.columns[column][row]
+        return None if code == NO_VALUE else self.codes[column][code]
+
+    def job(self, row: int) -> Job:
+        """Builds the Job stored at a row (description_html is None; descriptions are not part of the snapshot)."""
+        columns = self.columns
+        datetimes = [columns[column][row] for column in _DATETIME_COLUMNS]
+        published, first_seen, last_seen, last_changed = (None if value == _NO_DATETIME else unpack_datetime(value) for value in datetimes)
+        sources = self._string('sources', row)
+        return Job(
+            id=columns['id'][row],
+            title=self._string('title', row),
+            company_name=self._code_value('company_name', row),
+            remotive_url=self._string('remotive_url', row),
+            category=self._code_value('category', row),
+            publication_date=published,
+            description_html=None,
+            candidate_required_location=self._code_value('candidate_required_location', row),
+            salary=self._code_value('salary', row),
+            job_type=self._code_value('job_type', row),
+            first_seen=first_seen,
+            last_seen=last_seen,
+            sources=json.loads(sources) if sources else None,
+            source=self._code_value('source', row),
+            last_changed=last_changed
+        )
+
+    def _first_row(self, predicate: Callable[[int], bool]) -> int:
+        """Binary search for the first row for which predicate (false, then true in row order) holds."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def start_row(self, cursor: Optional[str]) -> int:
+        """
+        Returns the first row after a cursor (0 without one).
+
+        Raises:
+            InvalidCursorError: If cursor is malformed.
+        """
+        if not cursor:
+            return 0
+        timestamp, job_id = decode_cursor(cursor)
+        cursor_key = (round(timestamp * 1_000_000), job_id)
+        ids, published = self.columns['id'], self.columns['published']
+        return self._first_row(lambda row: (published[row] >> 1, ids[row]) < cursor_key)
+
+    def facet_rows(self) -> Iterator[Tuple]:
+        """Yields (id, category, job_type, candidate_required_location, salary) for every row, in order."""
+        ids = self.columns['id']
+        columns = [(self.columns[column], self.codes[column]) for column in
+                   ('category', 'job_type', 'candidate_required_location', 'salary')]
+        for row in range(self.count):
+            yield (ids[row],) + tuple(None if codes[row] == NO_VALUE else table[codes[row]] for codes, table in columns)
+
+    def find_row(self, job_id: int) -> Optional[int]:
+        """Returns the row of job_id, or None if it is not in the snapshot."""
+        by_id, ids = self.columns['by_id'], self.columns['id']
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if ids[by_id[middle]] < job_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and ids[by_id[low]] == job_id:
+            return by_id[low]
+        return None
+
+    def _positions_from(self, column: str, value: str, start: int, partial: bool) -> Tuple[Iterator[int], int]:
+        key = _normalize(value)
+        by_value = self._codes_by_value[column]
+        if partial:
+            codes = [code for candidate, codes in by_value.items() if key in candidate for code in codes]
+        else:
+            codes = by_value.get(key, [])
+        postings, offsets = self.columns[column + '_postings'], self._posting_offsets[column]
+        iterators = []
+        total = 0
+        for code in codes:
+            positions = postings[offsets[code]:offsets[code + 1]]
+            iterators.append(_iter_from(positions, bisect_left(positions, start)))
+            total += len(positions)
+        return heapq.merge(*iterators), total
+
+    def page(self, category: Optional[str] = None, job_type: Optional[str] = None,
+             location: Optional[str] = None, published_after: Optional[datetime] = None,
+             cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Job], Optional[str]]:
+        """
+        Same contract as JobListingIndex.page (filters, keyset cursor, newest
+        first), served from the mapped columns.
+        """
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        published = self.columns['published']
+        start = self.start_row(cursor)
+        stop = self.count
+        if published_after is not None:
+            after = pack_datetime(published_after) >> 1
+            stop = self._first_row(lambda row: published[row] >> 1 < after)
+
+        filters = []
+        for name, value in (('category', category), ('job_type', job_type), ('location', location)):
+            if value:
+                filters.append((_FILTER_COLUMNS[name], value, name == 'location'))
+
+        if not filters:
+            end = min(start + page_size, stop)
+            rows = range(start, end)
+            has_more = end < stop
+        else:
+            walks = [self._positions_from(column, value, start, partial) for column, value, partial in filters]
+            driver_index = min(range(len(walks)), key=lambda i: walks[i][1])
+            driver = walks[driver_index][0]
+            checks = [(column, _normalize(value), partial) for i, (column, value, partial) in enumerate(filters) if i != driver_index]
+            rows = []
+            has_more = False
+            for row in driver:
+                if row >= stop:
+                    break
+                if all((key in _normalize(self._code_value(column, row))) if partial else
+                       (_normalize(self._code_value(column, row)) == key) for column, key, partial in checks):
+                    if len(rows) == page_size:
+                        has_more = True
+                        break
+                    rows.append(row)
+
+        page = [self.job(row) for row in rows]
+        next_cursor = encode_cursor(page[-1]) if page and has_more else None
+        return page, next_cursor
+
+    def choices(self, field: str) -> List[str]:
+        """Distinct values of a filter field ('category', 'job_type' or 'location'), sorted."""
+        return sorted(set(self.codes[_FILTER_COLUMNS[field]]))
+
+
+class JobSnapshot:
+    """
+    Process-wide handle to the snapshot file written by update_jobs.py.
+
+    Each call stats the file and maps the new version when it has been
+    replaced (inode, size or mtime changed); requests already holding the old
+    SnapshotVersion keep using it until they finish.
+    """
+
+    def __init__(self, filepath: str = SNAPSHOT_FILEPATH):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._current: Tuple[Optional[Tuple[int, int, int]], Optional[SnapshotVersion]] = (None, None)
+
+    def get(self) -> Optional[SnapshotVersion]:
+        """Returns the current version, or None if there is no (readable) snapshot."""
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            return None
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        current_signature, version = self._current
+        if current_signature == signature:
+            return version
+        with self._lock:
+            current_signature, version = self._current
+            if current_signature != signature:
+                try:
+                    version = SnapshotVersion(self.filepath)
+                    logging.info(f"Mapped job snapshot {self.filepath} ({len(version)} jobs).")
+                except (OSError, ValueError, KeyError) as e:
+                    logging.error(f"Could not open job snapshot {self.filepath}: {e}")
+                    version = None
+                self._current = (signature, version)
+        return version
+
+
+if __name__ == '__main__':
+    from datetime import timedelta, timezone
+    from job_listing import JobListingIndex
+
+    base = datetime(2024, 1, 1)
+    categories = ["Software Development", "Design", "Marketing"]
+    test_jobs = [
+        Job(id=i, title=f"Job {i} – ünïcode", company_name=f"Company {i % 7}", remotive_url=f"https://remotive.com/remote-jobs/job-{i}",
+            category=categories[i % 3], publication_date=base + timedelta(hours=i // 2), description_html=None,
+            candidate_required_location="USA Only" if i % 2 else "Worldwide", job_type="full_time" if i % 4 else None,
+            salary="$100k" if i % 5 == 0 else None, last_seen=datetime(2024, 2, 1, tzinfo=timezone.utc))
+        for i in range(1, 201)
+    ]
+    test_filepath = "test_jobs.snapshot"
+    write_snapshot(test_jobs, test_filepath)
+    snapshot = JobSnapshot(test_filepath)
+    version = snapshot.get()
+    index = JobListingIndex(test_jobs)
+
+    round_trip = [version.job(row) for row in range(len(version))]
+    logging.info(f"Round trip matches the listing order: {round_trip == index.ordered}")
+
+    for query in [{}, {'category': 'design'}, {'location': 'usa', 'job_type': 'FULL_TIME'},
+                  {'published_after': base + timedelta(hours=60), 'category': 'marketing'}]:
+        expected, got, cursor = [], [], None
+        while True:
+            page, cursor = index.page(cursor=cursor, page_size=9, **query)
+            expected.extend(page)
+            if cursor is None:
+                break
+        while True:
+            page, cursor = version.page(cursor=cursor, page_size=9, **query)
+            got.extend(page)
+            if cursor is None:
+                break
+        logging.info(f"Paging {query}: {len(got)} jobs, same as JobListingIndex: {got == expected}")
+
+    logging.info(f"Lookup of job 42 by id: {version.job(version.find_row(42)).title!r}, missing id: {version.find_row(999)}")
+
+    write_snapshot(test_jobs[:10], test_filepath)
+    logging.info(f"After replacing the file: {len(snapshot.get())} jobs (expected 10)")
+    os.remove(test_filepath)
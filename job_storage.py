@@ -1,69 +1,327 @@
 import json
 import logging
+import mmap
+import os
+import struct
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional, Union # Using List from typing for compatibility
+from typing import Iterable, Iterator, List, Dict, Optional, Union # Using List from typing for compatibility
 
-# Attempt to import Job dataclass from job_processor
-# This assumes job_processor.py is in the same directory or accessible via PYTHONPATH
+# Job lives in job_processor; there is deliberately no fallback definition here,
+# since a copy would silently drift from the real (memory-optimized) class.
 try:
     from job_processor import Job
 except ImportError:
-    logging.error("Could not import Job from job_processor.py. Ensure it's in the same directory or PYTHONPATH.")
-    # Define a placeholder if import fails, to allow script to be parsed, though it won't fully work.
-    from dataclasses import dataclass
-    @dataclass
-    class Job:
-        id: int
-        title: str
-        company_name: str
-        remotive_url: str
-        category: str
-        publication_date: datetime # This will be problematic if Job isn't the real one
-        description_html: str
-        candidate_required_location: Optional[str] = None
-        salary: Optional[str] = None
-        job_type: Optional[str] = None
+    logging.critical("Could not import Job from job_processor.py. Ensure it's in the same directory or PYTHONPATH.")
+    raise
+
+try:
+    from metrics import timed, SERIALIZE_SECONDS, JOBS_SAVED, LOAD_SECONDS, JOBS_LOADED
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure metrics.py is accessible.")
+    raise
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Define the path for the jobs data file - for compatibility with app.py
-import os
 DATA_DIR = "data"
 JOBS_JSON_FILEPATH = os.path.join(DATA_DIR, "remotive_jobs.json")
 
-def save_jobs_to_json(jobs: List[Job], filepath: str) -> bool:
+# Characters read at a time by iter_jobs_from_json
+JSON_READ_CHUNK_SIZE = 64 * 1024
+
+# Side file layout for split descriptions:
+#   [utf-8 descriptions, back to back][json index {job id: [offset, length]}][trailer]
+# The trailer is the byte offset of the json index followed by a magic marker,
+# so the whole thing is a single file that can be swapped in with one os.replace.
+DESCRIPTIONS_FILE_SUFFIX = ".desc"
+_DESCRIPTIONS_MAGIC = b"ATLDESC1"
+_DESCRIPTIONS_TRAILER = struct.Struct(">Q8s")
+
+def description_filepath(filepath: str) -> str:
+    """Returns the path of the description side file belonging to a jobs JSON file."""
+    return filepath + DESCRIPTIONS_FILE_SUFFIX
+
+class DescriptionStore:
+    """
+    On-demand access to descriptions saved with save_jobs_to_json(split_descriptions=True).
+
+    The side file is memory-mapped, so only the pages of descriptions that are
+    actually requested get read from disk. The file is re-opened automatically
+    when update_jobs.py replaces it.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = description_filepath(filepath)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._mm = None
+        self._index: Dict[str, List[int]] = {}
+
+    def _refresh(self) -> None:
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            self._signature, self._mm, self._index = None, None, {}
+            return
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            with open(self.filepath, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index_offset, magic = _DESCRIPTIONS_TRAILER.unpack(mm[-_DESCRIPTIONS_TRAILER.size:])
+            if magic != _DESCRIPTIONS_MAGIC:
+                logging.error(f"Description file {self.filepath} is not in the expected format.")
+                mm.close()
+                return
+            index = json.loads(mm[index_offset:-_DESCRIPTIONS_TRAILER.size].decode('utf-8'))
+            # The previous mapping is left to the garbage collector, as other
+            # threads may still be slicing it.
+            self._mm, self._index, self._signature = mm, index, signature
+
+    def exists(self) -> bool:
+        """True if the side file exists and could be opened."""
+        self._refresh()
+        return self._mm is not None
+
+    def get(self, job_id: Union[int, str]) -> Optional[str]:
+        """
+        Returns the description HTML for a job id, or None if it is not in the side file.
+        """
+        self._refresh()
+        mm, index = self._mm, self._index
+        entry = index.get(str(job_id))
+        if mm is None or entry is None:
+            return None
+        offset, length = entry
+        return mm[offset:offset + length].decode('utf-8')
+
+def _parse_optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parses an optional ISO 8601 string, returning None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def job_to_dict(job: Job, include_description: bool = True) -> Dict:
+    """
+    Converts a Job into the JSON-serializable dict stored on disk.
+    Datetime objects are converted to ISO 8601 strings.
+
+    Args:
+        job: The Job to convert.
+        include_description: Optional. If False, description_html is stored as null
+            (used when descriptions live in a side file).
+    """
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company_name": job.company_name,
+        "remotive_url": job.remotive_url,
+        "category": job.category,
+        "publication_date": job.publication_date.isoformat(), # Convert datetime to ISO string
+        "description_html": job.description_html if include_description else None,
+        "candidate_required_location": job.candidate_required_location,
+        "salary": job.salary,
+        "job_type": job.job_type,
+        "first_seen": job.first_seen.isoformat() if job.first_seen else None,
+        "last_seen": job.last_seen.isoformat() if job.last_seen else None,
+        "sources": job.sources,
+        "source": job.source,
+        "last_changed": job.last_changed.isoformat() if job.last_changed else None
+    }
+
+def job_from_dict(job_dict: Dict, descriptions: Optional[DescriptionStore] = None) -> Optional[Job]:
+    """
+    Converts a dict stored on disk back into a Job.
+    ISO 8601 date strings are converted back to datetime objects.
+
+    Args:
+        job_dict: The stored job record.
+        descriptions: Optional. A DescriptionStore used to fill in descriptions
+            that were saved to a side file.
+
+    Returns:
+        The Job, or None if the record is missing required fields or has an
+        unparseable publication_date (a warning is logged).
+    Raises:
+        KeyError, TypeError: If the record is malformed in other ways.
+    """
+    # Convert ISO string back to datetime
+    date_str = job_dict.get('publication_date')
+    parsed_date = None
+    if date_str:
+        try:
+            # datetime.fromisoformat is quite flexible
+            parsed_date = datetime.fromisoformat(date_str)
+        except ValueError as ve_date:
+            # publication_date is NOT optional on Job, so the job is skipped below
+            logging.warning(f"Could not parse date string '{date_str}' for job ID {job_dict.get('id')}: {ve_date}. Setting date to None.")
+
+    # Ensure all required fields for Job are present
+    # This is a basic check; Pydantic would be more robust here.
+    if not all(k in job_dict for k in ['id', 'title', 'company_name', 'remotive_url', 'category', 'description_html']) or not parsed_date:
+        logging.warning(f"Skipping job from JSON due to missing required fields or unparseable date: {job_dict.get('id', 'Unknown ID')}")
+        return None
+
+    description_html = job_dict['description_html']
+    if description_html is None and descriptions is not None:
+        description_html = descriptions.get(job_dict['id'])
+
+    return Job(
+        id=job_dict['id'],
+        title=job_dict['title'],
+        company_name=job_dict['company_name'],
+        remotive_url=job_dict['remotive_url'],
+        category=job_dict['category'],
+        publication_date=parsed_date, # Use the parsed date
+        description_html=description_html,
+        candidate_required_location=job_dict.get('candidate_required_location'),
+        salary=job_dict.get('salary'),
+        job_type=job_dict.get('job_type'),
+        first_seen=_parse_optional_datetime(job_dict.get('first_seen')),
+        last_seen=_parse_optional_datetime(job_dict.get('last_seen')),
+        sources=job_dict.get('sources'),
+        source=job_dict.get('source'),
+        last_changed=_parse_optional_datetime(job_dict.get('last_changed'))
+    )
+
+def _fsync_directory(filepath: str) -> None:
+    """Makes a rename in filepath's directory durable (a no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(os.path.dirname(filepath) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class JobFileWriter:
+    """
+    Writes jobs to a JSON file (and, with split_descriptions, its description
+    side file) a chunk at a time, in the format of save_jobs_to_json, so a
+    feed can be stored without holding all of its jobs.
+
+    Everything goes to temporary files; commit() fsyncs them and moves them
+    over the real files with os.replace, side file first, so readers (and a
+    crash at any point) only ever see the previous files or the complete new
+    ones. Used as a context manager, it commits if the block succeeds and
+    removes the temporary files if it raises.
+    """
+
+    def __init__(self, filepath: str, split_descriptions: bool = False):
+        self.filepath = filepath
+        self.split_descriptions = split_descriptions
+        self.count = 0
+        self._tmp_filepath = filepath + ".tmp"
+        self._side_tmp_filepath = description_filepath(filepath) + ".tmp"
+        self._index: Dict[str, List[int]] = {}
+        self._offset = 0
+        self._side_file = None
+        self._file = open(self._tmp_filepath, 'w', encoding='utf-8')
+        if split_descriptions:
+            try:
+                self._side_file = open(self._side_tmp_filepath, 'wb')
+            except OSError:
+                self.abort()
+                raise
+
+    def write(self, jobs: Iterable[Job]) -> None:
+        for job in jobs:
+            if self._side_file is not None:
+                encoded = (job.description_html or "").encode('utf-8')
+                self._side_file.write(encoded)
+                self._index[str(job.id)] = [self._offset, len(encoded)]
+                self._offset += len(encoded)
+            # Same layout as json.dump(list, indent=4): every line of an element indented once more
+            # (JSON strings cannot contain raw newlines, so only structural lines are affected)
+            record = json.dumps(job_to_dict(job, include_description=not self.split_descriptions), indent=4, ensure_ascii=False)
+            self._file.write(("[\n    " if not self.count else ",\n    ") + record.replace("\n", "\n    "))
+            self.count += 1
+
+    def commit(self) -> None:
+        """
+        Completes, fsyncs and publishes the files.
+
+        Raises:
+            OSError: If they cannot be written; the temporary files are then
+                removed and the existing files are left as they were.
+        """
+        try:
+            self._file.write("\n]" if self.count else "[]")
+            if self._side_file is not None:
+                self._side_file.write(json.dumps(self._index, separators=(',', ':')).encode('utf-8'))
+                self._side_file.write(_DESCRIPTIONS_TRAILER.pack(self._offset, _DESCRIPTIONS_MAGIC))
+                self._side_file.flush()
+                os.fsync(self._side_file.fileno())
+                self._side_file.close()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            # The side file goes first, so a reader never sees a JSON file
+            # without the descriptions it refers to.
+            if self._side_file is not None:
+                os.replace(self._side_tmp_filepath, description_filepath(self.filepath))
+            os.replace(self._tmp_filepath, self.filepath)
+        except OSError:
+            self.abort()
+            raise
+        _fsync_directory(self.filepath)
+
+    def abort(self) -> None:
+        """Discards everything written so far."""
+        for f, path in ((self._file, self._tmp_filepath), (self._side_file, self._side_tmp_filepath)):
+            if f is None:
+                continue
+            f.close()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "JobFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+@timed(SERIALIZE_SECONDS)
+def save_jobs_to_json(jobs: List[Job], filepath: str, split_descriptions: bool = False) -> bool:
     """
     Saves a list of Job objects to a JSON file.
     Datetime objects are converted to ISO 8601 strings.
 
+    The file is written through JobFileWriter, so it is replaced atomically
+    and an existing file is never left half-written.
+
     Args:
-        jobs: A list of Job dataclass objects.
+        jobs: A list of Job objects.
         filepath: The path to the JSON file where jobs will be saved.
+        split_descriptions: Optional. If True, descriptions are written to an
+            offset-indexed side file (see DescriptionStore) and stored as null
+            in the JSON file, which keeps the JSON file small for list views.
     
     Returns:
         True if saving was successful, False otherwise.
     """
     try:
-        data_to_save = []
-        for job in jobs:
-            job_dict = {
-                "id": job.id,
-                "title": job.title,
-                "company_name": job.company_name,
-                "remotive_url": job.remotive_url,
-                "category": job.category,
-                "publication_date": job.publication_date.isoformat(), # Convert datetime to ISO string
-                "description_html": job.description_html,
-                "candidate_required_location": job.candidate_required_location,
-                "salary": job.salary,
-                "job_type": job.job_type
-            }
-            data_to_save.append(job_dict)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, indent=4, ensure_ascii=False)
+        with JobFileWriter(filepath, split_descriptions) as writer:
+            writer.write(jobs)
         logging.info(f"Successfully saved {len(jobs)} jobs to {filepath}")
+        JOBS_SAVED.inc(len(jobs))
         return True
     except IOError as e:
         logging.error(f"IOError saving jobs to {filepath}: {e}")
@@ -73,74 +331,254 @@ def save_jobs_to_json(jobs: List[Job], filepath: str) -> bool:
         logging.error(f"An unexpected error occurred while saving jobs to {filepath}: {e}")
     return False
 
-def load_jobs_from_json(filepath: str) -> List[Job]:
+def _iter_json_array(f, chunk_size: int, buffer: str) -> Iterator:
     """
-    Loads a list of Job objects from a JSON file.
+    Yields the elements of the top-level JSON array in the text file f, reading
+    it in chunks so that only the current element has to fit in memory.
+    buffer is the text already read from f, starting at the array's '['.
+
+    Raises:
+        json.JSONDecodeError: If the array is malformed or truncated (elements
+            before the error have already been yielded).
+    """
+    decoder = json.JSONDecoder()
+    eof = False
+    pos = 1
+    expect_comma = False
+    after_comma = False
+
+    while True:
+        # Skip whitespace (and the separator), refilling the buffer as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buffer):
+                if expect_comma and buffer[pos] == ',':
+                    pos += 1
+                    expect_comma = False
+                    after_comma = True
+                    continue
+                break
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+
+        if buffer[pos] == ']' and not after_comma:
+            return
+        if expect_comma:
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+
+        # Decode one element, reading more until it is complete. A value that ends
+        # exactly at the end of the buffer may be cut short (e.g. a number), so
+        # that also triggers a read. Reads grow with the buffer to stay linear.
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = f.read(max(chunk_size, len(buffer) - pos))
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        yield value
+        pos = end
+        expect_comma = True
+        after_comma = False
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+class _TextScanner:
+    """Whitespace-skipping cursor over a text file read in chunks, for iter_json_member_array."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer, self.pos, self.eof = "", 0, False
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self) -> None:
+        chunk = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        self.eof = not chunk
+        self.buffer, self.pos = self.buffer[self.pos:] + chunk, 0
+
+    def peek(self) -> str:
+        """The next non-whitespace character ('' at the end of the file), without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._read_more()
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def decode(self):
+        """Decodes the next value, reading more until it is complete (as in _iter_json_array)."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+def iter_json_member_array(f, key: str, chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator:
+    """
+    Yields the elements of the array under key in the top-level JSON object in
+    the text file f (e.g. the "jobs" of a Remotive API response), reading it in
+    chunks so that only the current element has to fit in memory. Members
+    before it are decoded and dropped; nothing after the array is read.
+
+    Raises:
+        KeyError: If the object has no member key.
+        json.JSONDecodeError: If the text is not an object, or is malformed or
+            truncated up to the end of the array (elements before the error
+            have already been yielded).
+    """
+    scanner = _TextScanner(f, chunk_size)
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        raise KeyError(key)
+    while True:
+        if scanner.peek() != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", scanner.buffer, scanner.pos)
+        name = scanner.decode()
+        scanner.expect(':')
+        if name == key:
+            if scanner.peek() != '[':
+                raise json.JSONDecodeError(f"Expecting an array for '{key}'", scanner.buffer, scanner.pos)
+            yield from _iter_json_array(f, chunk_size, scanner.buffer[scanner.pos:])
+            return
+        scanner.decode()
+        if scanner.peek() == '}':
+            raise KeyError(key)
+        scanner.expect(',')
+
+def _first_line_is_object(f) -> bool:
+    """Whether the first non-blank line of the text file f is a complete JSON object."""
+    for line in f:
+        if line.strip():
+            try:
+                return isinstance(json.loads(line), dict)
+            except json.JSONDecodeError:
+                return False
+    return False
+
+def _iter_ndjson(f, filepath: str) -> Iterator:
+    """Yields one decoded value per non-blank line, skipping (and logging) lines that are not valid JSON."""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logging.warning(f"Skipping invalid JSON on line {line_number} of {filepath}: {e}")
+
+def iter_json_records(filepath: str, chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator:
+    """
+    Streams the raw records of a JSON file: the elements of a top-level array,
+    parsed incrementally in chunks of chunk_size characters, or one value per
+    line of newline-delimited JSON. Logs a warning and yields nothing if the
+    file holds neither.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If a JSON array file is empty, malformed or
+            truncated. Records before the error have already been yielded.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        # Sniff the format from the first non-whitespace character
+        head = ""
+        while True:
+            chunk = f.read(chunk_size)
+            head = chunk.lstrip()
+            if head or not chunk:
+                break
+        if not head:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+        if head[0] == '[':
+            yield from _iter_json_array(f, chunk_size, head)
+            return
+        # A file starting with '{' is NDJSON only if its first line is a whole object,
+        # not e.g. the opening line of a pretty-printed {"jobs": [...]}
+        f.seek(0)
+        if head[0] == '{' and _first_line_is_object(f):
+            f.seek(0)
+            yield from _iter_ndjson(f, filepath)
+        else:
+            logging.warning(f"JSON file {filepath} does not contain a list. Returning empty list.")
+
+def iter_jobs_from_json(filepath: str, lazy_descriptions: bool = False,
+                        chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[Job]:
+    """
+    Streams Job objects from a JSON file without loading the whole file.
+
+    Accepts either a top-level JSON array (as written by save_jobs_to_json),
+    parsed incrementally in chunks of chunk_size characters, or
+    newline-delimited JSON with one job record per line. Records that cannot be
+    converted are skipped and logged, as in load_jobs_from_json.
+
+    Args:
+        filepath: The path to the JSON or NDJSON file.
+        lazy_descriptions: Optional. See load_jobs_from_json.
+        chunk_size: Optional. Number of characters read at a time.
+
+    Yields:
+        Job objects in file order.
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If a JSON array file is empty, malformed or
+            truncated. Jobs before the error have already been yielded.
+    """
+    descriptions = None if lazy_descriptions else DescriptionStore(filepath)
+    for job_dict in iter_json_records(filepath, chunk_size):
+        try:
+            job = job_from_dict(job_dict, descriptions)
+            if job is not None:
+                yield job
+        except KeyError as e:
+            logging.warning(f"Skipping job from JSON due to missing key: {e}. Data: {job_dict}")
+        except TypeError as e: # Catches issues if parsed_date is None and Job expects datetime
+            logging.warning(f"Skipping job from JSON due to TypeError (likely bad date for required field): {e}. Data: {job_dict}")
+        except Exception as e:
+            logging.error(f"Error processing a job record from {filepath}: {e}. Record: {job_dict}")
+
+@timed(LOAD_SECONDS)
+def load_jobs_from_json(filepath: str, lazy_descriptions: bool = False) -> List[Job]:
+    """
+    Loads a list of Job objects from a JSON (or newline-delimited JSON) file.
     ISO 8601 date strings are converted back to datetime objects.
 
+    Records are streamed through iter_jobs_from_json, so the raw file and the
+    full list of parsed dicts are never held in memory next to the jobs.
+
     Args:
         filepath: The path to the JSON file from which jobs will be loaded.
+        lazy_descriptions: Optional. If True and the file was saved with
+            split_descriptions, description_html is left as None and can be
+            fetched on demand through a DescriptionStore. Otherwise split
+            descriptions are read from the side file up front.
 
     Returns:
-        A list of Job dataclass objects. Returns an empty list if the file 
+        A list of Job objects. Returns an empty list if the file 
         doesn't exist, is empty, or cannot be parsed.
     """
     jobs = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data_from_file = json.load(f)
-            if not isinstance(data_from_file, list):
-                logging.warning(f"JSON file {filepath} does not contain a list. Returning empty list.")
-                return []
-
-            for job_dict in data_from_file:
-                try:
-                    # Convert ISO string back to datetime
-                    date_str = job_dict.get('publication_date')
-                    parsed_date = None
-                    if date_str:
-                        try:
-                            # datetime.fromisoformat is quite flexible
-                            parsed_date = datetime.fromisoformat(date_str)
-                        except ValueError as ve_date:
-                            logging.warning(f"Could not parse date string '{date_str}' for job ID {job_dict.get('id')}: {ve_date}. Setting date to None.")
-                            # Decide if jobs with unparseable dates should be skipped or have date set to None
-                            # If Job dataclass requires publication_date, this will fail construction
-                            # For now, let's assume Job dataclass requires it, so this job might be skipped by outer try-except.
-                            # If Job.publication_date was Optional[datetime], we could set it to None.
-                            # Given current Job definition, we need a valid datetime.
-                            # To be robust, we might skip this job or use a placeholder if the date is critical
-                            # For now, the outer exception will catch the issue if Job construction fails due to this.
-                            # For the Job dataclass, publication_date is NOT optional.
-                            pass # Let the Job construction fail if date is invalid and required
-                    
-                    # Ensure all required fields for Job dataclass are present
-                    # This is a basic check; Pydantic would be more robust here.
-                    if not all(k in job_dict for k in ['id', 'title', 'company_name', 'remotive_url', 'category', 'description_html']) or not parsed_date:
-                        logging.warning(f"Skipping job from JSON due to missing required fields or unparseable date: {job_dict.get('id', 'Unknown ID')}")
-                        continue
-
-                    job = Job(
-                        id=job_dict['id'],
-                        title=job_dict['title'],
-                        company_name=job_dict['company_name'],
-                        remotive_url=job_dict['remotive_url'],
-                        category=job_dict['category'],
-                        publication_date=parsed_date, # Use the parsed date
-                        description_html=job_dict['description_html'],
-                        candidate_required_location=job_dict.get('candidate_required_location'),
-                        salary=job_dict.get('salary'),
-                        job_type=job_dict.get('job_type')
-                    )
-                    jobs.append(job)
-                except KeyError as e:
-                    logging.warning(f"Skipping job from JSON due to missing key: {e}. Data: {job_dict}")
-                except TypeError as e: # Catches issues if parsed_date is None and Job expects datetime
-                    logging.warning(f"Skipping job from JSON due to TypeError (likely bad date for required field): {e}. Data: {job_dict}")
-                except Exception as e:
-                    logging.error(f"Error processing a job record from {filepath}: {e}. Record: {job_dict}")
-
+        jobs = list(iter_jobs_from_json(filepath, lazy_descriptions=lazy_descriptions))
         logging.info(f"Successfully loaded {len(jobs)} jobs from {filepath}")
+        JOBS_LOADED.inc(len(jobs))
     except FileNotFoundError:
         logging.info(f"JSON file {filepath} not found. Returning empty list.")
     except json.JSONDecodeError as e:
@@ -150,33 +588,56 @@ def load_jobs_from_json(filepath: str) -> List[Job]:
     return jobs
 
 if __name__ == '__main__':
-    # This assumes job_processor.py (for Job dataclass) is accessible
     # Create some dummy Job objects for testing
-    if 'Job' in globals() and hasattr(Job, 'title'): # Check if real Job class was imported
-        test_jobs = [
-            Job(id=1, title="Software Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="dev", publication_date=datetime(2023, 1, 15, 10, 30, 0), description_html="<p>Job 1</p>"),
-            Job(id=2, title="Product Manager", company_name="Biz Inc", remotive_url="http://example.com/2", category="product", publication_date=datetime(2023, 1, 16, 14, 0, 0), description_html="<p>Job 2</p>", salary="$100k")
-        ]
-        test_filepath = "test_jobs.json"
-
-        logging.info(f"--- Testing saving {len(test_jobs)} jobs to {test_filepath} ---")
-        save_success = save_jobs_to_json(test_jobs, test_filepath)
-        if save_success:
-            logging.info(f"--- Testing loading jobs from {test_filepath} ---")
-            loaded_jobs = load_jobs_from_json(test_filepath)
-            if loaded_jobs:
-                logging.info(f"Successfully loaded {len(loaded_jobs)} jobs.")
-                for job in loaded_jobs:
-                    print(f"Loaded Job: ID={job.id}, Title='{job.title}', Published='{job.publication_date.strftime('%Y-%m-%d %H:%M')}', Salary='{job.salary}'")
-                
-                # Verify data integrity (simple check)
-                if len(loaded_jobs) == len(test_jobs) and loaded_jobs[0].title == test_jobs[0].title and loaded_jobs[0].publication_date == test_jobs[0].publication_date:
-                    logging.info("Data integrity check passed.")
-                else:
-                    logging.error("Data integrity check FAILED.")
+    test_jobs = [
+        Job(id=1, title="Software Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="dev", publication_date=datetime(2023, 1, 15, 10, 30, 0), description_html="<p>Job 1</p>"),
+        Job(id=2, title="Product Manager", company_name="Biz Inc", remotive_url="http://example.com/2", category="product", publication_date=datetime(2023, 1, 16, 14, 0, 0), description_html="<p>Job 2</p>", salary="$100k")
+    ]
+    test_filepath = "test_jobs.json"
+
+    logging.info(f"--- Testing saving {len(test_jobs)} jobs to {test_filepath} ---")
+    save_success = save_jobs_to_json(test_jobs, test_filepath)
+    if save_success:
+        logging.info(f"--- Testing loading jobs from {test_filepath} ---")
+        loaded_jobs = load_jobs_from_json(test_filepath)
+        if loaded_jobs:
+            logging.info(f"Successfully loaded {len(loaded_jobs)} jobs.")
+            for job in loaded_jobs:
+                print(f"Loaded Job: ID={job.id}, Title='{job.title}', Published='{job.publication_date.strftime('%Y-%m-%d %H:%M')}', Salary='{job.salary}'")
+            
+            # Verify data integrity (simple check)
+            if len(loaded_jobs) == len(test_jobs) and loaded_jobs[0].title == test_jobs[0].title and loaded_jobs[0].publication_date == test_jobs[0].publication_date:
+                logging.info("Data integrity check passed.")
             else:
-                logging.error("Failed to load jobs or file was empty after saving.")
+                logging.error("Data integrity check FAILED.")
         else:
-            logging.error(f"Failed to save jobs to {test_filepath}.")
+            logging.error("Failed to load jobs or file was empty after saving.")
+    else:
+        logging.error(f"Failed to save jobs to {test_filepath}.")
+
+    logging.info(f"--- Testing split descriptions with {test_filepath} ---")
+    if save_jobs_to_json(test_jobs, test_filepath, split_descriptions=True):
+        lazy_jobs = load_jobs_from_json(test_filepath, lazy_descriptions=True)
+        eager_jobs = load_jobs_from_json(test_filepath)
+        descriptions = DescriptionStore(test_filepath)
+        if all(job.description_html is None for job in lazy_jobs) and \
+           [descriptions.get(job.id) for job in lazy_jobs] == [job.description_html for job in test_jobs] == [job.description_html for job in eager_jobs]:
+            logging.info("Split description check passed.")
+        else:
+            logging.error("Split description check FAILED.")
+        os.remove(description_filepath(test_filepath))
+
+    logging.info(f"--- Testing streaming {test_filepath} and newline-delimited JSON ---")
+    save_jobs_to_json(test_jobs, test_filepath)
+    ndjson_filepath = "test_jobs.ndjson"
+    with open(ndjson_filepath, 'w', encoding='utf-8') as f:
+        for job in test_jobs:
+            f.write(json.dumps(job_to_dict(job)) + "\n")
+        f.write("{not valid json\n") # Skipped with a warning
+    streamed_jobs = list(iter_jobs_from_json(test_filepath, chunk_size=16))
+    ndjson_jobs = list(iter_jobs_from_json(ndjson_filepath))
+    if streamed_jobs == ndjson_jobs == test_jobs:
+        logging.info("Streaming load check passed.")
     else:
-        logging.warning("Job dataclass not properly imported. Skipping job_storage.py tests.") 
\ No newline at end of file
+        logging.error("Streaming load check FAILED.")
+    os.remove(ndjson_filepath)
@@ -0,0 +1,263 @@
+import functools
+import hashlib
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# Attempt to import the JSON loader from job_storage
+try:
+    from job_storage import load_jobs_from_json, DescriptionStore, JOBS_JSON_FILEPATH
+except ImportError:
+    logging.error("Could not import from job_storage.py. Ensure it's in the same directory or PYTHONPATH.")
+    def load_jobs_from_json(filepath, lazy_descriptions=False): return []
+    DescriptionStore = None
+    JOBS_JSON_FILEPATH = os.path.join("data", "remotive_jobs.json")
+
+# Prefer the journal-aware loader, so merges appended by update_jobs.py are picked up too
+try:
+    from job_journal import load_jobs_with_journal, journal_filepath
+    default_loader = load_jobs_with_journal
+except ImportError:
+    logging.warning("Could not import from job_journal.py. Merge journals will be ignored.")
+    default_loader = load_jobs_from_json
+    def journal_filepath(filepath): return None
+
+try:
+    from metrics import STORE_RELOAD_SECONDS
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure metrics.py is accessible.")
+    raise
+
+# SQLite job databases (see job_db.py) are served through the same store
+try:
+    from job_db import load_jobs_from_db, is_db_filepath, DataVersion, SQLiteDescriptionStore
+except ImportError:
+    logging.warning("Could not import from job_db.py. Only JSON job files can be served.")
+    def is_db_filepath(filepath): return False
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# (inode, size, mtime in ns) of the jobs file and of its journal - cheap to obtain with os.stat -
+# or, for an SQLite database, (inode, data version)
+FileSignature = Union[Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]], Tuple[int, int]]
+
+
+class JobStore:
+    """
+    Process-wide, in-memory cache of the parsed job list for one JSON file.
+
+    Every call to get_jobs() stats the backing file and its merge journal and
+    only re-parses them when an inode, size or mtime changed (e.g. after
+    update_jobs.py replaced the file or appended to the journal). The parsed list and the signature it was
+    loaded from (plus an id lookup) are swapped in together as one tuple, so concurrent readers
+    always see either the old or the new list, never a half-loaded one.
+
+    The returned list is shared between requests and must be treated as read-only.
+
+    With lazy_descriptions=True, files saved with split descriptions are loaded
+    without description_html; use get_description() to read one on demand.
+
+    A filepath ending in .db/.sqlite/.sqlite3 is served from the SQLite
+    backend in job_db.py instead; changes are then detected with
+    PRAGMA data_version rather than file stats.
+
+    With background_reload=True, callers keep getting the loaded list after
+    the files changed until reload() is called (e.g. by a background thread),
+    so no request waits for a reload; only the very first load happens on demand.
+    """
+
+    def __init__(self, filepath: str, loader: Optional[Callable[[str], List]] = None, lazy_descriptions: bool = False,
+                 background_reload: bool = False):
+        self.filepath = filepath
+        is_db = is_db_filepath(filepath)
+        if loader is None:
+            loader = load_jobs_from_db if is_db else default_loader
+        self._journal_filepath = None if is_db else journal_filepath(filepath)
+        self._data_version = DataVersion(filepath) if is_db else None
+        # PRAGMA data_version is counted per connection, so database versions only mean
+        # something within this process; file stats are the same for every process
+        self._version_salt = os.urandom(8).hex() if is_db else ""
+        self._loader = functools.partial(loader, lazy_descriptions=True) if lazy_descriptions else loader
+        if not lazy_descriptions:
+            self._descriptions = None
+        elif is_db:
+            self._descriptions = SQLiteDescriptionStore(filepath)
+        else:
+            self._descriptions = DescriptionStore(filepath) if DescriptionStore else None
+        self.background_reload = background_reload
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # (signature, jobs, jobs by id) - replaced as a whole, never mutated in place
+        self._snapshot: Tuple[Optional[FileSignature], List, Dict] = (None, [], {})
+        self.hits = 0
+        self.reloads = 0
+        self.misses = 0  # Requests made while the backing file did not exist
+        self.stale_hits = 0  # Requests served the previous list while a background reload was pending
+
+    @staticmethod
+    def _stat_signature(path: Optional[str]) -> Optional[Tuple[int, int, int]]:
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _file_signature(self) -> Optional[FileSignature]:
+        if self._data_version is not None:
+            return self._data_version.get()
+        file_signature = self._stat_signature(self.filepath)
+        if file_signature is None:
+            return None
+        return (file_signature, self._stat_signature(self._journal_filepath))
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _get_snapshot(self) -> Optional[Tuple[Optional[FileSignature], List, Dict]]:
+        signature = self._file_signature()
+        if signature is None:
+            self._count('misses')
+            return None
+
+        snapshot = self._snapshot
+        if snapshot[0] == signature:
+            self._count('hits')
+            return snapshot
+        if self.background_reload and snapshot[0] is not None:
+            self._count('stale_hits')
+            return snapshot
+        return self._load(signature)
+
+    def _load(self, signature: FileSignature) -> Tuple[Optional[FileSignature], List, Dict]:
+        # Only one thread parses the file; the others wait and then reuse its result
+        with self._reload_lock:
+            snapshot = self._snapshot
+            if snapshot[0] == signature:
+                self._count('hits')
+                return snapshot
+
+            logging.info(f"Job data file {self.filepath} changed, reloading into memory.")
+            with STORE_RELOAD_SECONDS.time():
+                jobs = self._loader(self.filepath)
+            snapshot = (signature, jobs, {job.id: job for job in jobs})
+            self._snapshot = snapshot
+            self._count('reloads')
+        return snapshot
+
+    def reload(self) -> bool:
+        """
+        Loads the backing files now if they changed since the last load.
+
+        Returns:
+            True if a new list was swapped in, False if nothing changed or the file does not exist.
+        """
+        signature = self._file_signature()
+        if signature is None or signature == self._snapshot[0]:
+            return False
+        self._load(signature)
+        return True
+
+    def get_jobs(self) -> Optional[List]:
+        """
+        Returns the cached job list, reloading it first if the file changed.
+
+        Returns:
+            The list of Job objects, or None if the backing file does not exist.
+        """
+        snapshot = self._get_snapshot()
+        return snapshot[1] if snapshot is not None else None
+
+    def get_jobs_with_version(self) -> Tuple[Optional[List], Optional[str]]:
+        """
+        Returns the cached job list together with a version string that
+        changes whenever the list is reloaded from changed files (both taken
+        from the same snapshot), or (None, None) if the backing file does not exist.
+
+        For JSON files the version is the same in every process serving the
+        same files; for SQLite databases it is specific to this store.
+        """
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None, None
+        version = hashlib.sha1(f"{self._version_salt}{snapshot[0]!r}".encode('utf-8')).hexdigest()[:16]
+        return snapshot[1], version
+
+    def get_jobs_by_id(self) -> Optional[Dict]:
+        """
+        Returns {job id: Job} for the cached job list (built once per reload),
+        or None if the backing file does not exist.
+        """
+        snapshot = self._get_snapshot()
+        return snapshot[2] if snapshot is not None else None
+
+    def get_description(self, job) -> Optional[str]:
+        """
+        Returns the description HTML of a job served by this store, reading it
+        from the description side file if it was not loaded up front.
+        """
+        if job.description_html is not None or self._descriptions is None:
+            return job.description_html
+        return self._descriptions.get(job.id)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns a snapshot of the hit/reload counters and the cached job count."""
+        with self._stats_lock:
+            return {
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "jobs": len(self._snapshot[1]),
+            }
+
+
+_stores: Dict[Tuple[str, bool], JobStore] = {}
+_stores_lock = threading.Lock()
+
+def get_job_store(filepath: str = JOBS_JSON_FILEPATH, lazy_descriptions: bool = False,
+                  background_reload: bool = False) -> JobStore:
+    """
+    Returns the process-wide JobStore for the given file, creating it on first use.
+    background_reload only applies when the store is created.
+    """
+    key = (os.path.abspath(filepath), lazy_descriptions)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = JobStore(filepath, lazy_descriptions=lazy_descriptions, background_reload=background_reload)
+            _stores[key] = store
+        return store
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import time
+    try:
+        from job_processor import Job
+        from job_storage import save_jobs_to_json
+    except ImportError:
+        logging.error("job_processor.py / job_storage.py not found. Skipping job_store.py tests.")
+        raise SystemExit(1)
+
+    test_filepath = "test_job_store.json"
+    jobs_v1 = [Job(id=1, title="Software Engineer", company_name="Tech Co", remotive_url="http://example.com/1", category="dev", publication_date=datetime(2023, 1, 15), description_html="<p>Job 1</p>")]
+    save_jobs_to_json(jobs_v1, test_filepath)
+
+    store = get_job_store(test_filepath)
+    first = store.get_jobs()
+    second = store.get_jobs()
+    logging.info(f"Same list object served from memory: {first is second}. Stats: {store.stats()}")
+
+    # Make sure the mtime moves on filesystems with coarse timestamps
+    time.sleep(0.01)
+    jobs_v2 = jobs_v1 + [Job(id=2, title="Product Manager", company_name="Biz Inc", remotive_url="http://example.com/2", category="product", publication_date=datetime(2023, 1, 16), description_html="<p>Job 2</p>")]
+    save_jobs_to_json(jobs_v2, test_filepath)
+    logging.info(f"After rewrite: {len(store.get_jobs())} jobs (expected 2). Stats: {store.stats()}")
+
+    os.remove(test_filepath)
+    logging.info(f"After delete: {store.get_jobs()} (expected None). Stats: {store.stats()}")
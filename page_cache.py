@@ -0,0 +1,191 @@
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None # Pages are then offered gzip-compressed only
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAX_CACHED_PAGES = 256
+MAX_CACHED_FRAGMENTS = 20_000
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Content codings in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accepted: Callable[[str], float]) -> str:
+    """
+    Picks the content coding for a response.
+
+    Args:
+        accepted: Returns the client's quality value for a coding (0 if not
+            accepted), e.g. Flask's request.accept_encodings.quality.
+
+    Returns:
+        'br', 'gzip' or 'identity'.
+    """
+    for encoding in ENCODINGS:
+        if accepted(encoding) > 0:
+            return encoding
+    return 'identity'
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0) # mtime=0: same bytes every time
+    return body
+
+
+class RenderedPage:
+    """One rendered page body plus its compressed forms, each made on first use."""
+
+    __slots__ = ('etag_base', '_bodies', '_lock')
+
+    def __init__(self, etag_base: str, body: bytes):
+        self.etag_base = etag_base
+        self._bodies: Dict[str, bytes] = {'identity': body}
+        self._lock = threading.Lock()
+
+    def etag(self, encoding: str) -> str:
+        return PageCache.encoded_etag(self.etag_base, encoding)
+
+    def body(self, encoding: str = 'identity') -> bytes:
+        encoded = self._bodies.get(encoding)
+        if encoded is None:
+            with self._lock:
+                encoded = self._bodies.get(encoding)
+                if encoded is None:
+                    encoded = _compress(self._bodies['identity'], encoding)
+                    self._bodies[encoding] = encoded
+        return encoded
+
+
+class PageCache:
+    """
+    Rendered pages of one dataset version, keyed by their query parameters.
+
+    A dataset version is any string that changes whenever the served job data
+    does (e.g. the snapshot file's inode/size/mtime). The first lookup with a
+    new version drops every cached page, and compressed bodies are made once
+    per page rather than per request. ETags are derived from the version, the
+    page key and the given salt (e.g. template mtimes) only, so they can be
+    checked before anything is rendered and agree across worker processes.
+    """
+
+    def __init__(self, max_pages: int = MAX_CACHED_PAGES, salt: str = ""):
+        self.max_pages = max_pages
+        self.salt = salt
+        self._version: Optional[str] = None
+        self._pages: "OrderedDict[Tuple, RenderedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def page_key(params: Iterable[Tuple[str, str]]) -> Tuple:
+        """Canonical key for a page's query parameters (the order they were given in does not matter)."""
+        return tuple(sorted(params))
+
+    def etag_base(self, version: str, key: Tuple) -> str:
+        digest = hashlib.sha1(repr((self.salt, version, key)).encode('utf-8')).hexdigest()
+        return digest[:32]
+
+    @staticmethod
+    def encoded_etag(etag_base: str, encoding: str) -> str:
+        # Each content coding is a different representation, so it gets its own strong ETag
+        return etag_base if encoding == 'identity' else f"{etag_base}-{encoding}"
+
+    def get(self, version: str, key: Tuple) -> Optional[RenderedPage]:
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._pages.clear()
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, version: str, key: Tuple, body: bytes) -> RenderedPage:
+        page = RenderedPage(self.etag_base(version, key), body)
+        with self._lock:
+            if version == self._version:
+                self._pages[key] = page
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        return page
+
+
+class FragmentCache:
+    """
+    Rendered HTML fragments per job (e.g. one job card), reused across pages
+    and dataset versions. Each entry is keyed by job id and stores the content
+    key of the job it was rendered from, so a job whose shown fields changed
+    is re-rendered while unchanged jobs are not.
+    """
+
+    def __init__(self, render: Callable, content_key: Callable, max_fragments: int = MAX_CACHED_FRAGMENTS):
+        self._render = render
+        self._content_key = content_key
+        self.max_fragments = max_fragments
+        self._fragments: "OrderedDict[object, Tuple[object, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job) -> str:
+        content_key = self._content_key(job)
+        with self._lock:
+            cached = self._fragments.get(job.id)
+            if cached is not None and cached[0] == content_key:
+                self._fragments.move_to_end(job.id)
+                return cached[1]
+        fragment = self._render(job)
+        with self._lock:
+            self._fragments[job.id] = (content_key, fragment)
+            self._fragments.move_to_end(job.id)
+            while len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+
+if __name__ == '__main__':
+    import time
+
+    cache = PageCache(max_pages=2)
+    body = ("<div class='job-card'>" + "Senior Python Engineer at Example Co. " * 20 + "</div>\n").encode('utf-8') * 50
+    key = PageCache.page_key([('category', 'Design'), ('cursor', '')])
+    assert cache.get("v1", key) is None
+    page = cache.put("v1", key, body)
+    for encoding in ENCODINGS:
+        start = time.perf_counter()
+        compressed = page.body(encoding)
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        page.body(encoding)
+        again = (time.perf_counter() - start) * 1000
+        logging.info(f"{encoding}: {len(body)} -> {len(compressed)} bytes; compressed in {first:.2f} ms, "
+                     f"served again in {again:.4f} ms (ETag {page.etag(encoding)})")
+    logging.info(f"Same page from cache: {cache.get('v1', key) is page}; dropped after a new version: {cache.get('v2', key) is None}")
+
+    renders = []
+    fragments = FragmentCache(render=lambda job: renders.append(job.id) or f"<div>{job.title}</div>",
+                              content_key=lambda job: job.title)
+    class _Job:
+        def __init__(self, id, title):
+            self.id, self.title = id, title
+    fragments.get(_Job(1, "A")); fragments.get(_Job(1, "A")); fragments.get(_Job(1, "B"))
+    logging.info(f"Fragment renders for get(A), get(A), get(B): {len(renders)} (expected 2)")
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # Not on Windows; an exclusively created lock file is used instead
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DATA_DIR = "data"
+REFRESH_INTERVAL_SECONDS = 30 * 60
+# Each wait is stretched or shrunk by up to this fraction, so workers started together drift apart
+REFRESH_JITTER = 0.1
+# First retry after a failed refresh; doubled per consecutive failure, capped at the interval
+RETRY_BASE_SECONDS = 60
+# How often every process checks for data written by a refresh (its own or another process's)
+WATCH_INTERVAL_SECONDS = 5
+REFRESH_LOCK_FILEPATH = os.path.join(DATA_DIR, "refresh.lock")
+REFRESH_STATE_FILEPATH = os.path.join(DATA_DIR, "refresh_state.json")
+# A fallback lock file older than this is assumed to be left over from a crashed process
+STALE_LOCK_SECONDS = 6 * 60 * 60
+
+
+class RefreshLock:
+    """
+    Non-blocking lock shared by all processes using the same lock file: an
+    flock where available, otherwise the exclusive creation of the file.
+    """
+
+    def __init__(self, filepath: str = REFRESH_LOCK_FILEPATH):
+        self.filepath = filepath
+        self._file = None
+
+    def acquire(self) -> bool:
+        """Returns True if the lock was taken, False if another process holds it."""
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        if fcntl is not None:
+            f = open(self.filepath, 'a')
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                return False
+            self._file = f
+            return True
+        for _ in range(2):
+            try:
+                os.close(os.open(self.filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                self._file = self.filepath
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.filepath) < STALE_LOCK_SECONDS:
+                        return False
+                    os.remove(self.filepath)
+                except OSError:
+                    return False
+        return False
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+        else:
+            try:
+                os.remove(self.filepath)
+            except OSError:
+                pass
+        self._file = None
+
+
+def _read_state(filepath: str) -> Dict:
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_state(filepath: str, state: Dict) -> None:
+    tmp_filepath = filepath + ".tmp"
+    try:
+        with open(tmp_filepath, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_filepath, filepath)
+    except OSError as e:
+        logging.error(f"Could not write refresh state to {filepath}: {e}")
+
+
+class BackgroundRefresher:
+    """
+    Daemon thread that runs refresh() (e.g. update_jobs.run_update) every
+    interval seconds and, between refreshes, calls on_change() every
+    watch_interval seconds so new data is loaded off the request path.
+
+    At most one process refreshes at a time (RefreshLock), and the time of the
+    last attempt and the number of consecutive failures are kept in a state
+    file shared by all processes, so N workers still refresh about once per
+    interval. After a failure (refresh() returned False or raised) the
+    previous data stays in place and the next attempt is made after
+    retry_base, 2 * retry_base, ... seconds, up to interval.
+    """
+
+    def __init__(self, refresh: Callable[[], bool], on_change: Optional[Callable[[], None]] = None,
+                 interval: float = REFRESH_INTERVAL_SECONDS, jitter: float = REFRESH_JITTER,
+                 retry_base: float = RETRY_BASE_SECONDS, watch_interval: float = WATCH_INTERVAL_SECONDS,
+                 lock_filepath: str = REFRESH_LOCK_FILEPATH, state_filepath: str = REFRESH_STATE_FILEPATH):
+        self.refresh = refresh
+        self.on_change = on_change
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.watch_interval = watch_interval
+        self.lock = RefreshLock(lock_filepath)
+        self.state_filepath = state_filepath
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._random = random.Random()
+        self.refreshes = 0
+        self.failures = 0
+
+    def delay(self, failures: int) -> float:
+        """Seconds from one attempt to the next after the given number of consecutive failures (before jitter)."""
+        if failures <= 0:
+            return self.interval
+        return min(self.interval, self.retry_base * 2 ** (failures - 1))
+
+    def _next_due(self) -> float:
+        state = _read_state(self.state_filepath)
+        delay = self.delay(state.get("failures", 0)) * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        return state.get("last_attempt", 0) + delay
+
+    def refresh_once(self, force: bool = False) -> Optional[bool]:
+        """
+        Refreshes now if no other process is doing so and (unless force) no
+        attempt was made recently by any process.
+
+        Returns:
+            True or False for a successful or failed refresh, None if it was skipped.
+        """
+        if not self.lock.acquire():
+            logging.info("Another process is refreshing the job data; skipping this round.")
+            return None
+        try:
+            state = _read_state(self.state_filepath)
+            failures = state.get("failures", 0)
+            since_last = time.time() - state.get("last_attempt", 0)
+            if not force and since_last < self.delay(failures) * (1 - self.jitter):
+                return None # Another process refreshed while we were waiting
+            started = time.time()
+            try:
+                ok = bool(self.refresh())
+            except Exception as e:
+                logging.error(f"Background refresh failed with an unexpected error: {e}")
+                ok = False
+            state = {"last_attempt": started, "failures": 0 if ok else failures + 1,
+                     "last_success": started if ok else state.get("last_success"), "pid": os.getpid()}
+            _write_state(self.state_filepath, state)
+        finally:
+            self.lock.release()
+
+        if ok:
+            self.refreshes += 1
+            logging.info(f"Background refresh finished in {time.time() - started:.1f}s.")
+        else:
+            self.failures += 1
+            logging.warning(f"Background refresh failed ({state['failures']} in a row); still serving the previous data, "
+                            f"next attempt in about {self.delay(state['failures']):.1f}s.")
+        return ok
+
+    def _notify(self) -> None:
+        if self.on_change is None:
+            return
+        try:
+            self.on_change()
+        except Exception as e:
+            logging.error(f"Could not load refreshed job data: {e}")
+
+    def _run(self) -> None:
+        self._notify()
+        due = self._next_due()
+        while not self._stop.wait(max(0.0, min(self.watch_interval, due - time.time()))):
+            if time.time() >= due:
+                self.refresh_once()
+                due = self._next_due()
+            self._notify()
+
+    def start(self) -> "BackgroundRefresher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job-refresher", daemon=True)
+            self._thread.start()
+            logging.info(f"Background job refresh every {self.interval:.0f}s (±{self.jitter:.0%}) started.")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stops the thread after the current refresh (if any) finishes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    workdir = tempfile.mkdtemp(prefix="atlas-refresh-")
+    outcomes = iter([False, False, True])
+    attempts = []
+
+    def flaky_refresh():
+        attempts.append(time.time())
+        return next(outcomes, True)
+
+    refresher = BackgroundRefresher(flaky_refresh, interval=2, jitter=0.1, retry_base=0.2, watch_interval=0.05,
+                                    lock_filepath=os.path.join(workdir, "refresh.lock"),
+                                    state_filepath=os.path.join(workdir, "refresh_state.json"))
+    # A first attempt is due immediately, as there is no state file yet
+    refresher.start()
+    time.sleep(1.5)
+    refresher.stop()
+    gaps = [round(b - a, 2) for a, b in zip(attempts, attempts[1:])]
+    logging.info(f"{len(attempts)} attempts, gaps {gaps} (backoff 0.2s, 0.4s, then the 2s interval); "
+                 f"{refresher.failures} failed, {refresher.refreshes} succeeded.")
+
+    other = RefreshLock(os.path.join(workdir, "refresh.lock"))
+    held = RefreshLock(os.path.join(workdir, "refresh.lock"))
+    logging.info(f"Lock taken: {held.acquire()}; second holder refused: {not other.acquire()}")
+    held.release()
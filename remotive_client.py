@@ -1,15 +1,137 @@
 import urllib.request
 import urllib.parse
+import http.client
+import codecs
+import itertools
 import json
 import logging
-from typing import List, Optional, Union
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    from metrics import FETCH_REQUESTS, FETCH_NOT_MODIFIED, FETCH_BYTES, FETCH_SECONDS, PARSE_SECONDS
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure metrics.py is accessible.")
+    raise
+
+try:
+    from job_storage import iter_json_member_array, JSON_READ_CHUNK_SIZE
+except ImportError as e:
+    logging.critical(f"Failed to import necessary modules: {e}. Ensure job_storage.py is accessible.")
+    raise
+
+try:
+    from response_cache import ResponseCache
+except ImportError:
+    ResponseCache = None # Conditional requests are only used when a cache is passed in
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 REMOTE_JOBS_API_URL = "https://remotive.com/api/remote-jobs"
 
-def fetch_raw_jobs(category: str = None, search_term: str = None, limit: int = None) -> Union[List, None]:
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36',
+    'Accept': 'application/json',
+}
+
+def build_request_url(category: str = None, search_term: str = None, limit: int = None, base_url: str = REMOTE_JOBS_API_URL) -> str:
+    """
+    Builds the Remotive API URL for the given filters.
+    """
+    params = {}
+    if category:
+        params['category'] = category
+    if search_term:
+        params['search'] = search_term
+    if limit is not None:
+        params['limit'] = str(limit) # API expects limit as a string if passed as param
+
+    query_string = urllib.parse.urlencode(params)
+    return f"{base_url}?{query_string}" if query_string else base_url
+
+def _extract_jobs(parsed_json: Dict) -> Union[List, None]:
+    """
+    Pulls the job list out of a decoded Remotive API response.
+    """
+    # The API wraps jobs in a 'jobs' key
+    if 'jobs' in parsed_json:
+        return parsed_json['jobs']
+    logging.warning("'jobs' key not found in API response.")
+    # The API also includes a "0-legal-notice" key at the top level
+    # It could be that the response is valid but just doesn't have jobs
+    # e.g. if limit=0 or no jobs match search
+    if "0-legal-notice" in parsed_json:
+        return [] # Return empty list if it's a valid Remotive response without jobs
+    return None
+
+class _NotModified:
+    def __repr__(self):
+        return "NOT_MODIFIED"
+
+# Returned instead of a job list when changed_only=True and the upstream feed is unchanged
+NOT_MODIFIED = _NotModified()
+
+# send(url, headers) -> (status, reason, response headers, body bytes)
+Sender = Callable[[str, Dict[str, str]], Tuple[int, str, Dict, bytes]]
+
+def _urllib_send(request_url: str, headers: Dict[str, str]) -> Tuple[int, str, Dict, bytes]:
+    # Create a Request object with headers
+    req = urllib.request.Request(url=request_url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response: # Added a timeout
+            return response.status, response.reason, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 304: # urllib reports "Not Modified" as an error
+            return 304, e.reason, e.headers, b''
+        raise
+
+def _conditional_fetch(request_url: str, send: Sender, cache: Optional["ResponseCache"], need_body: bool = True) -> Tuple[Optional[bytes], bool]:
+    """
+    GETs request_url, revalidating against the response cache if one is given.
+
+    Args:
+        request_url: The URL to fetch.
+        send: Performs the actual request.
+        cache: Optional. A ResponseCache providing ETag/Last-Modified validators.
+        need_body: Optional. If False, the cached body is not read when the
+            response is unchanged.
+
+    Returns:
+        A tuple of (body bytes or None, not_modified). The body is None on a
+        failed request (already logged) or when not_modified and not need_body.
+    """
+    meta = cache.lookup(request_url) if cache else None
+    if meta and cache.is_fresh(meta):
+        logging.info(f"Using cached response for {request_url} (within TTL).")
+        FETCH_NOT_MODIFIED.inc()
+        return (cache.read(request_url) if need_body else None), True
+
+    headers = dict(REQUEST_HEADERS)
+    headers.update(ResponseCache.conditional_headers(meta) if cache else {})
+    with FETCH_SECONDS.time():
+        status, reason, response_headers, body = send(request_url, headers)
+    FETCH_REQUESTS.inc()
+    FETCH_BYTES.inc(len(body))
+
+    if status == 304 and meta:
+        logging.info(f"Upstream reports no change for {request_url} (304 Not Modified).")
+        FETCH_NOT_MODIFIED.inc()
+        cache.revalidated(request_url, meta)
+        return (cache.read(request_url) if need_body else None), True
+    if status != 200:
+        logging.error(f"Failed to fetch jobs. Status code: {status} - {reason}")
+        return None, False
+    if cache:
+        cache.store(request_url, body, etag=response_headers.get('ETag'), last_modified=response_headers.get('Last-Modified'))
+    return body, False
+
+def fetch_raw_jobs(category: str = None, search_term: str = None, limit: int = None,
+                   cache: Optional["ResponseCache"] = None, changed_only: bool = False,
+                   base_url: str = REMOTE_JOBS_API_URL) -> Union[List, None, _NotModified]:
     """
     Fetches raw job listings from the Remotive API.
 
@@ -17,53 +139,29 @@ def fetch_raw_jobs(category: str = None, search_term: str = None, limit: int = N
         category: Optional. The job category to filter by (e.g., "software-dev").
         search_term: Optional. A search term to filter job titles and descriptions.
         limit: Optional. The maximum number of job listings to return.
+        cache: Optional. A ResponseCache; the request is then made conditional
+            (If-None-Match/If-Modified-Since) and a 304 is served from the cache.
+        changed_only: Optional. With a cache, return NOT_MODIFIED instead of
+            decoding the cached list when the feed has not changed.
+        base_url: Optional. API endpoint, e.g. a local stub server for testing.
 
     Returns:
         A list of job dictionaries if successful, None otherwise.
         Prints error messages to logging.
     """
-    params = {}
-    if category:
-        params['category'] = category
-    if search_term:
-        params['search'] = search_term
-    if limit is not None:
-        params['limit'] = str(limit) # API expects limit as a string if passed as param
-
-    query_string = urllib.parse.urlencode(params)
-    request_url = f"{REMOTE_JOBS_API_URL}?{query_string}" if query_string else REMOTE_JOBS_API_URL
+    request_url = build_request_url(category, search_term, limit, base_url=base_url)
 
     logging.info(f"Fetching jobs from: {request_url}")
 
     try:
-        # Create a Request object with headers
-        req = urllib.request.Request(
-            url=request_url,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36',
-                'Accept': 'application/json',
-            }
-        )
-        
-        with urllib.request.urlopen(req, timeout=10) as response: # Added a timeout
-            if response.status == 200:
-                data = response.read().decode('utf-8')
-                parsed_json = json.loads(data)
-                
-                # The API wraps jobs in a 'jobs' key
-                if 'jobs' in parsed_json:
-                    return parsed_json['jobs']
-                else:
-                    logging.warning("'jobs' key not found in API response.")
-                    # The API also includes a "0-legal-notice" key at the top level
-                    # It could be that the response is valid but just doesn't have jobs
-                    # e.g. if limit=0 or no jobs match search
-                    if "0-legal-notice" in parsed_json: 
-                        return [] # Return empty list if it's a valid Remotive response without jobs
-                    return None
-            else:
-                logging.error(f"Failed to fetch jobs. Status code: {response.status} - {response.reason}")
-                return None
+        data, not_modified = _conditional_fetch(request_url, _urllib_send, cache, need_body=not changed_only)
+        if not_modified and changed_only:
+            return NOT_MODIFIED
+        if data is None:
+            return None
+        with PARSE_SECONDS.time():
+            parsed_json = json.loads(data.decode('utf-8'))
+        return _extract_jobs(parsed_json)
     except urllib.error.HTTPError as e:
         logging.error(f"HTTPError while fetching jobs: {e.code} {e.reason}")
         return None
@@ -77,7 +175,335 @@ def fetch_raw_jobs(category: str = None, search_term: str = None, limit: int = N
         logging.error(f"An unexpected error occurred: {e}")
         return None
 
+class RawJobStream:
+    """
+    The raw jobs of one API response, decoded while the body is read (see
+    job_storage.iter_json_member_array), so only the current job and one read
+    buffer are held in memory however large the feed is. Iterate it once,
+    inside a with block.
+
+    When fetched with a ResponseCache (and not served from it), the body is copied to a temporary file
+    in the cache as it streams in; the copy replaces the cached entry on
+    close(), and only if the whole body was read.
+
+    Iteration raises ValueError for a malformed or truncated body (including
+    a missing 'jobs' key) and OSError or http.client.HTTPException if the
+    connection fails part way.
+    """
+
+    def __init__(self, body: BinaryIO, url: str, cache: Optional["ResponseCache"] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 chunk_size: int = JSON_READ_CHUNK_SIZE, from_cache: bool = False):
+        self.url = url
+        self.chunk_size = chunk_size
+        self.from_cache = from_cache
+        self.bytes_read = 0
+        self.complete = False
+        self._body = body
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._cache, self._etag, self._last_modified = cache, etag, last_modified
+        self._cache_file, self._cache_filepath = None, None
+        if cache is not None:
+            try:
+                os.makedirs(cache.cache_dir, exist_ok=True)
+                fd, self._cache_filepath = tempfile.mkstemp(suffix=".tmp", dir=cache.cache_dir)
+                self._cache_file = os.fdopen(fd, 'wb')
+            except OSError as e:
+                logging.warning(f"Could not cache the response for {url} while streaming it: {e}")
+
+    def read(self, size: int) -> str:
+        """Reads and decodes up to size more bytes of the body ('' at the end), as a text file would."""
+        while True:
+            data = self._body.read(size)
+            self.bytes_read += len(data)
+            if self._cache_file is not None:
+                self._cache_file.write(data)
+            text = self._decoder.decode(data, final=not data)
+            if text or not data:
+                return text
+
+    def __iter__(self) -> Iterator[Dict]:
+        try:
+            yield from iter_json_member_array(self, 'jobs', self.chunk_size)
+        except KeyError:
+            raise ValueError("'jobs' key not found in API response.") from None
+        # Read the rest of the object, so the cached copy is the complete body
+        while self.read(self.chunk_size):
+            pass
+        self.complete = True
+
+    def close(self) -> None:
+        if self._body is None:
+            return
+        self._body.close()
+        self._body = None
+        if not self.from_cache:
+            FETCH_BYTES.inc(self.bytes_read)
+        if self._cache_file is None:
+            return
+        self._cache_file.close()
+        self._cache_file = None
+        if self.complete:
+            self._cache.store_file(self.url, self._cache_filepath, etag=self._etag, last_modified=self._last_modified)
+        else:
+            try:
+                os.remove(self._cache_filepath)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "RawJobStream":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+
+def open_raw_job_stream(category: str = None, search_term: str = None, limit: int = None,
+                        cache: Optional["ResponseCache"] = None, changed_only: bool = False,
+                        base_url: str = REMOTE_JOBS_API_URL) -> Union[RawJobStream, None, _NotModified]:
+    """
+    Streaming counterpart of fetch_raw_jobs: makes the same (conditional)
+    request, but returns as soon as the response headers are in, with the
+    body still to be read through the returned RawJobStream. A response that
+    is served from the cache is streamed from the cached file.
+
+    Returns:
+        A RawJobStream, NOT_MODIFIED (with changed_only, as for fetch_raw_jobs),
+        or None if the request failed (already logged).
+    """
+    request_url = build_request_url(category, search_term, limit, base_url=base_url)
+    logging.info(f"Streaming jobs from: {request_url}")
+
+    meta = cache.lookup(request_url) if cache else None
+    not_modified = bool(meta) and cache.is_fresh(meta)
+    if not_modified:
+        logging.info(f"Using cached response for {request_url} (within TTL).")
+    else:
+        headers = dict(REQUEST_HEADERS)
+        headers.update(ResponseCache.conditional_headers(meta) if cache else {})
+        try:
+            response = urllib.request.urlopen(urllib.request.Request(url=request_url, headers=headers), timeout=10)
+        except urllib.error.HTTPError as e:
+            FETCH_REQUESTS.inc()
+            if e.code != 304 or not meta:
+                logging.error(f"HTTPError while fetching jobs: {e.code} {e.reason}")
+                return None
+            logging.info(f"Upstream reports no change for {request_url} (304 Not Modified).")
+            cache.revalidated(request_url, meta)
+            not_modified = True
+        except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+            logging.error(f"URLError while fetching jobs: {getattr(e, 'reason', e)}")
+            return None
+        else:
+            FETCH_REQUESTS.inc()
+            if response.status != 200:
+                response.close()
+                logging.error(f"Failed to fetch jobs. Status code: {response.status} - {response.reason}")
+                return None
+            return RawJobStream(response, request_url, cache=cache,
+                                etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+
+    FETCH_NOT_MODIFIED.inc()
+    if changed_only:
+        return NOT_MODIFIED
+    body = cache.open_body(request_url)
+    if body is None:
+        logging.error(f"Cached response for {request_url} is missing.")
+        return None
+    return RawJobStream(body, request_url, from_cache=True)
+
+class HTTPConnectionPool:
+    """
+    Thread-safe pool of keep-alive http.client connections, keyed by host.
+
+    At most per_host_limit requests are in flight per host at any time; idle
+    connections are reused by later requests instead of opening a new TCP/TLS
+    connection for every call.
+    """
+
+    def __init__(self, per_host_limit: int = 4, timeout: float = 10):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, Optional[int]], List[http.client.HTTPConnection]] = {}
+        self._semaphores: Dict[Tuple[str, str, Optional[int]], threading.BoundedSemaphore] = {}
+        self.connections_opened = 0
+
+    def _new_connection(self, key: Tuple[str, str, Optional[int]]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return connection_class(host, port, timeout=self.timeout)
+
+    def _acquire(self, key) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _release(self, key, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append(connection)
+
+    def _semaphore(self, key) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._semaphores[key]
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, Dict, bytes]:
+        """
+        Performs a GET request over a pooled connection.
+
+        Returns:
+            A tuple of (status code, reason, response headers, body bytes).
+        Raises:
+            http.client.HTTPException, OSError: If the request fails.
+        """
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+        with self._semaphore(key):
+            connection, reused = self._acquire(key)
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server may have dropped an idle keep-alive connection; retry once on a fresh one
+                connection = self._new_connection(key)
+                try:
+                    connection.request('GET', path, headers=headers or {})
+                    response = connection.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return response.status, response.reason, response.headers, body
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+def _fetch_with_pool(pool: HTTPConnectionPool, request_url: str, cache: Optional["ResponseCache"] = None,
+                     changed_only: bool = False) -> Union[List, None, _NotModified]:
+    """
+    Fetches one Remotive query through the pool, with the same return
+    convention as fetch_raw_jobs.
+    """
+    try:
+        body, not_modified = _conditional_fetch(request_url, pool.get, cache, need_body=not changed_only)
+        if not_modified and changed_only:
+            return NOT_MODIFIED
+        if body is None:
+            return None
+        with PARSE_SECONDS.time():
+            parsed_json = json.loads(body.decode('utf-8'))
+        return _extract_jobs(parsed_json)
+    except (http.client.HTTPException, OSError) as e:
+        logging.error(f"Connection error while fetching {request_url}: {e}")
+    except json.JSONDecodeError as e:
+        logging.error(f"Failed to decode JSON response from {request_url}: {e}")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while fetching {request_url}: {e}")
+    return None
+
+def fetch_raw_jobs_batch(categories: Optional[Iterable[str]] = None, search_terms: Optional[Iterable[str]] = None,
+                         limit: int = None, max_workers: int = 8, per_host_limit: int = 4,
+                         base_url: str = REMOTE_JOBS_API_URL, pool: Optional[HTTPConnectionPool] = None,
+                         cache: Optional["ResponseCache"] = None, changed_only: bool = False) -> Union[List, None, _NotModified]:
+    """
+    Fetches raw job listings for every combination of category and search term
+    concurrently and merges them into one list, de-duplicated by job id.
+
+    Args:
+        categories: Optional. Categories to fetch (e.g. ["software-dev", "design"]).
+            None or empty means no category filter.
+        search_terms: Optional. Search terms to fetch. None or empty means no search filter.
+        limit: Optional. The maximum number of job listings per query.
+        max_workers: Optional. Size of the worker thread pool.
+        per_host_limit: Optional. Maximum concurrent requests per host.
+        base_url: Optional. API endpoint, e.g. a local stub server for testing.
+        pool: Optional. A connection pool to reuse across batches; a temporary
+            one is created (and closed) otherwise.
+        cache: Optional. A ResponseCache used for conditional requests, as in fetch_raw_jobs.
+        changed_only: Optional. With a cache, return NOT_MODIFIED if no query's
+            response changed.
+
+    Returns:
+        A list of unique job dictionaries in query order if every query succeeded,
+        None otherwise (so callers never mistake a partial result for the full feed).
+    """
+    queries = list(itertools.product(list(categories or []) or [None], list(search_terms or []) or [None]))
+    request_urls = [build_request_url(category, search_term, limit, base_url=base_url) for category, search_term in queries]
+    logging.info(f"Fetching {len(request_urls)} Remotive queries with {max_workers} workers...")
+
+    own_pool = pool is None
+    pool = pool or HTTPConnectionPool(per_host_limit=per_host_limit)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(request_urls)))) as executor:
+            results = list(executor.map(lambda url: _fetch_with_pool(pool, url, cache, changed_only), request_urls))
+    finally:
+        if own_pool:
+            pool.close()
+
+    if changed_only:
+        if all(jobs is NOT_MODIFIED for jobs in results):
+            return NOT_MODIFIED
+        # Something changed, so the unchanged queries are needed too: decode them from the cache
+        for i, jobs in enumerate(results):
+            if jobs is NOT_MODIFIED:
+                body = cache.read(request_urls[i])
+                try:
+                    results[i] = _extract_jobs(json.loads(body.decode('utf-8'))) if body is not None else None
+                except json.JSONDecodeError as e:
+                    logging.error(f"Failed to decode cached response for {request_urls[i]}: {e}")
+                    results[i] = None
+
+    failed = [url for url, jobs in zip(request_urls, results) if jobs is None]
+    if failed:
+        logging.error(f"{len(failed)} of {len(request_urls)} queries failed; discarding the batch.")
+        return None
+
+    merged = []
+    seen_ids = set()
+    for jobs in results:
+        for job in jobs:
+            job_id = job.get('id')
+            if job_id in seen_ids:
+                continue
+            seen_ids.add(job_id)
+            merged.append(job)
+    logging.info(f"Fetched {sum(len(jobs) for jobs in results)} job listings, {len(merged)} unique.")
+    return merged
+
 if __name__ == '__main__':
+    # Batch fetching against a local stub server (no network needed)
+    from remotive_stub_server import StubRemotiveServer, make_raw_jobs
+    with StubRemotiveServer(make_raw_jobs(60, categories=["software-dev", "design", "marketing"]), latency=0.2) as stub:
+        logging.info("--- Batch fetching 3 categories x 2 search terms from the stub server ---")
+        batch_pool = HTTPConnectionPool(per_host_limit=3)
+        batch_jobs = fetch_raw_jobs_batch(categories=["software-dev", "design", "marketing"], search_terms=["engineer", "manager"],
+                                          base_url=stub.url, pool=batch_pool)
+        batch_pool.close()
+        logging.info(f"Batch returned {len(batch_jobs)} unique jobs over {batch_pool.connections_opened} connection(s) "
+                     f"for {stub.request_count} requests.")
+
     # Example usage:
     logging.info("--- Fetching all available (default limit by API) software development jobs ---")
     swe_jobs = fetch_raw_jobs(category="software-dev")
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_TITLES = ["Software Engineer", "Product Manager", "UI Designer", "Marketing Manager", "Data Engineer", "Support Specialist"]
+
+def make_raw_jobs(count: int, categories: Optional[List[str]] = None, start_id: int = 1) -> List[Dict]:
+    """
+    Builds canned job dictionaries shaped like the Remotive API's "jobs" entries.
+
+    Args:
+        count: Number of jobs to build.
+        categories: Optional. Category slugs to cycle through.
+        start_id: Optional. First job id.
+    """
+    categories = categories or ["software-dev"]
+    base_date = datetime(2024, 1, 1)
+    jobs = []
+    for i in range(count):
+        job_id = start_id + i
+        jobs.append({
+            "id": job_id,
+            "url": f"https://remotive.com/remote-jobs/job-{job_id}",
+            "title": f"{_TITLES[i % len(_TITLES)]} {job_id}",
+            "company_name": f"Company {job_id % 17}",
+            "category": categories[i % len(categories)],
+            "job_type": "full_time",
+            "publication_date": (base_date + timedelta(hours=job_id)).isoformat(),
+            "candidate_required_location": "Worldwide",
+            "salary": "",
+            "description": f"<p>Description for job {job_id}</p>",
+        })
+    return jobs
+
+
+class StubRemotiveServer:
+    """
+    Local HTTP/1.1 (keep-alive) server that mimics the Remotive jobs endpoint
+    for tests and benchmarks, with optional injected latency per request.
+
+    Supports the category, search (case-insensitive title match) and limit
+    query parameters, and answers If-None-Match with 304 when the response
+    body (and therefore its ETag) has not changed. Use as a context manager;
+    `url` is the endpoint to pass as base_url.
+    """
+
+    def __init__(self, jobs: List[Dict], latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.jobs = jobs
+        self.latency = latency
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/remote-jobs"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, body, headers = stub.respond(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Keep test output quiet
+
+        return Handler
+
+    def select_jobs(self, query: Dict[str, List[str]]) -> List[Dict]:
+        """Applies the Remotive query parameters to the canned jobs."""
+        jobs = self.jobs
+        category = query.get("category", [None])[0]
+        search = query.get("search", [None])[0]
+        limit = query.get("limit", [None])[0]
+        if category:
+            jobs = [job for job in jobs if job["category"] == category]
+        if search:
+            jobs = [job for job in jobs if search.lower() in job["title"].lower()]
+        if limit is not None:
+            jobs = jobs[:int(limit)]
+        return jobs
+
+    def respond(self, handler: BaseHTTPRequestHandler):
+        """
+        Builds the (status, body bytes, extra headers) for one request.
+        """
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(handler.path).query)
+        jobs = self.select_jobs(query)
+        payload = {"0-legal-notice": "Stub Remotive API", "job-count": len(jobs), "jobs": jobs}
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, b"", {"ETag": etag}
+        return 200, body, {"ETag": etag}
+
+    def start(self) -> "StubRemotiveServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubRemotiveServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == '__main__':
+    with StubRemotiveServer(make_raw_jobs(20, categories=["software-dev", "design"]), latency=0.1) as stub:
+        logging.info(f"Stub Remotive API listening on {stub.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
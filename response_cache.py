@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import BinaryIO, Dict, Optional
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_CACHE_DIR = os.path.join("data", "http_cache")
+DEFAULT_TTL_SECONDS = 300 # Responses younger than this are reused without contacting the server
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache keyed by request URL, used for conditional requests.
+
+    Each entry is a pair of files named after the SHA-1 of the URL:
+    <key>.body holds the raw response body and <key>.json holds the URL, the
+    ETag/Last-Modified validators and the time it was fetched or revalidated.
+    Entries younger than ttl are served without a request; older ones are
+    revalidated with If-None-Match/If-Modified-Since. When the bodies exceed
+    max_bytes, the least recently used entries are evicted.
+
+    With deferred=True, new responses are staged (<key>.body.staged plus their
+    validators in memory) and only replace the cached entries on commit(),
+    e.g. once update_jobs.py has stored their data; rollback() drops them. A
+    run that fails or is interrupted before its data is saved then never
+    leaves validators behind that would make the next run skip that data as
+    "not modified".
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES,
+                 deferred: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.deferred = deferred
+        self._staged: Dict[str, Dict] = {} # url -> metadata of a staged response
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json"), os.path.join(self.cache_dir, key + ".body")
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Returns the cached metadata for url, or None if it is not cached.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get('url') != url or not os.path.exists(body_path):
+            return None
+        return meta
+
+    def is_fresh(self, meta: Dict) -> bool:
+        """True if the entry is younger than the TTL and can be used without revalidation."""
+        return self.ttl > 0 and time.time() - meta.get('fetched_at', 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(meta: Optional[Dict]) -> Dict[str, str]:
+        """Returns the If-None-Match/If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def read(self, url: str) -> Optional[bytes]:
+        """
+        Returns the cached body for url (marking it as recently used), or None.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            os.utime(meta_path)
+            return body
+        except OSError:
+            return None
+
+    def open_body(self, url: str) -> Optional[BinaryIO]:
+        """
+        Like read, but returns the cached body as an open binary file (for streaming), or None.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            f = open(body_path, 'rb')
+        except OSError:
+            return None
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return f
+
+    def revalidated(self, url: str, meta: Dict) -> None:
+        """Records that the server confirmed (304) the cached entry is still current."""
+        meta = dict(meta, fetched_at=time.time())
+        self._write_meta(url, meta)
+
+    def store(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Stores a 200 response body and its validators, then evicts old entries if needed.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _, body_path = self._paths(url)
+            with open(body_path + ".tmp", 'wb') as f:
+                f.write(body)
+        except OSError as e:
+            logging.error(f"Could not write response cache entry for {url}: {e}")
+            return
+        self.store_file(url, body_path + ".tmp", etag=etag, last_modified=last_modified)
+
+    def store_file(self, url: str, filepath: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Like store, for a body already written to filepath (on the cache's file
+        system, e.g. in cache_dir), which is moved into the cache.
+        """
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        try:
+            _, body_path = self._paths(url)
+            if self.deferred:
+                os.replace(filepath, body_path + ".staged")
+                self._staged[url] = meta
+                return
+            os.replace(filepath, body_path)
+            self._write_meta(url, meta)
+        except OSError as e:
+            logging.error(f"Could not write response cache entry for {url}: {e}")
+            return
+        self.evict()
+
+    def commit(self) -> None:
+        """Moves the staged responses (see deferred) into the cache, replacing their previous entries."""
+        staged, self._staged = self._staged, {}
+        for url, meta in staged.items():
+            meta_path, body_path = self._paths(url)
+            try:
+                # Without metadata the entry is not used, so the old validators never describe the new body
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+                os.replace(body_path + ".staged", body_path)
+            except OSError as e:
+                logging.error(f"Could not write response cache entry for {url}: {e}")
+                continue
+            self._write_meta(url, meta)
+        if staged:
+            self.evict()
+
+    def rollback(self) -> None:
+        """Drops the staged responses; the cached entries stay as they were."""
+        staged, self._staged = self._staged, {}
+        for url in staged:
+            _, body_path = self._paths(url)
+            try:
+                os.remove(body_path + ".staged")
+            except OSError:
+                pass
+
+    def _write_meta(self, url: str, meta: Dict) -> None:
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError as e:
+            logging.error(f"Could not write response cache metadata for {url}: {e}")
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the bodies fit in max_bytes.
+
+        Returns:
+            The number of entries removed.
+        """
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            body_path = meta_path[:-len(".json")] + ".body"
+            try:
+                size = os.path.getsize(body_path)
+                last_used = os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            entries.append((last_used, size, meta_path, body_path))
+            total += size
+
+        removed = 0
+        for _, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        if removed:
+            logging.info(f"Evicted {removed} response cache entries from {self.cache_dir}.")
+        return removed
+
+    def clear(self) -> None:
+        """Removes every cached entry."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith((".json", ".body", ".staged")):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,130 @@
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Python counterpart of lib/salaryParser.ts, run once per distinct salary string at
+# ingest instead of on every render.
+
+# Multipliers from each pay period to a year (full-time: 52 weeks, 260 days, 2080 hours)
+PERIOD_MULTIPLIERS = {"year": 1, "month": 12, "week": 52, "day": 260, "hour": 2080}
+NO_SALARY_DISPLAY = "Salary not specified"
+
+_NUMBER_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*([kK](?![a-zA-Z]))?")
+_CURRENCY_RE = re.compile(r"(CA\$|C\$|A\$|US\$|\$|€|£|₹|\b(?:USD|EUR|GBP|CAD|AUD|CHF|PLN|INR|SEK|NOK|DKK|BRL|MXN|ZRX)\b)", re.IGNORECASE)
+_CURRENCY_SYMBOLS = {"$": "USD", "us$": "USD", "ca$": "CAD", "c$": "CAD", "a$": "AUD", "€": "EUR", "£": "GBP", "₹": "INR"}
+_PERIOD_PATTERNS = (
+    ("hour", re.compile(r"per hour|/\s*hour|/\s*hr\b|hourly", re.IGNORECASE)),
+    ("day", re.compile(r"per day|/\s*day|daily", re.IGNORECASE)),
+    ("week", re.compile(r"per week|/\s*week|/\s*wk\b|weekly", re.IGNORECASE)),
+    ("month", re.compile(r"per month|/\s*month|/\s*mo\b|monthly|gross salary", re.IGNORECASE)),
+)
+# Numbers with four or more digits, which the display string groups with commas
+_LONG_NUMBER_RE = re.compile(r'\b(\d{4,})\b')
+_THOUSANDS_RE = re.compile(r'\B(?=(\d{3})+(?!\d))')
+
+
+@dataclass(frozen=True)
+class Salary:
+    """
+    A job's salary: the raw string from the feed, its display form and, when it
+    contains an amount, the parsed range. min/max are in currency units per
+    period; max is None for a single amount.
+    """
+    raw: str
+    display: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    currency: Optional[str] = None
+    period: Optional[str] = None
+
+    @property
+    def has_amount(self) -> bool:
+        return self.min is not None
+
+    @property
+    def annual_min(self) -> Optional[float]:
+        return self.min * PERIOD_MULTIPLIERS[self.period] if self.min is not None else None
+
+    @property
+    def annual_max(self) -> Optional[float]:
+        """Upper end of the range per year (the single amount if there is no range)."""
+        amount = self.max if self.max is not None else self.min
+        return amount * PERIOD_MULTIPLIERS[self.period] if amount is not None else None
+
+    @property
+    def annual_midpoint(self) -> Optional[float]:
+        """The amount salary sorts, bands and range queries use."""
+        if self.min is None:
+            return None
+        return (self.annual_min + self.annual_max) / 2
+
+
+def format_salary(raw: Optional[str]) -> str:
+    """Display form of a salary string: long numbers get thousands separators (100000 -> 100,000)."""
+    if not raw:
+        return NO_SALARY_DISPLAY
+    return _LONG_NUMBER_RE.sub(lambda match: _THOUSANDS_RE.sub(',', match.group(0)), raw)
+
+def _currency(raw: str) -> str:
+    match = _CURRENCY_RE.search(raw)
+    if not match:
+        return "USD" # Remotive's default, as in lib/salaryParser.ts
+    token = match.group(1).lower()
+    return _CURRENCY_SYMBOLS.get(token, token.upper())
+
+def _period(raw: str) -> str:
+    for period, pattern in _PERIOD_PATTERNS:
+        if pattern.search(raw):
+            return period
+    return "year"
+
+@lru_cache(maxsize=16384)
+def parse_salary(raw: Optional[str]) -> Optional[Salary]:
+    """
+    Parses a free-form salary string ("$100k - $120k", "50,000 EUR", "$40/hour",
+    "Competitive"). Cached, so jobs with the same salary string share one Salary.
+
+    Returns:
+        None for None; otherwise a Salary, whose amounts are None if the string
+        has no number in it.
+    """
+    if raw is None:
+        return None
+    amounts = []
+    for number, thousands in _NUMBER_RE.findall(raw):
+        try:
+            amount = float(number.replace(',', ''))
+        except ValueError: # e.g. "1.2.3"
+            continue
+        if thousands:
+            amount *= 1000
+        amounts.append(amount)
+        if len(amounts) == 2:
+            break
+    display = format_salary(raw)
+    if not amounts:
+        return Salary(raw=raw, display=display)
+    # "80-100k": the k on the upper bound applies to both
+    if len(amounts) == 2 and amounts[0] < 1000 <= amounts[1] and re.search(r"\d\s*[kK]", raw):
+        amounts[0] *= 1000
+    low, high = (min(amounts), max(amounts)) if len(amounts) == 2 else (amounts[0], None)
+    if high == low:
+        high = None
+    return Salary(raw=raw, display=display, min=low, max=high, currency=_currency(raw), period=_period(raw))
+
+
+if __name__ == '__main__':
+    for example in ["$100k - $120k", "50,000 - 70,000 EUR", "$40/hour", "80-100k", "£4,000 per month",
+                    "PLN 20000 gross salary", "Competitive", "", None]:
+        salary = parse_salary(example)
+        if salary is None:
+            logging.info(f"{example!r} -> None")
+        else:
+            logging.info(f"{example!r} -> {salary.min}-{salary.max} {salary.currency}/{salary.period} "
+                         f"(annual midpoint {salary.annual_midpoint}), displayed as {salary.display!r}")
+    logging.info(f"Parsed once, shared after: {parse_salary('$100k - $120k') is parse_salary('$100k - $120k')}")
@@ -0,0 +1,71 @@
+import html
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# Small English stopword list; job postings are full of these and they carry no signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the this
+to was we will with you your
+""".split())
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_TAG_RE = re.compile(r"<[^>]*>")
+
+# Tags after which a line break keeps words from different blocks apart
+_BLOCK_TAGS = frozenset(["p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "td", "section"])
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def strip_html(markup: str) -> str:
+    """
+    Converts an HTML job description to plain text with collapsed whitespace.
+    Falls back to a regex strip if the markup cannot be parsed.
+    """
+    if not markup:
+        return ""
+    if "<" not in markup and "&" not in markup:
+        return _WHITESPACE_RE.sub(" ", markup).strip()
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(markup)
+        extractor.close()
+        text = "".join(extractor.parts)
+    except Exception:
+        text = html.unescape(_TAG_RE.sub(" ", markup))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def tokenize(text: str, remove_stopwords: bool = True) -> List[str]:
+    """
+    Splits text into lowercase word tokens, dropping stopwords by default.
+    """
+    if not text:
+        return []
+    tokens = _TOKEN_RE.findall(text.lower())
+    if remove_stopwords:
+        return [token for token in tokens if token not in STOPWORDS]
+    return tokens
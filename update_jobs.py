@@ -1,14 +1,30 @@
+import http.client
 import logging
 import os
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import List, Optional
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Attempt to import necessary functions from our modules
 try:
-    from remotive_client import fetch_raw_jobs
-    from job_processor import process_api_jobs, Job # Import Job if needed for type hinting, though not strictly used here
-    from job_storage import save_jobs_to_json, load_jobs_from_json # load_jobs might be useful for more complex updates later
+    from remotive_client import fetch_raw_jobs, fetch_raw_jobs_batch, open_raw_job_stream, NOT_MODIFIED
+    from response_cache import ResponseCache
+    from job_processor import process_api_jobs_batch, Job # Import Job if needed for type hinting, though not strictly used here
+    from job_storage import save_jobs_to_json, load_jobs_from_json, JobFileWriter
+    from job_journal import JobJournal, load_jobs_with_journal
+    from job_search import SearchIndex, update_search_index, SEARCH_INDEX_FILEPATH
+    from job_db import save_jobs_to_db, merge_jobs_into_db, upsert_jobs, load_jobs_from_db, default_storage_backend, JOBS_DB_FILEPATH
+    from job_snapshot import write_snapshot, SNAPSHOT_FILEPATH
+    from job_dedup import deduplicate_jobs
+    from export_source import fetch_raw_job_batches, EXPORT_FILEPATH, EXPORT_BATCH_SIZE
+    from metrics import write_summary, METRICS_SUMMARY_FILEPATH
+    from job_percolator import notify_saved_searches
+    from job_similarity import write_similarity_index, SimilarityIndexBuilder, SIMILARITY_AVAILABLE
 except ImportError as e:
     logging.critical(f"Failed to import necessary modules: {e}. Ensure remotive_client.py, job_processor.py, and job_storage.py are accessible.")
     # Exit if core components are missing, as the script cannot function
@@ -17,16 +33,57 @@ except ImportError as e:
 # Define the path for the jobs data file
 DATA_DIR = "data"
 JOBS_JSON_FILEPATH = os.path.join(DATA_DIR, "remotive_jobs.json")
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
+# "json" (JOBS_JSON_FILEPATH plus merge journal) or "sqlite" (JOBS_DB_FILEPATH, see job_db.py);
+# None uses job_db.default_storage_backend(), the backend app.py serves
+STORAGE_BACKEND = None
+# Merge near-duplicate postings (reposts under a new id) before storing, see job_dedup.py
+DEDUPLICATE = True
+# Match new or changed jobs from a merge against the saved searches, see job_percolator.py
+NOTIFY_SAVED_SEARCHES = True
+# Rebuild the similar-jobs matrix (job_similarity.py, needs NumPy) whenever the store is rewritten
+BUILD_SIMILAR_JOBS = True
+# Raw jobs decoded, processed and written at a time by run_streaming_update
+STREAM_CHUNK_SIZE = 1000
 
-def run_update(fetch_category: str = None, fetch_search_term: str = None, fetch_limit: int = None):
+def _settle_cached_responses(response_cache, stored: bool) -> None:
+    # Responses fetched by this run are staged in the cache (deferred=True) and only
+    # kept once their data is stored; otherwise the next run would see "not modified"
+    # and skip the data this run failed (or was interrupted before it managed) to save.
+    if response_cache is not None:
+        if stored:
+            response_cache.commit()
+        else:
+            response_cache.rollback()
+
+def run_update(fetch_category: str = None, fetch_search_term: str = None, fetch_limit: int = None, merge: bool = True,
+               fetch_categories: List[str] = None, use_cache: bool = True, storage_backend: Optional[str] = STORAGE_BACKEND,
+               deduplicate: bool = DEDUPLICATE):
     """
     Fetches the latest jobs from Remotive API, processes them, 
-    and saves them to the JSON data store, overwriting the existing file.
+    and saves them to the JSON data store.
     
     Args:
         fetch_category: Optional category to filter jobs by.
         fetch_search_term: Optional search term to filter jobs by.
         fetch_limit: Optional limit for the number of jobs to fetch.
+        merge: Optional. If True (default), the fetched jobs are merged into the
+            store by Job.id via JobJournal, writing only new/changed/removed jobs
+            and keeping first_seen/last_seen. If False, the file is overwritten.
+        fetch_categories: Optional. Several categories to fetch concurrently with
+            fetch_raw_jobs_batch (combined with fetch_search_term); overrides fetch_category.
+        use_cache: Optional. If True (default), requests are made conditional via
+            a ResponseCache in HTTP_CACHE_DIR and the update is skipped entirely
+            when the upstream feed has not changed since the last run.
+        storage_backend: Optional. "json" or "sqlite"; by default the one app.py
+            serves (see job_db.default_storage_backend). With "sqlite" the jobs are
+            merged into (or saved to) the SQLite database in one transaction.
+        deduplicate: Optional. If True (default), near-duplicate postings are
+            merged into one canonical job (see job_dedup.JobDeduplicator).
+
+    Returns:
+        True if the store is up to date (updated, or the feed was unchanged),
+        False if the update failed and the existing data was left as it was.
     """
     logging.info("Starting job update process...")
 
@@ -37,43 +94,300 @@ def run_update(fetch_category: str = None, fetch_search_term: str = None, fetch_
             logging.info(f"Created data directory: {DATA_DIR}")
     except OSError as e:
         logging.error(f"Could not create data directory {DATA_DIR}: {e}")
-        return # Cannot proceed without data directory
+        return False # Cannot proceed without data directory
 
     # 1. Fetch raw jobs from the API
-    logging.info(f"Fetching raw jobs from Remotive API (Category: {fetch_category}, Search: {fetch_search_term}, Limit: {fetch_limit})...")
-    raw_jobs = fetch_raw_jobs(category=fetch_category, search_term=fetch_search_term, limit=fetch_limit)
+    response_cache = ResponseCache(HTTP_CACHE_DIR, deferred=True) if use_cache else None
+    use_db = (storage_backend or default_storage_backend()) == "sqlite"
+    data_filepath = JOBS_DB_FILEPATH if use_db else JOBS_JSON_FILEPATH
+    # Only skip unchanged feeds if there is a data file the previous run produced
+    changed_only = use_cache and os.path.exists(data_filepath)
+    if fetch_categories:
+        logging.info(f"Fetching raw jobs from Remotive API (Categories: {fetch_categories}, Search: {fetch_search_term}, Limit: {fetch_limit})...")
+        raw_jobs = fetch_raw_jobs_batch(categories=fetch_categories, search_terms=[fetch_search_term] if fetch_search_term else None, limit=fetch_limit,
+                                        cache=response_cache, changed_only=changed_only)
+    else:
+        logging.info(f"Fetching raw jobs from Remotive API (Category: {fetch_category}, Search: {fetch_search_term}, Limit: {fetch_limit})...")
+        raw_jobs = fetch_raw_jobs(category=fetch_category, search_term=fetch_search_term, limit=fetch_limit,
+                                  cache=response_cache, changed_only=changed_only)
+
+    if raw_jobs is NOT_MODIFIED:
+        logging.info("Upstream job feed has not changed since the last update. Nothing to do.")
+        return True
 
     if raw_jobs is None:
         logging.error("Failed to fetch raw jobs from the API. The existing job data file will not be modified.")
-        return # Exit if API fetch failed, do not overwrite with empty or old data
+        _settle_cached_responses(response_cache, stored=False)
+        return False # Exit if API fetch failed, do not overwrite with empty or old data
     
     logging.info(f"Successfully fetched {len(raw_jobs)} raw job listings from the API.")
 
+    stored = False
+    try:
+        stored = _store_raw_jobs(raw_jobs, merge=merge, use_db=use_db, deduplicate=deduplicate)
+    finally:
+        _settle_cached_responses(response_cache, stored)
+    return stored
+
+def _store_raw_jobs(raw_jobs: List, merge: bool, use_db: bool, deduplicate: bool) -> bool:
+    """
+    Steps 2 and 3 of run_update: processes the fetched raw jobs and merges them
+    into (or saves them as) the store, then rebuilds the derived files.
+
+    Returns:
+        True if the jobs were stored, False otherwise.
+    """
+    data_filepath = JOBS_DB_FILEPATH if use_db else JOBS_JSON_FILEPATH
+
     # 2. Process the raw jobs
     if not raw_jobs: # API returned an empty list (e.g. no jobs for query, or limit=0)
         logging.info("API returned an empty list of jobs. The job data file will be updated with an empty list.")
         processed_jobs = []
+        description_texts = {}
     else:
         logging.info("Processing raw job listings...")
-        processed_jobs = process_api_jobs(raw_jobs)
+        # Large feeds are processed across a process pool; for SQLite the workers
+        # also extract the plain-text descriptions its full-text index needs
+        processing_result = process_api_jobs_batch(raw_jobs, extract_text=use_db)
+        processed_jobs, description_texts = processing_result.jobs, processing_result.description_texts
         logging.info(f"Successfully processed {len(processed_jobs)} job listings.")
+        if deduplicate:
+            processed_jobs = deduplicate_jobs(processed_jobs).jobs
+
+    # 3a. Merge strategy: append only the delta to the journal
+    if merge:
+        logging.info(f"Merging processed jobs into {data_filepath}...")
+        if use_db:
+            merge_result = merge_jobs_into_db(processed_jobs, JOBS_DB_FILEPATH, description_texts=description_texts)
+        else:
+            merge_result = JobJournal(JOBS_JSON_FILEPATH).merge(processed_jobs)
+        if merge_result is not None:
+            # The merge keeps other feeds' jobs (e.g. imported ones), so unless there are none the
+            # fetched list is not the whole store and the derived files are built from the store
+            all_jobs = processed_jobs
+            if merge_result.kept:
+                all_jobs = load_jobs_from_db(JOBS_DB_FILEPATH) if use_db else load_jobs_with_journal(JOBS_JSON_FILEPATH)
+            # Re-index only what changed
+            update_search_index(merge_result.new + merge_result.changed, merge_result.removed, all_jobs=all_jobs)
+            write_snapshot(all_jobs, SNAPSHOT_FILEPATH)
+            if BUILD_SIMILAR_JOBS:
+                write_similarity_index(all_jobs)
+            if NOTIFY_SAVED_SEARCHES:
+                notify_saved_searches(merge_result.new + merge_result.changed)
+            logging.info(f"Job update process completed successfully. {len(all_jobs)} jobs in store "
+                         f"({len(merge_result.new)} new, {len(merge_result.changed)} changed, {len(merge_result.removed)} removed).")
+            return True
+        logging.error("Failed to merge processed jobs into the job store.")
+        return False
 
-    # 3. Save the processed jobs to the JSON file (overwrite strategy)
-    logging.info(f"Saving processed jobs to {JOBS_JSON_FILEPATH}...")
-    save_success = save_jobs_to_json(processed_jobs, JOBS_JSON_FILEPATH)
+    # 3b. Save the processed jobs to the JSON file (overwrite strategy)
+    logging.info(f"Saving processed jobs to {data_filepath}...")
+    if use_db:
+        save_success = save_jobs_to_db(processed_jobs, JOBS_DB_FILEPATH, description_texts=description_texts)
+    else:
+        # Descriptions go to a side file so the web app can load the list without them
+        save_success = save_jobs_to_json(processed_jobs, JOBS_JSON_FILEPATH, split_descriptions=True)
+        if save_success:
+            # Only once the new file is in place: the old one is served with its journal until then
+            JobJournal(JOBS_JSON_FILEPATH).discard()
 
     if save_success:
+        SearchIndex.build(processed_jobs).save(SEARCH_INDEX_FILEPATH)
+        write_snapshot(processed_jobs, SNAPSHOT_FILEPATH)
+        if BUILD_SIMILAR_JOBS:
+            write_similarity_index(processed_jobs)
         logging.info(f"Job update process completed successfully. {len(processed_jobs)} jobs saved.")
-    else:
-        logging.error("Failed to save processed jobs to the JSON file.")
+        return True
+    logging.error(f"Failed to save processed jobs to {data_filepath}.")
+    return False
+
+def run_streaming_update(fetch_category: str = None, fetch_search_term: str = None, fetch_limit: int = None,
+                         use_cache: bool = True, chunk_size: int = STREAM_CHUNK_SIZE) -> bool:
+    """
+    Like run_update(merge=False) for the JSON store, but with memory that stays
+    flat as the feed grows: jobs are decoded from the response while it
+    downloads and processed and written chunk_size at a time to a temporary
+    file (see JobFileWriter), which is fsynced and moved over
+    JOBS_JSON_FILEPATH only once the whole feed has been stored. If anything
+    fails the existing file is left exactly as it was.
+
+    Merging and deduplication need the whole feed at once and are not done.
+    The search index is built from the chunks as they go by; the snapshot is
+    written from the new file, without descriptions.
+
+    Returns:
+        True if the store is up to date (updated, or the feed was unchanged),
+        False if the update failed and the existing data was left as it was.
+    """
+    logging.info("Starting streaming job update process...")
+    if default_storage_backend() == "sqlite":
+        logging.warning(f"{JOBS_DB_FILEPATH} exists, so app.py serves the SQLite store; "
+                        f"this update only writes {JOBS_JSON_FILEPATH}.")
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+    except OSError as e:
+        logging.error(f"Could not create data directory {DATA_DIR}: {e}")
+        return False
+
+    response_cache = ResponseCache(HTTP_CACHE_DIR, deferred=True) if use_cache else None
+    changed_only = use_cache and os.path.exists(JOBS_JSON_FILEPATH)
+    stream = open_raw_job_stream(category=fetch_category, search_term=fetch_search_term, limit=fetch_limit,
+                                 cache=response_cache, changed_only=changed_only)
+    if stream is NOT_MODIFIED:
+        logging.info("Upstream job feed has not changed since the last update. Nothing to do.")
+        return True
+    if stream is None:
+        logging.error("Failed to fetch raw jobs from the API. The existing job data file will not be modified.")
+        return False
+
+    stored = False
+    try:
+        stored = _store_raw_job_stream(stream, chunk_size)
+    finally:
+        _settle_cached_responses(response_cache, stored)
+    return stored
+
+def _store_raw_job_stream(stream, chunk_size: int) -> bool:
+    """
+    The storing part of run_streaming_update: processes and writes the
+    stream's jobs, then rebuilds the derived files.
+
+    Returns:
+        True if the jobs were stored, False otherwise.
+    """
+    search_index = SearchIndex()
+    similarity = SimilarityIndexBuilder() if BUILD_SIMILAR_JOBS and SIMILARITY_AVAILABLE else None
+    records = stored = 0
+    start = time.perf_counter()
+    try:
+        with stream, JobFileWriter(JOBS_JSON_FILEPATH, split_descriptions=True) as writer:
+            raw_job_iter = iter(stream)
+            while True:
+                raw_jobs = list(islice(raw_job_iter, chunk_size))
+                if not raw_jobs:
+                    break
+                jobs = process_api_jobs_batch(raw_jobs).jobs
+                writer.write(jobs)
+                for job in jobs:
+                    search_index.add(job)
+                    if similarity is not None:
+                        similarity.add(job)
+                records += len(raw_jobs)
+                stored += len(jobs)
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        logging.error(f"Streaming update failed after {records} records: {e}. "
+                      f"The existing job data file was not modified.")
+        return False
+    # Only once the writer has committed the new file: the old one is served with its
+    # journal until then, and stale ops must not be replayed on top of the new one (as in run_update)
+    JobJournal(JOBS_JSON_FILEPATH).discard()
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"Streamed {records} raw jobs ({stream.bytes_read:,} bytes) into {JOBS_JSON_FILEPATH} in {elapsed:.2f}s: "
+                 f"{stored} jobs saved.")
+    search_index.save(SEARCH_INDEX_FILEPATH)
+    write_snapshot(load_jobs_from_json(JOBS_JSON_FILEPATH, lazy_descriptions=True), SNAPSHOT_FILEPATH)
+    if similarity is not None:
+        similarity.build().save()
+    logging.info("Streaming job update process completed successfully.")
+    return True
+
+def run_export_import(export_filepath: str = EXPORT_FILEPATH, storage_backend: Optional[str] = STORAGE_BACKEND,
+                      batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Ingests a jobs collection export (see export_source.py) through the same
+    processing and storage path as run_update, one batch of at most batch_size
+    records at a time.
+
+    Imported jobs are added to or updated in the store with
+    Job.source = export_source.EXPORT_SOURCE; nothing is removed. run_update merges only
+    treat the Remotive feed's own jobs as vanished, so imported jobs stay
+    until a re-import or an overwriting (merge=False) update replaces them.
+
+    Args:
+        export_filepath: Optional. The export file (JSON array or NDJSON).
+        storage_backend: Optional. "json" or "sqlite", as in run_update.
+        batch_size: Optional. Records processed and stored per batch.
+    """
+    logging.info(f"Importing jobs from {export_filepath} in batches of {batch_size}...")
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+    except OSError as e:
+        logging.error(f"Could not create data directory {DATA_DIR}: {e}")
+        return
+
+    use_db = (storage_backend or default_storage_backend()) == "sqlite"
+    journal = None if use_db else JobJournal(JOBS_JSON_FILEPATH)
+    search_index = SearchIndex.load(SEARCH_INDEX_FILEPATH)
+    records = stored = skipped = 0
+    start = time.perf_counter()
+    try:
+        for batch_number, raw_jobs in enumerate(fetch_raw_job_batches(export_filepath, batch_size), 1):
+            processing_result = process_api_jobs_batch(raw_jobs, extract_text=use_db)
+            jobs = processing_result.jobs
+            if use_db:
+                ok = upsert_jobs(jobs, JOBS_DB_FILEPATH, description_texts=processing_result.description_texts)
+                written = jobs if ok else None
+            else:
+                merge_result = journal.upsert(jobs)
+                written = merge_result.new + merge_result.changed if merge_result is not None else None
+            if written is None:
+                logging.error(f"Failed to store batch {batch_number} of {export_filepath}; stopping the import.")
+                break
+            if search_index is not None:
+                for job in written:
+                    search_index.add(job)
+            records += len(raw_jobs)
+            stored += len(jobs)
+            skipped += processing_result.skipped
+            elapsed = time.perf_counter() - start
+            logging.info(f"Batch {batch_number}: {records} records so far ({records / elapsed:,.0f} records/s).")
+    except FileNotFoundError:
+        logging.error(f"Export file not found: {export_filepath}")
+        return
+    except ValueError as e: # json.JSONDecodeError: batches before it have been stored
+        logging.error(f"Export file {export_filepath} is malformed: {e}")
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"Imported {records} export records in {elapsed:.2f}s ({records / elapsed if elapsed else 0:,.0f} records/s): "
+                 f"{stored} jobs processed, {skipped} skipped.")
+    if not stored:
+        return
+
+    # The snapshot and (if there was none) the search index cover the whole store
+    all_jobs = load_jobs_from_db(JOBS_DB_FILEPATH) if use_db else load_jobs_with_journal(JOBS_JSON_FILEPATH)
+    if search_index is None:
+        search_index = SearchIndex.build(all_jobs)
+    search_index.save(SEARCH_INDEX_FILEPATH)
+    write_snapshot(all_jobs, SNAPSHOT_FILEPATH)
+    if BUILD_SIMILAR_JOBS:
+        write_similarity_index(all_jobs)
+
+def write_run_summary(command: str, started: float, filepath: str = METRICS_SUMMARY_FILEPATH) -> None:
+    """Dumps the run's metrics (bytes fetched, records processed/skipped, stage timings) as JSON."""
+    write_summary(filepath, extra={"command": command, "finished_at": datetime.now(timezone.utc).isoformat(),
+                                   "duration_seconds": round(time.perf_counter() - started, 3)})
 
 if __name__ == '__main__':
     logging.info("Executing job update script.")
+    started = time.perf_counter()
+    if sys.argv[1:2] == ['import-export']:
+        # python update_jobs.py import-export [export file]
+        run_export_import(*sys.argv[2:3])
+        write_run_summary("import-export", started)
+        sys.exit(0)
+    if sys.argv[1:2] == ['stream']:
+        # python update_jobs.py stream
+        ok = run_streaming_update()
+        write_run_summary("stream", started)
+        sys.exit(0 if ok else 1)
+
     # Example: Fetch all software development jobs (Remotive API might have its own default limit)
     # run_update(fetch_category="software-dev")
     
     # Example: Fetch all jobs (no specific category, default API limit)
     run_update()
+    write_run_summary("update", started)
 
     # Example: To test loading, you could add:
     # print("\n--- Verifying by loading back --- ")